@@ -0,0 +1,95 @@
+"""
+Obremenitveni test storitve za napovedi (src.app.api) pri naraščajoči sočasnosti:
+  - brez paketov: vsak zahtevek svoj klic predict (max_batch_size=1),
+  - mikro-paketi: sočasni zahtevki v enem klicu predict,
+  - mikro-paketi + NumPy: paketi z izvoženima modeloma (src.models.compiled).
+Strežnik teče v ločenem procesu z modeloma, naučenima na sintetičnih podatkih (brez MLflow);
+odjemalci so niti s trajnimi HTTP/1.1 povezavami. Poroča p50/p99 zakasnitev in zahtevke na sekundo.
+
+Zagon: python -m benchmarks.bench_api [--concurrency 1 4 16 64] [--requests 2000]
+"""
+import json
+import time
+import argparse
+import warnings
+import http.client
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.app.api import compile_models, create_server
+from src.models.features import FEATURES
+from benchmarks.bench_incremental import make_frame, full_fit
+
+def run_server(port, max_batch_size, max_wait_ms, compiled, ready):
+    warnings.filterwarnings("ignore")
+    models = full_fit(make_frame(5000))
+    models = {"regression": models["reg"], "classification": models["class"], "versions": {"regression": "bench", "classification": "bench"}}
+    if compiled:
+        models["compiled"] = compile_models(models)
+    server = create_server(models, "127.0.0.1", port, max_batch_size, max_wait_ms)
+    ready.set()
+    server.serve_forever()
+
+def client(port, rows):
+    """Pošlje zaporedne zahtevke po eni povezavi; vrne zakasnitve v sekundah."""
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    latencies = []
+    for row in rows:
+        body = json.dumps(row).encode()
+        start = time.perf_counter()
+        connection.request("POST", "/predict", body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+        latencies.append(time.perf_counter() - start)
+        assert response.status == 200 and "pm10" in payload, payload
+    connection.close()
+    return latencies
+
+def load_test(port, concurrency, n_requests):
+    rng = np.random.default_rng(concurrency)
+    rows = [dict(zip(FEATURES, values)) for values in rng.gamma(2.0, 10.0, (n_requests, len(FEATURES))).tolist()]
+    per_client = [rows[i::concurrency] for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = np.concatenate([result for result in executor.map(lambda chunk: client(port, chunk), per_client)])
+    seconds = time.perf_counter() - start
+    return np.percentile(latencies, 50) * 1000, np.percentile(latencies, 99) * 1000, n_requests / seconds
+
+def health(port):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("GET", "/health")
+    stats = json.loads(connection.getresponse().read())["batching"]
+    connection.close()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'način':>13} | {'sočasnost':>9} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | {'zahtevki/s':>10}")
+    modes = (("brez paketov", 1, 0, False), ("mikro-paketi", args.max_batch_size, args.max_wait_ms, False),
+             ("+ NumPy", args.max_batch_size, args.max_wait_ms, True))
+    for offset, (name, max_batch_size, max_wait_ms, compiled) in enumerate(modes):
+        port = args.port + offset
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(target=run_server, args=(port, max_batch_size, max_wait_ms, compiled, ready), daemon=True)
+        server.start()
+        ready.wait()
+        load_test(port, 1, 50)  # Ogrevanje
+        for concurrency in args.concurrency:
+            p50, p99, rps = load_test(port, concurrency, args.requests)
+            print(f"{name:>13} | {concurrency:>9} | {p50:>8.2f} | {p99:>8.2f} | {rps:>10.0f}")
+        stats = health(port)
+        print(f"{'':>13}   povprečna velikost paketa {stats['requests'] / stats['batches']:.1f}, največja {stats['max_batch']}")
+        server.terminate()
+        server.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Zapolnjevanje zgodovine z lokalnim Open-Meteo stubom: zaporedno (eno okno hkrati) proti
+sočasnemu načinu (omejen bazen niti), nato še ponovni zagon, ki zaključena okna preskoči.
+
+Zagon: python -m benchmarks.bench_backfill [--stations 20] [--days 365]
+"""
+import os
+import time
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+from benchmarks.openmeteo_stub import OpenMeteoStub
+from src.data.fetch_historic_data import backfill
+from src.data.stations import Station
+from src.data.store import AQI_STORE, WEATHER_STORE, read
+
+def make_stations(n, run):
+    # Koordinate zamaknemo glede na zagon, da se izognemo zadetkom v HTTP cache
+    return [Station(f"s{i}", 40.0 + i * 0.01 + run, 10.0 + i * 0.01) for i in range(n)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--window-days", type=int, default=30)
+    args = parser.parse_args()
+
+    end = date(2024, 12, 31)
+    start = end - timedelta(days=args.days - 1)
+    cwd = os.getcwd()
+    with OpenMeteoStub() as stub:
+        urls = {"aqi": stub.url, "weather": stub.url}
+        for run, (mode, max_workers) in enumerate([("zaporedno", 1), ("sočasno", 8)]):
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                try:
+                    stations = make_stations(args.stations, run)
+                    started = time.perf_counter()
+                    backfill(start, end, stations, window_days=args.window_days, max_workers=max_workers,
+                             requests_per_second=0, urls=urls)
+                    elapsed = time.perf_counter() - started
+                    rows = len(read(AQI_STORE)) + len(read(WEATHER_STORE))
+
+                    requests_before = stub.requests
+                    resumed = time.perf_counter()
+                    backfill(start, end, stations, window_days=args.window_days, max_workers=max_workers,
+                             requests_per_second=0, urls=urls)
+                    print(f"\n{mode}: {elapsed:.2f}s, {rows} zapisov; ponovni zagon {time.perf_counter() - resumed:.2f}s, "
+                          f"{stub.requests - requests_before} novih zahtevkov\n")
+                finally:
+                    os.chdir(cwd)
+
+if __name__ == "__main__":
+    main()
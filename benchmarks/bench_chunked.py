@@ -0,0 +1,72 @@
+"""
+Največja poraba pomnilnika (peak RSS) stopenj merge in process v odvisnosti od velikosti zgodovine:
+običajni način (vse v pomnilniku) proti postopnemu načinu (--chunked) s fiksnim proračunom.
+Vsaka meritev teče v ločenem procesu (Linux, meri VmHWM).
+
+Zagon: python -m benchmarks.bench_chunked [--sizes 100000 1000000 5000000] [--memory-budget-mb 64]
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+
+from src.data.store import AQI_STORE, WEATHER_STORE, append
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys, time
+from src.data.store import AQI_STORE, WEATHER_STORE, MERGED_STORE, PROCESSED_STORE
+from src.data.merge_data import merge_data
+from src.data.process_data import process_data
+chunked, budget = sys.argv[1] == "1", float(sys.argv[2])
+start = time.perf_counter()
+merge_data(AQI_STORE, WEATHER_STORE, MERGED_STORE, chunked, budget)
+process_data(MERGED_STORE, PROCESSED_STORE, chunked, budget)
+# VmHWM (za razliko od ru_maxrss) ne podeduje porabe starševskega procesa
+peak_kb = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmHWM"))
+print(json.dumps({"rss_mb": peak_kb / 1024, "seconds": time.perf_counter() - start}))
+"""
+
+def make_store(directory, rows, columns, seed):
+    rng = np.random.default_rng(seed)
+    n_stations = min(50, max(1, rows // 8760))
+    hours = rows // n_stations
+    dates = pd.date_range("2015-01-01", periods=hours, freq="H", tz="UTC")
+    df = pd.DataFrame({
+        "station": np.repeat([f"s{i}" for i in range(n_stations)], hours),
+        "date": np.tile(dates, n_stations),
+    })
+    for col in columns:
+        df[col] = rng.random(len(df)) * 100
+    append(os.path.join(directory, AQI_STORE if "eu_aqi" in columns else WEATHER_STORE), df)
+
+def run_child(directory, chunked, budget):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    result = subprocess.run([sys.executable, "-c", CHILD, "1" if chunked else "0", str(budget)],
+                            cwd=directory, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="*", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--memory-budget-mb", type=float, default=64)
+    args = parser.parse_args()
+
+    print(f"{'zgodovina':>10} | {'v pomnilniku':>20} | {'po kosih':>20}")
+    for rows in args.sizes:
+        cells = []
+        for chunked in (False, True):
+            with tempfile.TemporaryDirectory() as tmp:
+                make_store(tmp, rows, ["pm10", "pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "eu_aqi"], 0)
+                make_store(tmp, rows, ["temperature_2m", "relative_humidity_2m", "rain", "snowfall", "is_day"], 1)
+                result = run_child(tmp, chunked, args.memory_budget_mb)
+                cells.append(f"{result['rss_mb']:>7.0f} MB, {result['seconds']:>6.1f}s")
+        print(f"{rows:>10} | {cells[0]:>20} | {cells[1]:>20}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Napovedovanje z obema modeloma (regresija PM10 in klasifikacija kategorije):
+  - prej: scikit-learn Pipeline (ColumnTransformer → SimpleImputer → StandardScaler → MLP) za vsak model posebej,
+  - zdaj: izvožena modela (src.models.compiled) — predprocesiranje vgrajeno v prvo plast, en prehod dopolnjevanja
+    za obe glavi, polja float32 iz .npz.
+Najprej preveri ujemanje z izhodi scikit-learn (tudi z manjkajočimi vrednostmi), nato meri zakasnitev po velikosti paketa.
+
+Zagon: python -m benchmarks.bench_compiled [--sizes 1 10 100 1000 10000]
+"""
+import os
+import time
+import argparse
+import tempfile
+import warnings
+
+import numpy as np
+
+from src.models.compiled import CompiledModels, load_compiled
+from src.models.features import FEATURES, decode_category
+from benchmarks.bench_incremental import make_frame, full_fit
+
+def sklearn_predict(models, df):
+    pm10 = models["regression"].predict(df[FEATURES]).ravel()
+    return pm10, models["classification"].predict_proba(df[FEATURES])
+
+def median_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    fitted = full_fit(make_frame(10_000))
+    models = {"regression": fitted["reg"], "classification": fitted["class"]}
+    df = make_frame(max(args.sizes), seed=1)
+    # Manjkajoče vrednosti v vseh značilkah (dopolni jih imputer oz. izvožene vrednosti)
+    rng = np.random.default_rng(2)
+    for feature in FEATURES:
+        df.loc[rng.random(len(df)) < 0.05, feature] = np.nan
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "compiled.npz")
+        CompiledModels.from_pipelines(models, {"regression": "1", "classification": "1"}).save(path)
+        compiled = load_compiled(path)
+        size_kb = os.path.getsize(path) / 1024
+
+    # Ujemanje z scikit-learn
+    pm10, proba = sklearn_predict(models, df)
+    outputs = compiled.predict_raw(df[FEATURES].to_numpy())
+    pm10_error = np.abs(outputs["regression"].ravel() - pm10).max()
+    proba_error = np.abs(outputs["classification"] - proba).max()
+    agreement = np.mean(decode_category(outputs["classification"]) == decode_category(proba))
+    assert np.allclose(outputs["regression"].ravel(), pm10, rtol=1e-4, atol=1e-3), pm10_error
+    assert np.allclose(outputs["classification"], proba, atol=1e-5), proba_error
+    assert agreement == 1.0, agreement
+    print(f"Ujemanje ({len(df)} vrstic, 5 % manjkajočih vrednosti): največja razlika PM10 {pm10_error:.2e}, "
+          f"verjetnosti {proba_error:.2e}, enake kategorije {agreement:.0%}; artefakt {size_kb:.0f} KB")
+
+    print(f"\n{'paket':>7} | {'scikit-learn (ms)':>17} | {'NumPy (ms)':>10} | {'pohitritev':>10}")
+    for size in args.sizes:
+        batch = df.head(size)
+        matrix = batch[FEATURES].to_numpy()
+        repeat = max(5, args.repeat if size <= 1000 else args.repeat // 5)
+        before = median_ms(lambda: sklearn_predict(models, batch), repeat)
+        after = median_ms(lambda: compiled.predict(matrix), repeat)
+        print(f"{size:>7} | {before:>17.3f} | {after:>10.3f} | {before / after:>9.1f}×")
+
+if __name__ == "__main__":
+    main()
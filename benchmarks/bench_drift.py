@@ -0,0 +1,94 @@
+"""
+Zaznavanje premika porazdelitev:
+  - prej: branje celotnih train/test CSV in ks_2samp nad surovimi stolpci,
+  - zdaj: shranjeni profili particij (prvi zagon jih zgradi, naslednji jih le združi).
+Izpiše čas, največjo porabo pomnilnika (tracemalloc) in razliko KS statistike glede na točen izračun.
+
+Zagon: python -m benchmarks.bench_drift [--rows 2000000]
+"""
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+from scipy.stats import ks_2samp, wasserstein_distance
+
+from src.data import drift
+from src.data.schema import FLOAT_COLUMNS, read_csv
+from src.data.split_data import split_data
+from src.data.store import PROCESSED_STORE, append
+from src.data.transform import categorize_aqi
+from src.data.watermark import load_watermark
+
+N_STATIONS = 20
+TRAIN_PATH, TEST_PATH = "train.csv", "test.csv"
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2015-01-01", periods=rows // N_STATIONS, freq="H", tz="UTC")
+    df = pd.DataFrame({
+        "station": np.repeat([f"s{i}" for i in range(N_STATIONS)], len(dates)),
+        "date": np.tile(dates, N_STATIONS),
+    })
+    # Rahel trend, da premik ni ničeln
+    trend = np.tile(np.linspace(0, 5, len(dates)), N_STATIONS)
+    for col in FLOAT_COLUMNS:
+        df[col] = rng.gamma(2.0, 10.0, len(df)) + trend
+    df["is_day"] = rng.integers(0, 2, len(df))
+    df["category"] = categorize_aqi(df["eu_aqi"])
+    return df
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def exact_drift():
+    reference, current = read_csv(TRAIN_PATH), read_csv(TEST_PATH)
+    return {col: (ks_2samp(reference[col].dropna(), current[col].dropna()).statistic,
+                  wasserstein_distance(reference[col].dropna(), current[col].dropna()))
+            for col in drift.DRIFT_COLUMNS}
+
+def profile_drift():
+    boundary = load_watermark("split")["train_end"]
+    edges = drift.load_edges(store_path=PROCESSED_STORE)
+    reference = drift.reference_profile(PROCESSED_STORE, boundary, edges)
+    current = drift.profile_frame(drift.read(PROCESSED_STORE, start=boundary, columns=list(edges)), edges)
+    return drift.detect_drift(reference, current)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            append(PROCESSED_STORE, make_frame(args.rows))
+            split_data(PROCESSED_STORE, os.path.join(tmp, TRAIN_PATH), os.path.join(tmp, TEST_PATH))
+
+            exact, exact_time, exact_peak = measure(exact_drift)
+            summary, cold_time, cold_peak = measure(profile_drift)
+            _, warm_time, warm_peak = measure(profile_drift)
+        finally:
+            os.chdir(cwd)
+
+    print(f"\n{'':>28} | {'čas':>8} | {'peak pomnilnik':>14}")
+    print(f"{'CSV + ks_2samp':>28} | {exact_time:>7.2f}s | {exact_peak:>11.0f} MB")
+    print(f"{'profili (prvi zagon)':>28} | {cold_time:>7.2f}s | {cold_peak:>11.0f} MB")
+    print(f"{'profili (shranjeni)':>28} | {warm_time:>7.2f}s | {warm_peak:>11.0f} MB")
+
+    print(f"\n{'stolpec':>22} | {'KS točno':>9} | {'KS profil':>9} | {'W1 točno':>9} | {'W1 profil':>9}")
+    for col, (ks, w1) in exact.items():
+        stats = summary["columns"][col]
+        print(f"{col:>22} | {ks:>9.4f} | {stats['ks_stat']:>9.4f} | {w1:>9.3f} | {stats['wasserstein']:>9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Evidently DataDriftPreset: celotno poročilo proti odločitvi na vzorcu (rezervoar / časovno stratificiran),
+za več scenarijev premika. Izpiše čas obeh načinov in ali se odločitvi (`dataset_drift`) ujemata.
+Potrebuje nameščen paket evidently.
+
+Zagon: python -m benchmarks.bench_evidently_sampling [--rows 500000] [--sample-sizes 5000 20000]
+"""
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from src.data.sampling import reservoir_sample, time_stratified_sample
+from src.data.schema import FLOAT_COLUMNS, apply_schema
+from src.data.validate_and_test_data import run_evidently, parallel_dataset_drift
+
+# Premik srednje vrednosti (v enotah standardnega odklona) v trenutnem oknu
+SCENARIOS = {"brez premika": 0.0, "blag premik": 0.05, "močan premik": 0.5}
+
+def make_frame(rows, shift, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=rows, freq="H", tz="UTC")})
+    for col in FLOAT_COLUMNS:
+        df[col] = rng.normal(50 + shift * 10, 10, rows)
+    df["is_day"] = rng.integers(0, 2, rows)
+    return apply_schema(df)
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--sample-sizes", type=int, nargs="*", default=[5_000, 20_000])
+    parser.add_argument("--jobs", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'scenarij':>14} | {'način':>26} | {'čas':>8} | {'drift':>5} | ujemanje")
+    for name, shift in SCENARIOS.items():
+        reference = make_frame(args.rows, 0.0, 0)
+        current = make_frame(args.rows // 9, shift, 1)
+        (_, full), full_time = timed(lambda: run_evidently(reference, current))
+        print(f"{name:>14} | {'celotno poročilo':>26} | {full_time:>7.2f}s | {str(full['dataset_drift']):>5} |")
+
+        for sample_size in args.sample_sizes:
+            for sampling, sample in (("reservoir", lambda df: reservoir_sample([df], sample_size)),
+                                     ("time", lambda df: time_stratified_sample(df, sample_size))):
+                for jobs in (1, args.jobs):
+                    def decide():
+                        reference_sample, current_sample = sample(reference), sample(current)
+                        if jobs > 1:
+                            return parallel_dataset_drift(reference_sample, current_sample, jobs)
+                        return run_evidently(reference_sample, current_sample)[1]
+                    result, elapsed = timed(decide)
+                    mode = f"{sampling} {sample_size}, {jobs} proc."
+                    agree = "da" if result["dataset_drift"] == full["dataset_drift"] else "NE"
+                    print(f"{name:>14} | {mode:>26} | {elapsed:>7.2f}s | {str(result['dataset_drift']):>5} | {agree}")
+
+if __name__ == "__main__":
+    main()
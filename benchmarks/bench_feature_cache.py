@@ -0,0 +1,86 @@
+"""
+Predprocesiranje značilk pri učenju in evalvaciji:
+  - prej: ColumnTransformer (imputer + scaler) se nauči v vsakem pregibu obeh GridSearchCV, ob njunem
+    ponovnem učenju in v obeh končnih modelih; evalvacija transformira testne podatke za vsak model posebej,
+  - zdaj: en prehod (float32, predpomnjen na disku), skupen vsem učenjem in evalvacijam na istih podatkih.
+Namesto nevronske mreže se uči linearni model, da je viden strošek predprocesiranja in ne učenja.
+
+Zagon: python -m benchmarks.bench_feature_cache [--rows 500000] [--models 4]
+"""
+import os
+import time
+import argparse
+import tempfile
+import warnings
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import GridSearchCV
+
+from src.models import features
+
+PARAM_GRID = {"alpha": [0.1, 1.0], "fit_intercept": [True, False]}
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({col: rng.gamma(2.0, 10.0, rows) for col in features.FEATURES})
+    df.loc[rng.random(rows) < 0.05, "uv_index"] = np.nan
+    df[features.TARGET_REGRESSION] = df["pm2_5"] * 1.3 + rng.normal(0, 1, rows)
+    return df
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def train_before(X, y):
+    # Dve iskanji (regresija, klasifikacija) s predprocesorjem v cevovodu in dva končna modela
+    for _ in range(2):
+        pipeline = Pipeline([("preprocess", features.build_preprocessor()), ("model", Ridge())])
+        grid = {f"model__{name}": values for name, values in PARAM_GRID.items()}
+        search = GridSearchCV(pipeline, grid, cv=3, n_jobs=1).fit(X, y)
+        Pipeline([("preprocess", features.build_preprocessor()),
+                  ("model", Ridge(**{k.split("__")[1]: v for k, v in search.best_params_.items()}))]).fit(X, y)
+    return pipeline
+
+def train_after(X, y):
+    Xt, preprocessor = features.fit_transform_cached(X)
+    for _ in range(2):
+        search = GridSearchCV(Ridge(), PARAM_GRID, cv=3, n_jobs=1).fit(Xt, y)
+        model = Ridge(**search.best_params_).fit(Xt, y)
+    return Pipeline([("preprocess", preprocessor), ("model", model)])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--models", type=int, default=4, help="Število evalviranih verzij modela.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    df = make_frame(args.rows)
+    X, y = df[features.FEATURES], df[features.TARGET_REGRESSION]
+    test = make_frame(args.rows // 2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        features.FEATURE_CACHE_DIR = tmp
+        model, before_time = timed(lambda: train_before(X, y))
+        _, cold_time = timed(lambda: train_after(X, y))
+        model, warm_time = timed(lambda: train_after(X, y))
+
+        models = [model] * args.models
+        _, eval_before = timed(lambda: [m.predict(test[features.FEATURES]) for m in models])
+        predictions, eval_after = timed(lambda: [features.predict_cached(m, test, data_key="test") for m in models])
+        cache_mb = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)) / 1024 ** 2
+
+    assert np.allclose(predictions[0], model.predict(test[features.FEATURES]), atol=1e-3)
+    print(f"\n{'':>34} | {'čas':>8}")
+    print(f"{'učenje: predprocesor v cevovodu':>34} | {before_time:>7.2f}s")
+    print(f"{'učenje: skupna matrika (prvič)':>34} | {cold_time:>7.2f}s")
+    print(f"{'učenje: skupna matrika (cache)':>34} | {warm_time:>7.2f}s")
+    print(f"{f'evalvacija {args.models} modelov: predict':>34} | {eval_before:>7.2f}s")
+    print(f"{f'evalvacija {args.models} modelov: cache':>34} | {eval_after:>7.2f}s")
+    print(f"\nPredpomnilnik: {cache_mb:.1f} MB (float32)")
+
+if __name__ == "__main__":
+    main()
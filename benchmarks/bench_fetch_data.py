@@ -0,0 +1,49 @@
+"""
+Primerjava časa pridobivanja podatkov za različno število postaj:
+zaporedno (ena postaja na zahtevek, brez vzporednosti) proti sočasnemu načinu
+(več koordinat na zahtevek, omejen bazen niti). Uporablja lokalni Open-Meteo stub.
+
+Zagon: python -m benchmarks.bench_fetch_data
+"""
+import os
+import time
+import tempfile
+
+from benchmarks.openmeteo_stub import OpenMeteoStub
+from src.data.fetch_data import fetch_aqi_data, fetch_weather_data
+from src.data.stations import Station
+
+STATION_COUNTS = [1, 5, 10, 25, 50]
+MODES = {
+    "zaporedno": {"max_workers": 1, "batch_size": 1},
+    "sočasno": {"max_workers": 8, "batch_size": 5},
+}
+
+def make_stations(n, run):
+    # Koordinate zamaknemo glede na zagon, da se izognemo zadetkom v HTTP cache
+    return [Station(f"s{i}", 40.0 + i * 0.01 + run, 10.0 + i * 0.01) for i in range(n)]
+
+def main():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, OpenMeteoStub() as stub:
+        os.chdir(tmp)
+        try:
+            print(f"{'postaje':>8} | " + " | ".join(f"{mode:>10}" for mode in MODES) + " | pohitritev")
+            run = 0
+            for n in STATION_COUNTS:
+                timings = {}
+                for mode, kwargs in MODES.items():
+                    run += 1
+                    stations = make_stations(n, run)
+                    start = time.perf_counter()
+                    df_aqi = fetch_aqi_data(stations, url=stub.url, **kwargs)
+                    df_weather = fetch_weather_data(stations, url=stub.url, **kwargs)
+                    timings[mode] = time.perf_counter() - start
+                    assert df_aqi["station"].nunique() == n and df_weather["station"].nunique() == n
+                speedup = timings["zaporedno"] / timings["sočasno"]
+                print(f"{n:>8} | " + " | ".join(f"{timings[mode]:>9.3f}s" for mode in MODES) + f" | {speedup:>9.1f}x")
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    main()
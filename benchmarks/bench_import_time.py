@@ -0,0 +1,74 @@
+"""
+Čas zagona (uvoza) vstopnih točk, izmerjen s `python -X importtime`.
+Za vsako vstopno točko izpiše skupni čas uvoza in najdražje neposredne odvisnosti.
+Moduli, ki se v tem okolju ne dajo uvoziti (manjkajoče odvisnosti), so označeni z napako.
+
+Zagon: python -m benchmarks.bench_import_time [--repeat 3] [--top 5]
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = [
+    "src.main",
+    "src.data.fetch_data",
+    "src.data.fetch_historic_data",
+    "src.data.merge_data",
+    "src.data.process_data",
+    "src.data.split_data",
+    "src.data.validate_and_test_data",
+    "src.models.train_model",
+    "src.models.evaluate_and_register_model",
+    "src.models.predict_model",
+]
+
+def import_times(module):
+    """Vrne {modul: kumulativni čas v µs} za en uvoz v svežem procesu (brez omrežja ni potrebno nič)."""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        times[name] = max(times.get(name, 0), int(cumulative_us))
+    return times
+
+def top_level(times):
+    """Najdražji paketi prve ravni (npr. pandas, sklearn), ki jih povleče vstopna točka."""
+    packages = {}
+    for name, cumulative in times.items():
+        package = name.split(".")[0]
+        if package in ("src", "encodings"):
+            continue
+        packages[package] = max(packages.get(package, 0), cumulative)
+    return sorted(packages.items(), key=lambda item: -item[1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3, help="Število ponovitev (upošteva se najhitrejša).")
+    parser.add_argument("--top", type=int, default=5, help="Število izpisanih najdražjih odvisnosti.")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    args = parser.parse_args()
+
+    print(f"{'vstopna točka':>40} | {'uvoz':>9} | najdražje odvisnosti")
+    for module in args.modules:
+        try:
+            runs = [import_times(module) for _ in range(args.repeat)]
+        except ImportError as e:
+            print(f"{module:>40} | {'napaka':>9} | {e}")
+            continue
+        best = min(runs, key=lambda times: times[module])
+        heaviest = ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in top_level(best)[:args.top])
+        print(f"{module:>40} | {best[module] / 1000:>7.0f}ms | {heaviest}")
+
+if __name__ == "__main__":
+    main()
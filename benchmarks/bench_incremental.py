@@ -0,0 +1,87 @@
+"""
+Ponovno učenje ob novih urnih podatkih:
+  - prej: vsaka posodobitev nauči modela od začetka na vseh podatkih (z že znanimi najboljšimi parametri),
+  - zdaj: modela nadaljujeta učenje s partial_fit le na vrsticah, dodanih po vodni oznaki (src.models.incremental).
+Po vsaki posodobitvi se oba načina ocenita na naslednjem (še nevidenem) paketu vrstic.
+
+Zagon: python -m benchmarks.bench_incremental [--rows 20000] [--updates 10] [--batch 480]
+"""
+import time
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.neural_network import MLPRegressor, MLPClassifier
+
+from src.data.transform import categorize_aqi
+from src.models.features import FEATURES, build_preprocessor, encode_category
+from src.models.incremental import INCREMENTAL_EPOCHS, continue_training
+
+def make_frame(rows, seed=0):
+    """Časovno urejeni podatki s počasnim premikom razmerja med PM2.5 in PM10."""
+    rng = np.random.default_rng(seed)
+    X = rng.gamma(2.0, 10.0, (rows, len(FEATURES)))
+    drift = np.linspace(1.2, 1.5, rows)
+    pm10 = X[:, 0] * drift + X[:, 4] * 0.2 + rng.normal(0, 2, rows)
+    df = pd.DataFrame(X, columns=FEATURES)
+    df.iloc[rng.random(rows) < 0.01, 1] = np.nan
+    df["pm10"] = pm10
+    df["category"] = categorize_aqi(pm10 * 0.8)
+    return df
+
+def full_fit(df):
+    models = {}
+    for name, estimator, y in (("reg", MLPRegressor(hidden_layer_sizes=(32,), max_iter=1000, random_state=42), df["pm10"].to_numpy()),
+                               ("class", MLPClassifier(hidden_layer_sizes=(32,), max_iter=1000, random_state=42),
+                                encode_category(df["category"]))):
+        models[name] = Pipeline([("preprocess", build_preprocessor()), ("MLP", estimator)]).fit(df[FEATURES], y)
+    return models
+
+def scores(models, df):
+    return (models["reg"].score(df[FEATURES], df["pm10"].to_numpy()),
+            models["class"].score(df[FEATURES], encode_category(df["category"])))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--updates", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=480, help="Nove vrstice na posodobitev (npr. 20 postaj × 24 ur).")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    df = make_frame(args.rows + (args.updates + 1) * args.batch)
+    base = full_fit(df.iloc[:args.rows])
+    full, incremental = dict(base), dict(base)
+    times = {"full": 0.0, "incremental": 0.0}
+    results = {"full": [], "incremental": []}
+
+    print(f"{'posodobitev':>11} | {'celotno (s)':>11} | {'inkr. (s)':>9} | {'R2 celotno':>10} | {'R2 inkr.':>8} | {'acc celotno':>11} | {'acc inkr.':>9}")
+    for step in range(args.updates):
+        end = args.rows + (step + 1) * args.batch
+        new_rows = df.iloc[end - args.batch:end]
+        holdout = df.iloc[end:end + args.batch]
+
+        start = time.perf_counter()
+        full = full_fit(df.iloc[:end])
+        times["full"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        incremental = {"reg": continue_training(incremental["reg"], new_rows[FEATURES], new_rows["pm10"].to_numpy()),
+                       "class": continue_training(incremental["class"], new_rows[FEATURES], encode_category(new_rows["category"]))}
+        times["incremental"] += time.perf_counter() - start
+
+        results["full"].append(scores(full, holdout))
+        results["incremental"].append(scores(incremental, holdout))
+        (r2_full, acc_full), (r2_inc, acc_inc) = results["full"][-1], results["incremental"][-1]
+        print(f"{step + 1:>11} | {times['full']:>11.1f} | {times['incremental']:>9.2f} | {r2_full:>10.3f} | {r2_inc:>8.3f} | {acc_full:>11.3f} | {acc_inc:>9.3f}")
+
+    print(f"\nSkupaj ({args.updates} posodobitev po {args.batch} vrstic, {INCREMENTAL_EPOCHS} prehodov): "
+          f"celotno {times['full']:.1f}s, inkrementalno {times['incremental']:.2f}s "
+          f"({times['full'] / times['incremental']:.0f}×)")
+    for mode in ("full", "incremental"):
+        r2, acc = np.mean(results[mode], axis=0)
+        print(f"  {mode:>11}: povprečni R2 {r2:.3f}, povprečna točnost {acc:.3f}")
+
+if __name__ == "__main__":
+    main()
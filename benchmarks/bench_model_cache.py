@@ -0,0 +1,85 @@
+"""
+Nalaganje modela (Pipeline s predprocesorjem in MLP) po velikosti modela:
+  - prej: mlflow.sklearn.load_model ob vsakem klicu (prenos artefakta in pickle.load; tu le pickle.load z diska,
+    brez omrežja, kar je spodnja meja prejšnje poti),
+  - joblib z diska v celoti oz. s pomnilniško preslikavo (mmap) — iz meritev je določen prag MMAP_MIN_MB,
+  - zdaj: ModelCache — prvič z diska (nad pragom s preslikavo), nato iz pomnilnika procesa.
+
+Zagon: python -m benchmarks.bench_model_cache [--widths 64 256 512 1024] [--repeat 20]
+"""
+import os
+import time
+import pickle
+import argparse
+import tempfile
+import warnings
+from unittest import mock
+
+import joblib
+import numpy as np
+from sklearn.pipeline import Pipeline
+from sklearn.neural_network import MLPRegressor
+
+from src.models.features import FEATURES, build_preprocessor
+from src.models.model_cache import ModelCache, MMAP_MIN_MB
+from benchmarks.bench_incremental import make_frame
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+def measure(df, width, repeat, tmp):
+    model = Pipeline([("preprocess", build_preprocessor()),
+                      ("MLPR", MLPRegressor(hidden_layer_sizes=(width, width), max_iter=2, random_state=42))])
+    model.fit(df[FEATURES], df["pm10"])
+
+    pickle_path = os.path.join(tmp, f"model-{width}.pkl")
+    with open(pickle_path, "wb") as f:
+        pickle.dump(model, f)
+
+    def mlflow_load(uri):
+        with open(pickle_path, "rb") as f:
+            return pickle.load(f)
+
+    cache_dir = os.path.join(tmp, f"cache-{width}")
+    with mock.patch("src.models.model_cache.get_mlflow") as get_mlflow:
+        get_mlflow.return_value.sklearn.load_model.side_effect = mlflow_load
+        ModelCache(cache_dir).get("regression_model", "1")  # Prvi prenos v predpomnilnik
+        path = os.path.join(cache_dir, "regression_model-1.joblib")
+        results = {
+            "pickle": timed(lambda: mlflow_load("models:/regression_model/1"), repeat),
+            "joblib": timed(lambda: joblib.load(path), repeat),
+            "mmap": timed(lambda: joblib.load(path, mmap_mode="r"), repeat),
+            "disk": timed(lambda: ModelCache(cache_dir).get("regression_model", "1"), repeat),
+        }
+        cache = ModelCache(cache_dir)
+        loaded = cache.get("regression_model", "1")
+        results["memory"] = timed(lambda: cache.get("regression_model", "1"), repeat)
+        assert get_mlflow.return_value.sklearn.load_model.call_count == 1
+
+    X = df[FEATURES].head(100)
+    assert np.allclose(model.predict(X), loaded.predict(X))
+    return os.path.getsize(path) / 1024 ** 2, results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--widths", type=int, nargs="+", default=[64, 256, 512, 1024])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    df = make_frame(2000)
+    print(f"Mediana {args.repeat} nalaganj (ms); ModelCache z diska uporabi mmap nad {MMAP_MIN_MB:.0f} MB")
+    print(f"{'MLP':>11} | {'MB':>5} | {'pickle':>7} | {'joblib':>7} | {'mmap':>7} | {'ModelCache disk':>15} | {'pomnilnik':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for width in args.widths:
+            size, r = measure(df, width, args.repeat, tmp)
+            print(f"{f'{width}x{width}':>11} | {size:>5.1f} | {r['pickle']:>7.2f} | {r['joblib']:>7.2f} | {r['mmap']:>7.2f} | "
+                  f"{r['disk']:>15.2f} | {r['memory']:>9.4f}")
+
+if __name__ == "__main__":
+    main()
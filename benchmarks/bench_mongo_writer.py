@@ -0,0 +1,72 @@
+"""
+Shranjevanje napovedi v MongoDB (mongomock kot lokalni nadomestek strežnika):
+  - prej: dokument za vsako vrstico z `input_data.iloc[i][col]` za vsako značilko, nato en insert_many,
+  - zdaj: dokumenti iz celotnih stolpcev, pisanje v paketih z ordered=False.
+Poroča dokumente na sekundo za gradnjo dokumentov, pisanje in skupaj.
+
+Zagon: python -m benchmarks.bench_mongo_writer [--rows 20000] [--chunk-size 1000] [--workers 4]
+"""
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import mongomock
+
+from src.data.transform import AQI_CATEGORIES
+from src.models.clients import insert_documents
+from src.models.features import FEATURES
+from src.models.predict_model import build_prediction_documents
+
+def legacy_documents(input_data, predictions_reg, predictions_class, model_reg, model_class):
+    # Prejšnja pot: Series za vsak dostop do celice
+    timestamp = datetime.now().isoformat()
+    documents = []
+    for i in range(len(predictions_reg)):
+        documents.append({
+            "timestamp": timestamp,
+            "model_regression": model_reg,
+            "model_classification": model_class,
+            "features": {col: float(input_data.iloc[i][col]) for col in input_data.columns},
+            "predicted_pm10": float(predictions_reg[i]),
+            "predicted_category": predictions_class[i],
+        })
+    return documents
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.gamma(2.0, 10.0, (args.rows, len(FEATURES))), columns=FEATURES)
+    pm10 = rng.gamma(2.0, 15.0, args.rows)
+    categories = np.asarray(AQI_CATEGORIES, dtype=object)[rng.integers(0, len(AQI_CATEGORIES), args.rows)]
+
+    collection = mongomock.MongoClient()["aqiPredictions"]["predictions"]
+    before_docs, before_build = timed(lambda: legacy_documents(X, pm10, categories, "1", "1"))
+    _, before_write = timed(lambda: collection.insert_many(before_docs))
+
+    collection = mongomock.MongoClient()["aqiPredictions"]["predictions"]
+    after_docs, after_build = timed(lambda: build_prediction_documents(X, pm10, categories, "1", "1"))
+    (inserted, errors), after_write = timed(lambda: insert_documents(collection, after_docs, args.chunk_size, args.workers))
+    assert inserted == args.rows and errors == 0 and collection.count_documents({}) == args.rows
+    assert [doc["features"] for doc in before_docs] == [doc["features"] for doc in after_docs]
+
+    print(f"{args.rows} dokumentov (paketi po {args.chunk_size}, {args.workers} hkratnih)")
+    print(f"{'':>8} | {'gradnja':>16} | {'pisanje':>16} | {'skupaj':>16}")
+    for name, build, write in (("prej", before_build, before_write), ("zdaj", after_build, after_write)):
+        print(f"{name:>8} | {args.rows / build:>10.0f} dok/s | {args.rows / write:>10.0f} dok/s | "
+              f"{args.rows / (build + write):>10.0f} dok/s")
+    print(f"Skupaj: {before_build + before_write:.2f}s → {after_build + after_write:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Inkrementalni zagon cevovoda (nova ura podatkov na obstoječi zgodovini):
+  - prej: vsaka stopnja v svojem procesu (python -m src.data.merge_data, process_data, split_data),
+  - zdaj: src.main.run_pipeline v enem procesu (particije v pomnilniku, preskakovanje nespremenjenih stopenj),
+  - ponovni zagon brez novih podatkov.
+Pridobivanje je nadomeščeno z vnaprej pripravljenimi podatki, validacija je izklopljena.
+
+Zagon: python -m benchmarks.bench_pipeline [--hours 8760] [--stations 8]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+
+import src.main as pipeline
+from src.data.fetch_data import AQI_COLUMNS, WEATHER_VARIABLES
+from src.data.merge_data import merge_data
+from src.data.process_data import process_data
+from src.data.split_data import split_data
+from src.data.store import AQI_STORE, WEATHER_STORE, MERGED_STORE, PROCESSED_STORE, append
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGE_MODULES = ["src.data.merge_data", "src.data.process_data", "src.data.split_data"]
+
+def make_frame(columns, stations, dates, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"station": np.repeat(stations, len(dates)), "date": np.tile(dates, len(stations))})
+    for col in columns:
+        df[col] = rng.random(len(df)) * 100
+    return df
+
+def prepare(directory, stations, dates):
+    """Zgodovina v shrambah in izhodi vseh stopenj, kot po prejšnjem zagonu."""
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        append(AQI_STORE, make_frame(AQI_COLUMNS, stations, dates, 0))
+        append(WEATHER_STORE, make_frame(WEATHER_VARIABLES, stations, dates, 1))
+        merge_data(AQI_STORE, WEATHER_STORE, MERGED_STORE)
+        process_data(MERGED_STORE, PROCESSED_STORE)
+        split_data(PROCESSED_STORE)
+    finally:
+        os.chdir(cwd)
+
+def run_subprocesses(directory, new_aqi, new_weather):
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        start = time.perf_counter()
+        append(AQI_STORE, new_aqi)
+        append(WEATHER_STORE, new_weather)
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        for module in STAGE_MODULES:
+            subprocess.run([sys.executable, "-m", module], env=env, check=True, capture_output=True)
+        return time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+
+def run_in_process(directory, new_aqi, new_weather):
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        start = time.perf_counter()
+        pipeline.run_pipeline(validate=False)
+        return time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=int, default=8760)
+    parser.add_argument("--stations", type=int, default=8)
+    args = parser.parse_args()
+
+    stations = [f"s{i}" for i in range(args.stations)]
+    dates = pd.date_range("2024-01-01", periods=args.hours + 1, freq="H", tz="UTC")
+    new_aqi = make_frame(AQI_COLUMNS, stations, dates[-1:], 2)
+    new_weather = make_frame(WEATHER_VARIABLES, stations, dates[-1:], 3)
+
+    # Pridobivanje nadomestimo z vnaprej pripravljenimi podatki
+    pipeline.fetch_aqi_data = lambda *args, **kwargs: new_aqi
+    pipeline.fetch_weather_data = lambda *args, **kwargs: new_weather
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "base")
+        os.makedirs(base)
+        prepare(base, stations, dates[:-1])
+
+        separate = os.path.join(tmp, "separate")
+        shutil.copytree(base, separate)
+        subprocess_time = run_subprocesses(separate, new_aqi, new_weather)
+
+        in_process = os.path.join(tmp, "in_process")
+        shutil.copytree(base, in_process)
+        in_process_time = run_in_process(in_process, new_aqi, new_weather)
+        repeat_time = run_in_process(in_process, new_aqi, new_weather)
+
+    print(f"\nzgodovina: {args.hours * args.stations} zapisov, nova ura: {args.stations} zapisov")
+    print(f"{'ločeni procesi':>22}: {subprocess_time:.2f}s")
+    print(f"{'en proces':>22}: {in_process_time:.2f}s")
+    print(f"{'ponovni zagon':>22}: {repeat_time:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Ponovni zagon pridobivanja zgodovine z lokalnim Open-Meteo stubom:
+  - prej: HTTP cache (requests_cache) — brez omrežja, a z vnovičnim dekodiranjem FlatBuffers,
+  - zdaj: ResponseCache z že dekodiranimi polji (mmap).
+
+Zagon: python -m benchmarks.bench_response_cache [--stations 50] [--days 365]
+"""
+import os
+import time
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+import pandas as pd
+import requests_cache
+import openmeteo_requests
+
+from benchmarks.openmeteo_stub import OpenMeteoStub
+from src.data.fetch_data import WEATHER_VARIABLES, decode_response, arrays_to_frame, fetch_stations
+from src.data.response_cache import ResponseCache
+from src.data.stations import Station
+
+def legacy_fetch(url, params, stations):
+    # Prejšnja pot: HTTP cache v SQLite, vsak zadetek se ponovno dekodira
+    client = openmeteo_requests.Client(session=requests_cache.CachedSession(".cache", expire_after=-1))
+    params = dict(params, latitude=[s.latitude for s in stations], longitude=[s.longitude for s in stations])
+    frames = []
+    for station, response in zip(stations, client.weather_api(url, params=params)):
+        time_start, interval, values = decode_response(response, len(WEATHER_VARIABLES))
+        frames.append(arrays_to_frame(time_start, interval, values, WEATHER_VARIABLES, station))
+    return pd.concat(frames, ignore_index=True)
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, default=50)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    end = date(2024, 12, 31)
+    params = {"start_date": (end - timedelta(days=args.days - 1)).isoformat(), "end_date": end.isoformat(),
+              "hourly": WEATHER_VARIABLES}
+    stations = [Station(f"s{i}", 40.0 + i * 0.01, 10.0 + i * 0.01) for i in range(args.stations)]
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, OpenMeteoStub() as stub:
+        os.chdir(tmp)
+        try:
+            cache = ResponseCache(os.path.join(tmp, "openmeteo"))
+            legacy_cold = timed(lambda: legacy_fetch(stub.url, params, stations))
+            legacy_warm = timed(lambda: legacy_fetch(stub.url, params, stations))
+            cold = timed(lambda: fetch_stations(stub.url, params, WEATHER_VARIABLES, stations, cache=cache))
+            requests_before = stub.requests
+            warm = timed(lambda: fetch_stations(stub.url, params, WEATHER_VARIABLES, stations, cache=cache))
+        finally:
+            os.chdir(cwd)
+
+    print(f"{'':>20} | {'prvi zagon':>10} | {'ponovni zagon':>13}")
+    print(f"{'HTTP cache':>20} | {legacy_cold:>9.3f}s | {legacy_warm:>12.3f}s")
+    print(f"{'ResponseCache':>20} | {cold:>9.3f}s | {warm:>12.3f}s")
+    print(f"Zahtevki ob ponovnem zagonu: {stub.requests - requests_before}, statistika: {cache.stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Poraba pomnilnika in čas nalaganja po stopnjah: prejšnji tipi (float64, object 'category',
+razčlenjevanje datumov pri vsakem branju) proti osrednji shemi (src.data.schema).
+
+Zagon: python -m benchmarks.bench_schema [--rows 1000000]
+"""
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+from src.data.schema import FLOAT_COLUMNS, apply_schema, read_csv
+from src.data.store import append, read, partition_labels
+from src.data.transform import categorize_aqi
+
+AQI_COLUMNS = ["pm10", "pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "eu_aqi"]
+WEATHER_COLUMNS = ["temperature_2m", "relative_humidity_2m", "rain", "snowfall", "is_day"]
+
+STAGES = {
+    "aqi (shramba)": ("store", AQI_COLUMNS),
+    "weather (shramba)": ("store", WEATHER_COLUMNS),
+    "merged (shramba)": ("store", AQI_COLUMNS + WEATHER_COLUMNS),
+    "processed (shramba)": ("store", AQI_COLUMNS + WEATHER_COLUMNS + ["category"]),
+    "train/test (CSV)": ("csv", AQI_COLUMNS + WEATHER_COLUMNS + ["category"]),
+}
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    n_stations = 20
+    dates = pd.date_range("2015-01-01", periods=rows // n_stations, freq="H", tz="UTC")
+    df = pd.DataFrame({
+        "station": np.repeat([f"s{i}" for i in range(n_stations)], len(dates)),
+        "date": np.tile(dates, n_stations),
+    })
+    for col in FLOAT_COLUMNS:
+        df[col] = rng.random(len(df)) * 100
+    df["is_day"] = rng.integers(0, 2, len(df)).astype(float)
+    df["category"] = np.asarray(categorize_aqi(df["eu_aqi"]), dtype=object)
+    return df
+
+def timed(func):
+    start = time.perf_counter()
+    df = func()
+    return df, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    legacy_frame = make_frame(args.rows)
+    print(f"{'stopnja':>20} | {'pomnilnik prej':>14} | {'pomnilnik zdaj':>14} | {'nalaganje prej':>14} | {'nalaganje zdaj':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for stage, (kind, columns) in STAGES.items():
+            df = legacy_frame[["station", "date"] + columns]
+            if kind == "store":
+                # Prej: enake mesečne particije v float64/object, brane po particijah in združene v pandas
+                legacy_paths = []
+                for label, df_part in df.groupby(partition_labels(df["date"])):
+                    legacy_paths.append(os.path.join(tmp, f"{len(columns)}_{label}.parquet"))
+                    df_part.to_parquet(legacy_paths[-1], index=False)
+                store_path = os.path.join(tmp, f"{len(columns)}_store")
+                append(store_path, df)
+                before, before_time = timed(lambda: pd.concat([pd.read_parquet(path) for path in legacy_paths], ignore_index=True))
+                after, after_time = timed(lambda: read(store_path))
+            else:
+                csv_path = os.path.join(tmp, "train.csv")
+                apply_schema(df).to_csv(csv_path, index=False)
+                before, before_time = timed(lambda: pd.read_csv(csv_path, parse_dates=["date"]))
+                after, after_time = timed(lambda: read_csv(csv_path))
+
+            before_mb = before.memory_usage(deep=True).sum() / 1024 ** 2
+            after_mb = after.memory_usage(deep=True).sum() / 1024 ** 2
+            print(f"{stage:>20} | {before_mb:>11.1f} MB | {after_mb:>11.1f} MB | {before_time:>13.3f}s | {after_time:>13.3f}s")
+
+if __name__ == "__main__":
+    main()
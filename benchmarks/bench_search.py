@@ -0,0 +1,67 @@
+"""
+Iskanje hiperparametrov regresijskega in klasifikacijskega modela:
+  - prej: dva zaporedna GridSearchCV (vsak z n_jobs=-1) in dve ponovni učenji končnih modelov,
+  - zdaj: skupen bazen procesov za obe nalogi, izčrpno ali z zaporednim prepolovljenjem (vir so epohe),
+    najboljša kandidata iz iskanja sta končna modela.
+Izpiše čas in oceno končnih modelov na testnem delu.
+
+Zagon: python -m benchmarks.bench_search [--rows 50000]
+"""
+import time
+import argparse
+import warnings
+import numpy as np
+from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.neural_network import MLPRegressor, MLPClassifier
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.data.transform import AQI_CATEGORIES, categorize_aqi
+from src.models.search import run_searches
+
+PARAM_GRID = {"hidden_layer_sizes": [(32,), (16,)], "learning_rate_init": [0.001, 0.01]}
+
+def make_data(rows):
+    rng = np.random.default_rng(0)
+    X = rng.gamma(2.0, 10.0, (rows, 9))
+    pm10 = X[:, 0] * 1.3 + X[:, 4] * 0.2 + rng.normal(0, 2, rows)
+    encoder = OneHotEncoder(categories=[AQI_CATEGORIES], handle_unknown="ignore", sparse_output=False)
+    y_class = encoder.fit_transform(np.asarray(categorize_aqi(pm10 * 0.8), dtype=object).reshape(-1, 1))
+    return StandardScaler().fit_transform(X).astype(np.float32), pm10, y_class
+
+def before(X, y_reg, y_class):
+    models = []
+    for estimator, y in ((MLPRegressor(max_iter=500, random_state=42), y_reg),
+                         (MLPClassifier(max_iter=500, random_state=42), y_class)):
+        search = GridSearchCV(estimator, PARAM_GRID, cv=3, n_jobs=-1).fit(X, y)
+        models.append(type(estimator)(max_iter=1000, random_state=42, **search.best_params_).fit(X, y))
+    return models
+
+def after(X, y_reg, y_class, halving):
+    searches = run_searches({
+        "reg": {"estimator": MLPRegressor(max_iter=1000, random_state=42), "param_grid": PARAM_GRID, "y": y_reg},
+        "class": {"estimator": MLPClassifier(max_iter=1000, random_state=42), "param_grid": PARAM_GRID, "y": y_class},
+    }, X, halving=halving, resource="max_iter", min_resources=50, verbose=False)
+    return [searches["reg"]["best_estimator"], searches["class"]["best_estimator"]]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    X, y_reg, y_class = make_data(args.rows)
+    X_train, X_test, y_train_reg, y_test_reg, y_train_class, y_test_class = train_test_split(
+        X, y_reg, y_class, test_size=0.2, random_state=42)
+
+    print(f"{'':>34} | {'čas':>8} | {'R2 test':>7} | {'točnost test':>12}")
+    for name, run in (("2× GridSearchCV + ponovno učenje", lambda: before(X_train, y_train_reg, y_train_class)),
+                      ("skupen bazen, izčrpno", lambda: after(X_train, y_train_reg, y_train_class, False)),
+                      ("skupen bazen, prepolovljenje", lambda: after(X_train, y_train_reg, y_train_class, True))):
+        start = time.perf_counter()
+        regressor, classifier = run()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>34} | {elapsed:>7.1f}s | {regressor.score(X_test, y_test_reg):>7.3f} | "
+              f"{classifier.score(X_test, y_test_class):>12.3f}")
+
+if __name__ == "__main__":
+    main()
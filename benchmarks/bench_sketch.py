@@ -0,0 +1,60 @@
+"""
+Točnost in prepustnost kvantilne skice (TDigest) v primerjavi z natančno mediano.
+Zgodovino dodajamo v paketih (kot 30-minutni zagoni); po vsakem paketu primerjamo:
+  - skico: update(paket) + median()
+  - natančno: pd.Series(cela zgodovina).median()
+Poročamo relativno napako mediane, napako ranga in skupni čas.
+
+Zagon: python -m benchmarks.bench_sketch [--rows 100000 1000000] [--batch 400]
+"""
+import time
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+from src.data.sketch import TDigest
+
+DISTRIBUTIONS = {
+    "normal": lambda rng, n: rng.normal(20, 5, n),
+    "lognormal": lambda rng, n: rng.lognormal(3, 0.8, n),
+    "uniform": lambda rng, n: rng.uniform(0, 100, n),
+}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="*", default=[100_000, 1_000_000])
+    parser.add_argument("--batch", type=int, default=400)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'porazdelitev':>12} | {'vrstice':>9} | {'rel. napaka':>11} | {'napaka ranga':>12} | {'skica':>8} | {'natančno':>9} | {'stanje':>7}")
+    for rows in args.rows:
+        for name, generate in DISTRIBUTIONS.items():
+            values = generate(rng, rows)
+            batches = np.array_split(values, max(1, rows // args.batch))
+
+            sketch = TDigest()
+            start = time.perf_counter()
+            for batch in batches:
+                sketch.update(batch)
+                estimate = sketch.median()
+            sketch_time = time.perf_counter() - start
+
+            # Natančna mediana po vsakem zagonu zahteva celotno zgodovino; merimo na vzorcu zagonov
+            sample = batches[:: max(1, len(batches) // 20)]
+            start = time.perf_counter()
+            seen = 0
+            for batch in sample:
+                seen += len(batch) * max(1, len(batches) // 20)
+                pd.Series(values[:seen]).median()
+            exact_time = (time.perf_counter() - start) * len(batches) / len(sample)
+
+            exact = float(np.median(values))
+            rank_error = abs(np.searchsorted(np.sort(values), estimate) / rows - 0.5)
+            state_size = len(json.dumps(sketch.to_dict()))
+            print(f"{name:>12} | {rows:>9} | {abs(estimate - exact) / abs(exact):>11.2e} | {rank_error:>12.2e} | "
+                  f"{sketch_time:>7.2f}s | {exact_time:>8.2f}s | {state_size / 1024:>5.1f}kB")
+
+if __name__ == "__main__":
+    main()
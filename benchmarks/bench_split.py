@@ -0,0 +1,86 @@
+"""
+Delitev train/test:
+  - prej: zapis celotnih train/test CSV kopij in nalaganje z read_csv,
+  - zdaj: manifest delitve (meja in obsegi vrstic) in nalaganje rezin iz obdelane shrambe.
+Izpiše čas delitve, porabo diska, čas nalaganja obeh delov in čas izdelave časovnih pregibov.
+
+Zagon: python -m benchmarks.bench_split [--rows 2000000] [--folds 5]
+"""
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+from src.data import splits
+from src.data.schema import FLOAT_COLUMNS, read_csv
+from src.data.split_data import split_data
+from src.data.store import PROCESSED_STORE, append
+from src.data.transform import categorize_aqi
+
+N_STATIONS = 20
+TRAIN_PATH = os.path.join("csv", "train", "train_data.csv")
+TEST_PATH = os.path.join("csv", "test", "test_data.csv")
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2015-01-01", periods=rows // N_STATIONS, freq="H", tz="UTC")
+    df = pd.DataFrame({
+        "station": np.repeat([f"s{i}" for i in range(N_STATIONS)], len(dates)),
+        "date": np.tile(dates, N_STATIONS),
+    })
+    for col in FLOAT_COLUMNS:
+        df[col] = rng.random(len(df)) * 100
+    df["is_day"] = rng.integers(0, 2, len(df))
+    df["category"] = categorize_aqi(df["eu_aqi"])
+    return df
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def disk_mb(*paths):
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path)) / 1024 ** 2
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--folds", type=int, default=5)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            append(PROCESSED_STORE, make_frame(args.rows))
+
+            _, csv_split = timed(lambda: split_data(PROCESSED_STORE, TRAIN_PATH, TEST_PATH))
+            csv_disk = disk_mb(TRAIN_PATH, TEST_PATH)
+            (train_csv, test_csv), csv_load = timed(lambda: (read_csv(TRAIN_PATH), read_csv(TEST_PATH)))
+
+            os.remove(splits.SPLIT_MANIFEST_PATH)
+            _, manifest_split = timed(lambda: split_data(PROCESSED_STORE))
+            manifest_disk = disk_mb(splits.SPLIT_MANIFEST_PATH)
+            (train, test), manifest_load = timed(lambda: (splits.load_split("train"), splits.load_split("test")))
+
+            manifest = splits.load_manifest()
+            _, folds_time = timed(lambda: splits.add_folds(manifest, args.folds, "rolling"))
+            fold = manifest["folds"]["folds"][-1]
+            _, fold_load = timed(lambda: splits.load_rows(fold["train"], manifest=manifest))
+        finally:
+            os.chdir(cwd)
+
+    assert len(train) == len(train_csv) and len(test) == len(test_csv)
+    # CSV je urejen le po datumu, zato primerjamo po ključu (datum, postaja)
+    key = ["date", "station"]
+    assert np.allclose(train.sort_values(key)["pm10"].to_numpy(), train_csv.sort_values(key)["pm10"].to_numpy())
+
+    print(f"\n{'':>20} | {'delitev':>8} | {'disk':>9} | {'nalaganje':>9}")
+    print(f"{'CSV kopije':>20} | {csv_split:>7.2f}s | {csv_disk:>6.1f} MB | {csv_load:>8.2f}s")
+    print(f"{'manifest':>20} | {manifest_split:>7.2f}s | {manifest_disk * 1024:>6.1f} KB | {manifest_load:>8.2f}s")
+    print(f"\n{args.folds} rolling pregibov: {folds_time * 1000:.2f} ms, nalaganje zadnjega učnega pregiba: {fold_load:.2f}s")
+
+if __name__ == "__main__":
+    main()
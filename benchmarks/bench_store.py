@@ -0,0 +1,71 @@
+"""
+Cena enega 30-minutnega zagona (dodajanje 48 ur za 8 postaj) v odvisnosti od velikosti zgodovine:
+prejšnji pristop (preberi cel CSV, množica datumov, concat, dedupe, prepiši) proti
+particionirani Parquet shrambi, ki prepiše le prizadeto particijo.
+
+Zagon: python -m benchmarks.bench_store [--sizes 1000 100000 10000000]
+"""
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+from src.data.store import append
+
+COLUMNS = ["pm10", "pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "eu_aqi"]
+
+def make_frame(stations, start, hours, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=hours, freq="H", tz="UTC")
+    df = pd.DataFrame({
+        "station": np.repeat(stations, hours),
+        "date": np.tile(dates, len(stations)),
+    })
+    for col in COLUMNS:
+        df[col] = rng.random(len(df)) * 100
+    return df
+
+def make_history(rows):
+    n_stations = min(100, max(1, rows // 8760))
+    stations = [f"s{i}" for i in range(n_stations)]
+    return make_frame(stations, "2015-01-01", rows // n_stations), stations
+
+def csv_append(df_new, filepath):
+    """Prejšnji pristop iz fetch_data.update_or_append_csv."""
+    existing_df = pd.read_csv(filepath, parse_dates=["date"])
+    existing_dates = set(existing_df["date"].dt.date)
+    df_new_filtered = df_new[~df_new["date"].dt.date.isin(existing_dates)]
+    combined_df = pd.concat([existing_df, df_new_filtered]).drop_duplicates(subset=["station", "date"], keep="last")
+    combined_df.to_csv(filepath, index=False)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1_000, 100_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"{'zgodovina':>10} | {'CSV':>9} | {'Parquet':>9} | pohitritev")
+    for rows in args.sizes:
+        history, stations = make_history(rows)
+        run_start = history["date"].max() + pd.Timedelta(hours=1)
+        df_run = make_frame(stations[:8], run_start, 48, seed=1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "history.csv")
+            store_path = os.path.join(tmp, "store")
+            history.to_csv(csv_path, index=False)
+            append(store_path, history)
+
+            start = time.perf_counter()
+            csv_append(df_run.copy(), csv_path)
+            csv_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            append(store_path, df_run)
+            store_time = time.perf_counter() - start
+
+        print(f"{rows:>10} | {csv_time:>8.3f}s | {store_time:>8.3f}s | {csv_time / store_time:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Mikro-primerjava kategorizacije 'eu_aqi' in zapolnjevanja manjkajočih vrednosti:
+  - prejšnji pristop: Series.apply(if/elif) in fillna(inplace=True) po stolpcih
+  - vektorski pristop: src.data.transform.categorize_aqi in fill_missing
+Prejšnji pristop se meri le do --legacy-max vrstic (pri 1e8 bi trajal predolgo).
+
+Zagon: python -m benchmarks.bench_transform [--sizes 1000000 10000000 100000000]
+"""
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from src.data.transform import categorize_aqi, fill_missing
+
+FILL_COLUMNS = ["pm10", "pm2_5", "temperature_2m", "eu_aqi"]
+
+def categorize_aqi_legacy(aqi):
+    if aqi <= 20:
+        return "good"
+    elif aqi <= 40:
+        return "fair"
+    elif aqi <= 60:
+        return "moderate"
+    elif aqi <= 80:
+        return "poor"
+    elif aqi <= 100:
+        return "very poor"
+    else:
+        return "extremely poor"
+
+def fill_legacy(df, fill_values):
+    for col, value in fill_values.items():
+        if df[col].isnull().any():
+            df[col].fillna(value, inplace=True)
+    return df
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1_000_000, 10_000_000, 100_000_000])
+    parser.add_argument("--legacy-max", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'vrstice':>11} | {'apply':>8} | {'vektorsko':>9} | {'fillna':>8} | {'vektorsko':>9}")
+    for rows in args.sizes:
+        # Meritve so v shrambi float32 (src.data.schema)
+        df = pd.DataFrame({col: rng.uniform(0, 150, rows).astype(np.float32) for col in FILL_COLUMNS})
+        df.iloc[rng.integers(0, rows, rows // 100), :] = np.nan
+        fill_values = {col: 50.0 for col in FILL_COLUMNS}
+
+        filled, fill_time = timed(fill_missing, df, fill_values)
+        categories, cat_time = timed(categorize_aqi, filled["eu_aqi"])
+        assert (filled.dtypes == np.float32).all() and not filled.isna().any().any()
+
+        if rows <= args.legacy_max:
+            legacy_filled, legacy_fill_time = timed(fill_legacy, df.copy(), fill_values)
+            legacy_categories, legacy_cat_time = timed(lambda s: s.apply(categorize_aqi_legacy), legacy_filled["eu_aqi"])
+            assert (legacy_categories.to_numpy() == np.asarray(categories, dtype=object)).all()
+            legacy = (f"{legacy_cat_time:>7.2f}s", f"{legacy_fill_time:>7.2f}s")
+        else:
+            legacy = (f"{'-':>8}", f"{'-':>8}")
+
+        print(f"{rows:>11} | {legacy[0]} | {cat_time:>8.3f}s | {legacy[1]} | {fill_time:>8.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Ponovna učenja s shrambo poskusov (src.models.trials):
+  - prej: vsako učenje znova oceni celotno mrežo hiperparametrov,
+  - zdaj: ocene pregibov na enakih podatkih se vzamejo iz shrambe, pri nekaj novih urah podatkov
+    pa se iskanje preskoči (topel začetek s prejšnjimi najboljšimi parametri).
+Zaporedje: prvo učenje, ponovno učenje na enakih podatkih, učenje z 1 % novih vrstic.
+
+Zagon: python -m benchmarks.bench_trials [--rows 10000]
+"""
+import time
+import argparse
+import tempfile
+import warnings
+from sklearn.neural_network import MLPRegressor, MLPClassifier
+
+from src.models.search import run_searches
+from src.models.trials import TrialStore
+from benchmarks.bench_search import PARAM_GRID, make_data
+
+def search(X, y_reg, y_class, store=None, data_key=None, warm_start=None):
+    return run_searches({
+        "reg": {"estimator": MLPRegressor(max_iter=1000, random_state=42), "param_grid": PARAM_GRID, "y": y_reg},
+        "class": {"estimator": MLPClassifier(max_iter=1000, random_state=42), "param_grid": PARAM_GRID, "y": y_class},
+    }, X, resource="max_iter", min_resources=50, verbose=False, store=store, data_key=data_key, warm_start=warm_start)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    X, y_reg, y_class = make_data(int(args.rows * 1.01))
+    runs = [("prvo učenje", args.rows), ("enaki podatki", args.rows), ("+1 % vrstic", len(X))]
+
+    print(f"{'':>16} | {'brez shrambe':>12} | {'s shrambo':>10} | najboljši parametri (reg)")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TrialStore(tmp)
+        for name, n in runs:
+            start = time.perf_counter()
+            search(X[:n], y_reg[:n], y_class[:n])
+            before = time.perf_counter() - start
+
+            start = time.perf_counter()
+            warm = {task: best for task in ("reg", "class") if (best := store.warm_start(task, n, f"rows:{n}")) is not None}
+            result = search(X[:n], y_reg[:n], y_class[:n], store, f"rows:{n}", warm)
+            for task, summary in result.items():
+                if task not in warm:
+                    store.save_best(task, summary["best_params"], summary["best_score"], n, f"rows:{n}")
+            after = time.perf_counter() - start
+            print(f"{name:>16} | {before:>11.1f}s | {after:>9.1f}s | {result['reg']['best_params']}")
+        print(f"\nShramba: {store.stats}")
+
+if __name__ == "__main__":
+    main()
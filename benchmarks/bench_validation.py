@@ -0,0 +1,91 @@
+"""
+Čas validacije v odvisnosti od dolžine zgodovine:
+  - lastni pogon nad novo particijo (branje novih zapisov iz shrambe + preverjanje),
+  - lastni pogon nad celotno zgodovino,
+  - referenca po vzoru PandasDataset (pretvorba v object, preverjanje po elementih) nad celotno zgodovino.
+
+Zagon: python -m benchmarks.bench_validation [--sizes 100000 1000000 5000000]
+"""
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+from src.data import validate_and_test_data
+from src.data.expectations import AQI_EXPECTATIONS, validate
+from src.data.schema import FLOAT_COLUMNS
+from src.data.store import PROCESSED_STORE, append, read
+from src.data.transform import categorize_aqi
+from src.data.watermark import save_watermark, advance_marks
+
+N_STATIONS = 50
+
+def make_frame(dates, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "station": np.repeat([f"s{i}" for i in range(N_STATIONS)], len(dates)),
+        "date": np.tile(dates, N_STATIONS),
+    })
+    for col in FLOAT_COLUMNS:
+        df[col] = rng.random(len(df)) * 100
+    df["is_day"] = rng.integers(0, 2, len(df))
+    df["category"] = categorize_aqi(df["eu_aqi"])
+    return df
+
+def reference_validate(df):
+    """Preverjanje po elementih nad object stolpci, kot ga izvaja PandasDataset."""
+    results = []
+    for config in AQI_EXPECTATIONS:
+        kwargs = config["kwargs"]
+        if config["expectation_type"] == "expect_column_to_exist":
+            results.append(kwargs["column"] in df.columns)
+            continue
+        series = df[kwargs["column"]].astype(object)
+        if config["expectation_type"] == "expect_column_values_to_not_be_null":
+            results.append(not series.map(pd.isna).any())
+        elif config["expectation_type"] == "expect_column_values_to_be_between":
+            values = series[~series.map(pd.isna)]
+            results.append(values.map(lambda v: kwargs["min_value"] <= v <= kwargs["max_value"]).all())
+        else:
+            results.append(series.map(lambda v: v in kwargs["value_set"]).all())
+    return all(results)
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="*", default=[100_000, 1_000_000, 5_000_000])
+    args = parser.parse_args()
+
+    print(f"{'zgodovina':>10} | {'nova particija':>14} | {'vsa zgodovina':>13} | {'PandasDataset-slog':>18}")
+    cwd = os.getcwd()
+    for rows in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                hours = rows // N_STATIONS
+                dates = pd.date_range("2015-01-01", periods=hours + 1, freq="H", tz="UTC")
+                history = make_frame(dates[:-1], 0)
+                append(PROCESSED_STORE, history)
+                save_watermark(validate_and_test_data.STAGE, {"stations": advance_marks({}, history)})
+                append(PROCESSED_STORE, make_frame(dates[-1:], 1))
+
+                def validate_partition():
+                    df_new, _ = validate_and_test_data.validate_new_rows()
+                    assert validate(df_new)["success"]
+
+                partition_ms = timed(validate_partition)
+                full = read(PROCESSED_STORE)
+                full_ms = timed(lambda: validate(full))
+                reference_ms = timed(lambda: reference_validate(full))
+            finally:
+                os.chdir(cwd)
+        print(f"{rows:>10} | {partition_ms:>11.1f} ms | {full_ms:>10.1f} ms | {reference_ms:>15.1f} ms")
+
+if __name__ == "__main__":
+    main()
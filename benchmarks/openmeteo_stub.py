@@ -0,0 +1,116 @@
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import flatbuffers
+import numpy as np
+
+def _values(query, key):
+    """Vrne vrednosti parametra; podpira ponovljene ključe in vrednosti, ločene z vejico."""
+    values = []
+    for value in query.get(key, []):
+        values.extend(v for v in value.split(",") if v)
+    return values
+
+def build_response(latitude, longitude, start, hours, n_variables, seed=0):
+    """
+    Sestavi en Open-Meteo FlatBuffers odgovor (z dolžinsko predpono) s sintetičnimi urnimi podatki.
+    Številke polj ustrezajo tabelam WeatherApiResponse / VariablesWithTime / VariableWithValues.
+    """
+    rng = np.random.default_rng(seed)
+    builder = flatbuffers.Builder(1024)
+
+    variables = []
+    for _ in range(n_variables):
+        values = builder.CreateNumpyVector((rng.random(hours) * 100).astype(np.float32))
+        builder.StartObject(4)
+        builder.PrependUOffsetTRelativeSlot(3, values, 0)
+        variables.append(builder.EndObject())
+
+    builder.StartVector(4, len(variables), 4)
+    for offset in reversed(variables):
+        builder.PrependUOffsetTRelative(offset)
+    variables_vector = builder.EndVector()
+
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, start, 0)
+    builder.PrependInt64Slot(1, start + hours * 3600, 0)
+    builder.PrependInt32Slot(2, 3600, 0)
+    builder.PrependUOffsetTRelativeSlot(3, variables_vector, 0)
+    hourly = builder.EndObject()
+
+    builder.StartObject(12)
+    builder.PrependFloat32Slot(0, latitude, 0.0)
+    builder.PrependFloat32Slot(1, longitude, 0.0)
+    builder.PrependUOffsetTRelativeSlot(11, hourly, 0)
+    builder.Finish(builder.EndObject())
+
+    payload = bytes(builder.Output())
+    return len(payload).to_bytes(4, byteorder="little") + payload
+
+class OpenMeteoStub:
+    """
+    Lokalni HTTP strežnik, ki posnema Open-Meteo (AQI in arhivski endpoint).
+    Vsak zahtevek zakasni za `latency` + `latency_per_location` * število koordinat.
+    """
+
+    def __init__(self, latency=0.05, latency_per_location=0.002):
+        self.latency = latency
+        self.latency_per_location = latency_per_location
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                latitudes = [float(v) for v in _values(query, "latitude")]
+                longitudes = [float(v) for v in _values(query, "longitude")]
+                n_variables = len(_values(query, "hourly"))
+
+                if "start_date" in query:
+                    start = date.fromisoformat(query["start_date"][0])
+                    end = date.fromisoformat(query["end_date"][0])
+                    hours = ((end - start).days + 1) * 24
+                    start_ts = int(time.mktime(start.timetuple()))
+                else:
+                    hours = (int(query.get("past_days", ["0"])[0]) + int(query.get("forecast_days", ["1"])[0])) * 24
+                    start_ts = int(time.time()) // 86400 * 86400
+
+                with stub._lock:
+                    stub.requests += 1
+                time.sleep(stub.latency + stub.latency_per_location * len(latitudes))
+
+                body = b"".join(
+                    build_response(lat, lon, start_ts, hours, n_variables, seed=i)
+                    for i, (lat, lon) in enumerate(zip(latitudes, longitudes))
+                )
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
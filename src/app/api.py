@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from src.models.compiled import CompiledModels
+from src.models.features import FEATURES, decode_category
+from src.models.model_cache import DEFAULT_POLL_SECONDS, ProductionPoller
+
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+
+# Mikro-paketi: sočasni zahtevki se združijo v en klic predict (največ MAX_BATCH_SIZE vrstic,
+# prvi zahtevek v paketu čaka največ MAX_WAIT_MS)
+MAX_BATCH_SIZE = int(os.getenv("API_MAX_BATCH_SIZE", "64"))
+MAX_WAIT_MS = float(os.getenv("API_MAX_WAIT_MS", "5"))
+
+MODEL_NAMES = {"regression": "regression_model", "classification": "classification_model"}
+
+def load_models(poll_seconds=DEFAULT_POLL_SECONDS):
+    """
+    Produkcijska modela iz lokalnega predpomnilnika modelov (ob zagonu register ni nujen).
+    Vrne funkcijo, ki vrne trenutna modela; nit v ozadju ju zamenja, ko se v registru spremeni produkcijska verzija.
+    """
+    poller = ProductionPoller(MODEL_NAMES.values(), interval=poll_seconds).start()
+    if any(model_name not in poller.current() for model_name in MODEL_NAMES.values()):
+        poller.stop()
+        raise RuntimeError("Produkcijska modela nista na voljo.")
+
+    compiled = {}
+
+    def current_models():
+        current = poller.current()
+        models = {**{name: current[model_name][0] for name, model_name in MODEL_NAMES.items()},
+                  "versions": {name: current[model_name][1] for name, model_name in MODEL_NAMES.items()}}
+        # Izvoz v NumPy (enkrat za vsak par verzij); ob nepodprtem modelu ostane pot prek scikit-learn
+        key = tuple(models["versions"].values())
+        if key not in compiled:
+            try:
+                compiled[key] = compile_models(models)
+            except Exception as e:
+                print(f"⚠️ Modelov ni mogoče izvoziti v NumPy ({e}); uporabljam scikit-learn.")
+                compiled[key] = None
+        return dict(models, compiled=compiled[key])
+    return current_models
+
+def compile_models(models):
+    """NumPy izvedba obeh modelov s skupnim predprocesiranjem."""
+    return CompiledModels.from_pipelines({name: models[name] for name in MODEL_NAMES}, models.get("versions"))
+
+def predict_batch(models, rows):
+    """
+    Napovedi PM10 in kategorije za seznam vrstic (slovarjev značilk) z enim vektoriziranim klicem vsakega modela.
+    Vsaka napoved vsebuje verziji modelov, ki sta jo izračunala.
+    """
+    if models.get("compiled") is not None:
+        # Izvožena modela: ena matrika značilk in skupno dopolnjevanje manjkajočih vrednosti, brez DataFrame
+        predictions = models["compiled"].predict([[row[feature] for feature in FEATURES] for row in rows])
+        pm10, categories = predictions["pm10"], predictions["category"]
+    else:
+        X = pd.DataFrame.from_records(rows, columns=FEATURES).astype("float64")
+        pm10 = np.asarray(models["regression"].predict(X), dtype="float64").ravel()
+        classifier = models["classification"]
+        # Klasifikator je naučen na one-hot kategorijah; verjetnosti določijo kategorijo tudi, ko ni izbrana nobena
+        encoded = classifier.predict_proba(X) if hasattr(classifier, "predict_proba") else classifier.predict(X)
+        categories = decode_category(encoded)
+    versions = models.get("versions", {})
+    return [{"pm10": float(value), "category": str(category), "model_regression": versions.get("regression"),
+             "model_classification": versions.get("classification")} for value, category in zip(pm10, categories)]
+
+class MicroBatcher:
+    """
+    Združuje sočasne posamezne zahtevke v pakete za en klic `predict_fn(seznam vrstic)`.
+    - Paket se pošlje, ko doseže `max_batch_size` vrstic ali ko prvi zahtevek čaka `max_wait_ms`.
+    - Napovedi teče ena nit, zato se modeli ne kličejo sočasno.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = {"requests": 0, "batches": 0, "max_batch": 0}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        """Doda vrstico v naslednji paket; vrne Future z rezultatom."""
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def predict(self, row, timeout=None):
+        return self.submit(row).result(timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        self.stats["requests"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        try:
+            results = self.predict_fn([row for row, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+def parse_row(payload):
+    """Vrstica značilk iz JSON objekta; manjkajoče vrednosti (null) dopolni predprocesor modela."""
+    if not isinstance(payload, dict):
+        raise ValueError("Pričakovan je JSON objekt z značilkami.")
+    missing = [feature for feature in FEATURES if feature not in payload]
+    if missing:
+        raise ValueError(f"Manjkajoče značilke: {', '.join(missing)}")
+    return {feature: np.nan if payload[feature] is None else float(payload[feature]) for feature in FEATURES}
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """
+    POST /predict: {značilke} ali {"instances": [{značilke}, ...]} → PM10 in kategorija za vsako vrstico.
+    GET /health: verziji modelov in statistika paketov.
+    """
+    protocol_version = "HTTP/1.1"
+    # Glava in telo odgovora sta ločena zapisa; brez Naglovega algoritma drugi ne čaka na potrditev prvega
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._send(404, {"error": "Ni najdeno."})
+        self._send(200, {"status": "ok", "models": self.server.models().get("versions"), "batching": self.server.batcher.stats})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            return self._send(404, {"error": "Ni najdeno."})
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+            instances = payload.get("instances") if isinstance(payload, dict) and "instances" in payload else [payload]
+            rows = [parse_row(instance) for instance in instances]
+        except (ValueError, TypeError, AttributeError) as e:
+            return self._send(400, {"error": str(e)})
+
+        try:
+            futures = [self.server.batcher.submit(row) for row in rows]
+            predictions = [future.result() for future in futures]
+        except Exception as e:
+            return self._send(500, {"error": f"Napaka pri napovedi: {e}"})
+        self._send(200, predictions[0] if len(predictions) == 1 and "instances" not in payload else {"predictions": predictions})
+
+    def log_message(self, format, *args):
+        # Dnevnik vsakega zahtevka bi pri veliki obremenitvi prevladal nad časom odgovora
+        pass
+
+class PredictionServer(ThreadingHTTPServer):
+    # Vsak zahtevek v svoji niti; večja vrsta čakajočih povezav za veliko sočasnih odjemalcev
+    daemon_threads = True
+    request_queue_size = 128
+
+def create_server(models, host=API_HOST, port=API_PORT, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+    """
+    HTTP strežnik nad naloženima modeloma (vsak zahtevek v svoji niti, napovedi v skupnih mikro-paketih).
+    `models`: slovar modelov ali funkcija, ki vrne trenutna modela (zamenjava modelov med delovanjem).
+    """
+    server = PredictionServer((host, port), PredictionHandler)
+    server.models = models if callable(models) else (lambda: models)
+    # Vsak paket vzame trenutna modela, zato zamenjava ne ustavi strežbe
+    server.batcher = MicroBatcher(lambda rows: predict_batch(server.models(), rows), max_batch_size, max_wait_ms)
+    return server
+
+def serve(host=API_HOST, port=API_PORT, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS,
+          poll_seconds=DEFAULT_POLL_SECONDS):
+    models = load_models(poll_seconds)
+    server = create_server(models, host, port, max_batch_size, max_wait_ms)
+    print(f"🚀 Storitev za napovedi teče na http://{host}:{server.server_port} "
+          f"(modela {models()['versions']}, paketi do {max_batch_size} vrstic / {max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP storitev za napovedi PM10 in kategorije.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE, help="Največ vrstic v enem mikro-paketu.")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS, help="Največje čakanje na zapolnitev paketa.")
+    parser.add_argument("--poll-seconds", type=float, default=DEFAULT_POLL_SECONDS,
+                        help="Kako pogosto preveriti produkcijsko verzijo modelov v registru.")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.max_batch_size, args.max_wait_ms, args.poll_seconds)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from src.data.schema import FLOAT_COLUMNS, FLAG_COLUMNS
+from src.data.sketch import TDigest
+from src.data.store import list_partitions, partition_bounds, read, to_utc
+from src.data.watermark import load_watermark, file_signature
+
+# Referenčni profili: meje razredov (skupne vsem profilom) in profil vsake particije obdelane shrambe
+PROFILE_DIR = os.path.join("data", "profiles")
+EDGES_PATH = os.path.join(PROFILE_DIR, "edges.json")
+PARTITION_PROFILE_DIR = os.path.join(PROFILE_DIR, "partitions")
+
+DRIFT_COLUMNS = FLOAT_COLUMNS + FLAG_COLUMNS
+N_BINS = 64
+KS_P_VALUE = 0.05
+PSI_THRESHOLD = 0.2
+# Delež stolpcev z zaznanim premikom, pri katerem velja, da je premaknjen celoten nabor (kot v evidently)
+DATASET_DRIFT_SHARE = 0.5
+
+class HistogramProfile:
+    """
+    Profil stolpca: histogram s fiksnimi mejami in dvema odprtima robnima razredoma ter število manjkajočih.
+    Profile z enakimi mejami je mogoče združevati (seštevanje števcev), zato jih hranimo po particijah
+    in iz njih sestavimo poljubno (npr. drsečo) referenčno okno.
+    """
+
+    def __init__(self, edges, counts=None, missing=0):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self.missing = int(missing)
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        present = values[~np.isnan(values)]
+        self.missing += values.size - present.size
+        self.counts += np.bincount(np.searchsorted(self.edges, present, side="right"), minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        self.counts = self.counts + other.counts
+        self.missing += other.missing
+        return self
+
+    def cdf(self):
+        """Empirična porazdelitvena funkcija v notranjih mejah razredov."""
+        return np.cumsum(self.counts)[:-1] / max(self.count, 1)
+
+    def to_dict(self):
+        return {"counts": self.counts.tolist(), "missing": self.missing}
+
+    @classmethod
+    def from_dict(cls, edges, state):
+        return cls(edges, state["counts"], state["missing"])
+
+def kolmogorov_sf(x):
+    """Asimptotska verjetnost P(K > x) Kolmogorovove porazdelitve."""
+    if x < 0.2:
+        return 1.0
+    k = np.arange(1, 101)
+    return float(np.clip(2 * np.sum((-1) ** (k - 1) * np.exp(-2 * k ** 2 * x ** 2)), 0.0, 1.0))
+
+def column_statistics(reference, current):
+    """KS (statistika in p-vrednost), PSI in Wassersteinova razdalja med profiloma stolpca."""
+    n, m = reference.count, current.count
+    if n == 0 or m == 0:
+        return {"ks_stat": None, "ks_p_value": None, "psi": None, "wasserstein": None, "drift": False}
+
+    cdf_ref, cdf_cur = reference.cdf(), current.cdf()
+    ks_stat = float(np.max(np.abs(cdf_ref - cdf_cur))) if cdf_ref.size else 0.0
+    ks_p_value = kolmogorov_sf(ks_stat * np.sqrt(n * m / (n + m)))
+
+    eps = 1e-6
+    p_ref = np.maximum(reference.counts / n, eps)
+    p_cur = np.maximum(current.counts / m, eps)
+    psi = float(np.sum((p_cur - p_ref) * np.log(p_cur / p_ref)))
+
+    # W1 = ∫|F - G|; robna razreda sta odprta in ju ne štejemo
+    wasserstein = float(np.sum(np.abs(cdf_ref - cdf_cur)[:-1] * np.diff(reference.edges))) if cdf_ref.size > 1 else 0.0
+
+    return {
+        "ks_stat": ks_stat,
+        "ks_p_value": ks_p_value,
+        "psi": psi,
+        "wasserstein": wasserstein,
+        "drift": ks_p_value < KS_P_VALUE or psi > PSI_THRESHOLD,
+    }
+
+def _edges_from_sketch(sketch):
+    quantiles = np.linspace(0, 1, N_BINS + 1)[1:-1]
+    return np.unique(np.round([sketch.quantile(q) for q in quantiles], 6))
+
+def load_edges(df=None, store_path=None):
+    """
+    Meje razredov za vsak stolpec. Določijo se enkrat in ostanejo fiksne, da so vsi profili združljivi.
+    Vir so kvantilne skice stopnje 'process', sicer skica iz particij `store_path` (po ena naenkrat) ali iz `df`.
+    """
+    if os.path.exists(EDGES_PATH):
+        with open(EDGES_PATH) as f:
+            return {col: np.asarray(edges) for col, edges in json.load(f).items()}
+
+    sketches = {col: TDigest.from_dict(state) for col, state in load_watermark("process").get("sketches", {}).items()}
+    missing = [col for col in DRIFT_COLUMNS if col not in sketches or sketches[col].count == 0]
+    if missing and store_path is not None:
+        for _, path in list_partitions(store_path):
+            df_part = pd.read_parquet(path, columns=missing)
+            for col in missing:
+                sketches.setdefault(col, TDigest()).update(df_part[col].to_numpy(dtype=np.float64, na_value=np.nan))
+    elif missing and df is not None:
+        for col in missing:
+            if col in df.columns:
+                sketches[col] = TDigest().update(df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    edges = {col: _edges_from_sketch(sketches[col]) for col in DRIFT_COLUMNS if col in sketches and sketches[col].count > 0}
+    if edges:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(EDGES_PATH, "w") as f:
+            json.dump({col: values.tolist() for col, values in edges.items()}, f)
+    return edges
+
+def _edges_hash(edges):
+    return hashlib.sha1(json.dumps({col: values.tolist() for col, values in sorted(edges.items())}).encode()).hexdigest()
+
+def profile_frame(df, edges, max_workers=None):
+    """Profil vsakega stolpca DataFrame-a (stolpci se obdelajo vzporedno)."""
+    columns = [col for col in edges if col in df.columns]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        profiles = executor.map(lambda col: HistogramProfile(edges[col]).update(df[col].to_numpy(dtype=np.float64, na_value=np.nan)), columns)
+        return dict(zip(columns, profiles))
+
+def _partition_profile(label, path, edges, edges_hash):
+    """Profil cele particije; shrani se in ponovno izračuna le, ko se particija (ali meje) spremeni."""
+    profile_path = os.path.join(PARTITION_PROFILE_DIR, f"{label}.json")
+    signature = file_signature(path)
+    if os.path.exists(profile_path):
+        with open(profile_path) as f:
+            cached = json.load(f)
+        if cached["signature"] == signature and cached["edges"] == edges_hash:
+            return {col: HistogramProfile.from_dict(edges[col], state) for col, state in cached["columns"].items()}
+
+    profiles = profile_frame(pd.read_parquet(path, columns=[col for col in edges]), edges)
+    os.makedirs(PARTITION_PROFILE_DIR, exist_ok=True)
+    tmp_path = f"{profile_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"signature": signature, "edges": edges_hash,
+                   "columns": {col: profile.to_dict() for col, profile in profiles.items()}}, f)
+    os.replace(tmp_path, profile_path)
+    return profiles
+
+def merge_profiles(target, profiles):
+    for col, profile in profiles.items():
+        if col in target:
+            target[col].merge(profile)
+        else:
+            target[col] = HistogramProfile(profile.edges, profile.counts.copy(), profile.missing)
+    return target
+
+def reference_profile(store_path, end, edges, window_months=None):
+    """
+    Referenčni profil zapisov pred `end`.
+    - Cele particije prispevajo shranjene profile (branje le ob spremembi particije).
+    - Particija, ki jo `end` deli, se profilira iz prebranih zapisov.
+    - `window_months`: drseče okno (le zadnjih N mesecev pred `end`), sicer naraščajoče okno.
+    """
+    end = to_utc(end)
+    start = end - pd.DateOffset(months=window_months) if window_months else None
+    edges_hash = _edges_hash(edges)
+
+    profiles = {}
+    for label, path in list_partitions(store_path):
+        part_start, part_end = partition_bounds(label)
+        if part_start >= end or (start is not None and part_end <= start):
+            continue
+        if part_end <= end and (start is None or part_start >= start):
+            merge_profiles(profiles, _partition_profile(label, path, edges, edges_hash))
+        else:
+            df = read(store_path, start=max(part_start, start) if start is not None else part_start,
+                      end=min(part_end, end), columns=list(edges))
+            merge_profiles(profiles, profile_frame(df, edges))
+    return profiles
+
+def detect_drift(reference, current, max_workers=None):
+    """
+    Primerja profila po stolpcih (vzporedno) in vrne povzetek:
+    statistike vsakega stolpca ter oceno premika celotnega nabora.
+    """
+    columns = [col for col in reference if col in current]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        statistics = dict(zip(columns, executor.map(lambda col: column_statistics(reference[col], current[col]), columns)))
+
+    drifted = [col for col, stats in statistics.items() if stats["drift"]]
+    return {
+        "dataset_drift": len(drifted) >= DATASET_DRIFT_SHARE * max(len(statistics), 1),
+        "drifted_columns": drifted,
+        "share_of_drifted_columns": len(drifted) / max(len(statistics), 1),
+        "columns": statistics,
+    }
@@ -0,0 +1,122 @@
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from src.data.transform import AQI_CATEGORIES
+
+# Pravila validacije v obliki Great Expectations konfiguracij (enaka pravila uporablja tudi GE način)
+AQI_EXPECTATIONS = [
+    {"expectation_type": "expect_column_to_exist", "kwargs": {"column": "date"}},
+    {"expectation_type": "expect_column_values_to_not_be_null", "kwargs": {"column": "pm10"}},
+    {"expectation_type": "expect_column_values_to_be_between", "kwargs": {"column": "pm10", "min_value": 0, "max_value": 500}},
+    {"expectation_type": "expect_column_values_to_not_be_null", "kwargs": {"column": "category"}},
+    {"expectation_type": "expect_column_values_to_be_in_set", "kwargs": {"column": "category", "value_set": AQI_CATEGORIES}},
+]
+
+PARTIAL_UNEXPECTED_COUNT = 20
+
+def _null_mask(series):
+    """Maska manjkajočih vrednosti (kategorije prek kod, brez pretvorbe v object)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy() == -1
+    values = series.to_numpy()
+    if values.dtype.kind == "f":
+        return np.isnan(values)
+    return pd.isna(values)
+
+def _not_null(series, kwargs):
+    # Neustrezne so ravno manjkajoče vrednosti, zato se delež računa med vsemi
+    return _null_mask(series), np.zeros(len(series), dtype=bool)
+
+def _between(series, kwargs):
+    # Kot v GE: manjkajoče vrednosti se ne štejejo kot neustrezne
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    missing = np.isnan(values)
+    unexpected = np.zeros(len(values), dtype=bool)
+    if kwargs.get("min_value") is not None:
+        unexpected |= values < kwargs["min_value"]
+    if kwargs.get("max_value") is not None:
+        unexpected |= values > kwargs["max_value"]
+    return unexpected, missing
+
+def _in_set(series, kwargs):
+    value_set = list(kwargs["value_set"])
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        allowed = np.append(np.isin(series.cat.categories.to_numpy(dtype=object), value_set), True)
+        return ~allowed[codes], codes == -1
+    missing = _null_mask(series)
+    return ~missing & ~np.isin(series.to_numpy(), value_set), missing
+
+# Vsak tip pričakovanja → funkcija, ki v enem vektoriziranem prehodu vrne (maska neustreznih, maska manjkajočih)
+COLUMN_MAP_EXPECTATIONS = {
+    "expect_column_values_to_not_be_null": _not_null,
+    "expect_column_values_to_be_between": _between,
+    "expect_column_values_to_be_in_set": _in_set,
+}
+
+def _result(config, success, result=None):
+    return {
+        "success": bool(success),
+        "expectation_config": {"expectation_type": config["expectation_type"], "kwargs": config["kwargs"], "meta": {}},
+        "result": result or {},
+        "meta": {},
+        "exception_info": {"raised_exception": False, "exception_message": None, "exception_traceback": None},
+    }
+
+def check_expectation(df, config):
+    """Preveri eno pričakovanje in vrne rezultat v obliki GE ExpectationValidationResult."""
+    expectation_type, kwargs = config["expectation_type"], config["kwargs"]
+    column = kwargs["column"]
+
+    if expectation_type == "expect_column_to_exist":
+        return _result(config, column in df.columns)
+    if expectation_type not in COLUMN_MAP_EXPECTATIONS:
+        raise ValueError(f"Nepodprto pričakovanje: {expectation_type}")
+    if column not in df.columns:
+        return _result(config, False, {"element_count": len(df), "unexpected_count": None})
+
+    series = df[column]
+    unexpected, missing = COLUMN_MAP_EXPECTATIONS[expectation_type](series, kwargs)
+    element_count = len(series)
+    missing_count = int(missing.sum())
+    unexpected_count = int(unexpected.sum())
+    nonmissing_count = element_count - missing_count
+
+    unexpected_fraction = unexpected_count / nonmissing_count if nonmissing_count else 0.0
+    mostly = kwargs.get("mostly", 1.0)
+    partial = series.to_numpy()[np.flatnonzero(unexpected)[:PARTIAL_UNEXPECTED_COUNT]]
+    return _result(config, unexpected_fraction <= 1.0 - mostly, {
+        "element_count": element_count,
+        "missing_count": missing_count,
+        "missing_percent": 100.0 * missing_count / element_count if element_count else None,
+        "unexpected_count": unexpected_count,
+        "unexpected_percent": 100.0 * unexpected_fraction,
+        "partial_unexpected_list": [None if pd.isna(value) else value for value in partial.tolist()],
+    })
+
+def validate(df, expectations=AQI_EXPECTATIONS, suite_name="aqi_validation"):
+    """
+    Preveri vsa pričakovanja nad DataFrame-om in vrne povzetek v obliki
+    GE ExpectationSuiteValidationResult (success, statistics, results, meta).
+    """
+    start = time.perf_counter()
+    results = [check_expectation(df, config) for config in expectations]
+    successful = sum(result["success"] for result in results)
+    return {
+        "success": successful == len(results),
+        "statistics": {
+            "evaluated_expectations": len(results),
+            "successful_expectations": successful,
+            "unsuccessful_expectations": len(results) - successful,
+            "success_percent": 100.0 * successful / len(results) if results else None,
+        },
+        "results": results,
+        "meta": {
+            "expectation_suite_name": suite_name,
+            "validation_time": datetime.utcnow().isoformat(),
+            "element_count": len(df),
+            "duration_ms": (time.perf_counter() - start) * 1000,
+        },
+    }
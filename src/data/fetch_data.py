@@ -1,124 +1,194 @@
 import os
+import argparse
+import numpy as np
 import pandas as pd
-import requests_cache
-from retry_requests import retry
-import openmeteo_requests
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-def fetch_aqi_data():
+from src.data.response_cache import ResponseCache, cache_key
+from src.data.stations import get_stations
+from src.data.store import AQI_STORE, WEATHER_STORE, append, import_csv
+
+AQI_URL = "https://air-quality-api.open-meteo.com/v1/air-quality"
+WEATHER_URL = "https://archive-api.open-meteo.com/v1/archive"
+
+AQI_VARIABLES = ["pm10", "pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "european_aqi"]
+AQI_COLUMNS = ["pm10", "pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "eu_aqi"]
+WEATHER_VARIABLES = ["temperature_2m", "relative_humidity_2m", "rain", "snowfall", "is_day"]
+
+# Največje število hkratnih zahtevkov in število koordinat v enem zahtevku
+DEFAULT_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "4"))
+DEFAULT_BATCH_SIZE = int(os.getenv("FETCH_BATCH_SIZE", "10"))
+
+# Vrsta končne točke: arhiv (izmerjeni podatki, ki prihajajo z zamikom) ali napoved (vrednosti se posodabljajo sproti)
+ENDPOINT_KINDS = {
+    AQI_URL: "forecast",
+    WEATHER_URL: "archive",
+}
+
+# Življenjska doba zapisov v cache (sekunde, None = ne poteče) po vrsti končne točke in stanju okna:
+# - zaključena okna (končni datum pred današnjim) se ne spreminjajo več,
+# - tekoči dan na arhivu se dopolnjuje z zamikom ur, napovedi in trenutne vrednosti pa precej pogosteje
+SETTLED_TTL = None
+ARCHIVE_OPEN_TTL = int(os.getenv("OPENMETEO_ARCHIVE_TTL", "10800"))
+FORECAST_OPEN_TTL = int(os.getenv("OPENMETEO_FORECAST_TTL", "900"))
+
+KIND_TTLS = {
+    "archive": {"settled": SETTLED_TTL, "open": ARCHIVE_OPEN_TTL},
+    "forecast": {"settled": SETTLED_TTL, "open": FORECAST_OPEN_TTL},
+}
+ENDPOINT_TTLS = {url: KIND_TTLS[kind] for url, kind in ENDPOINT_KINDS.items()}
+
+_cache = None
+
+def get_cache():
+    """Vrne skupni cache dekodiranih odgovorov (ustvari ga ob prvi uporabi)."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(ttls=ENDPOINT_TTLS)
+    return _cache
+
+def create_client():
     """
-    Pridobi sveže podatke o kakovosti zraka prek Open-Meteo API-ja.
+    Ustvari Open-Meteo klienta z retry sejo (odgovore hrani ResponseCache).
+    HTTP knjižnice se uvozijo šele tu, saj jih ob zadetkih v cache ne potrebujemo.
+    """
+    import requests
+    import openmeteo_requests
+    from retry_requests import retry
+
+    retry_session = retry(requests.Session(), retries=5, backoff_factor=0.2)
+    return openmeteo_requests.Client(session=retry_session)
+
+def decode_response(response, n_variables):
+    """
+    Dekodira "Hourly" odsek Open-Meteo odgovora v (začetek, interval, vrednosti spremenljivke × ure).
+    Vrstni red vrstic je enak vrstnemu redu spremenljivk v zahtevku.
     """
-    cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-    openmeteo = openmeteo_requests.Client(session=retry_session)
-    
-    url = "https://air-quality-api.open-meteo.com/v1/air-quality"
-    params = {
-        "latitude": 46.55,
-        "longitude": 15.64,
-        "hourly": ["pm10", "pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "european_aqi"],
-        "past_days": 1,
-        "forecast_days": 1
-    }
-    responses = openmeteo.weather_api(url, params=params)
-    response = responses[0]
-    
     hourly = response.Hourly()
+    values = np.vstack([hourly.Variables(i).ValuesAsNumpy() for i in range(n_variables)])
+    return hourly.Time(), hourly.Interval(), values
+
+def arrays_to_frame(time_start, interval, values, columns, station):
+    """
+    Iz dekodiranih vrednosti sestavi DataFrame za eno postajo.
+    """
     hourly_data = {
+        "station": station.name,
         "date": pd.date_range(
-            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-            freq=pd.Timedelta(seconds=hourly.Interval()),
-            inclusive="left"
-        ),
-        "pm10": hourly.Variables(0).ValuesAsNumpy(),
-        "pm2_5": hourly.Variables(1).ValuesAsNumpy(),
-        "carbon_monoxide": hourly.Variables(2).ValuesAsNumpy(),
-        "carbon_dioxide": hourly.Variables(3).ValuesAsNumpy(),
-        "uv_index": hourly.Variables(4).ValuesAsNumpy(),
-        "eu_aqi": hourly.Variables(5).ValuesAsNumpy()
+            start=pd.Timestamp(time_start, unit="s", tz="UTC"),
+            periods=values.shape[1],
+            freq=pd.Timedelta(seconds=interval)
+        )
     }
-    df_aqi = pd.DataFrame(data=hourly_data)
-    return df_aqi
+    for i, col in enumerate(columns):
+        hourly_data[col] = values[i]
+
+    return pd.DataFrame(data=hourly_data)
 
-def fetch_weather_data():
+def fetch_stations(url, params, columns, stations, max_workers=DEFAULT_MAX_WORKERS,
+                   batch_size=DEFAULT_BATCH_SIZE, cache=None):
     """
-    Pridobi sveže zgodovinske vremenske podatke prek Open-Meteo API-ja.
+    Pridobi podatke za več postaj hkrati.
+    - Postaje, ki so že v cache, sestavi neposredno iz shranjenih polj (brez omrežja in dekodiranja).
+    - Ostale združi v skupine po `batch_size`; vsaka skupina je en zahtevek z več koordinatami
+      (Open-Meteo vrne en odgovor na koordinato, v enakem vrstnem redu).
+    - Skupine izvaja v bazenu niti z največ `max_workers` hkratnimi zahtevki.
+    Vrne en DataFrame v dolgem formatu s stolpcem 'station'.
     """
-    cache_session = requests_cache.CachedSession('.cache', expire_after=-1)
-    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-    openmeteo = openmeteo_requests.Client(session=retry_session)
+    cache = cache or get_cache()
+    variables = params["hourly"]
+    ttl = cache.ttl(url, params)
 
-    url = "https://archive-api.open-meteo.com/v1/archive"
-    current_date = datetime.utcnow().strftime("%Y-%m-%d")
-    params = {
-        "latitude": 46.55,
-        "longitude": 15.64,
-        "start_date": current_date,
-        "end_date": current_date,
-        "hourly": ["temperature_2m", "relative_humidity_2m", "rain", "snowfall", "is_day"]
-    }
-    responses = openmeteo.weather_api(url, params=params)
-    response = responses[0]
+    frames, missing = {}, []
+    for station in stations:
+        key = cache_key(url, station.latitude, station.longitude, variables, params)
+        cached = cache.get(key)
+        if cached is None:
+            missing.append((station, key))
+        else:
+            meta, values = cached
+            frames[station.name] = arrays_to_frame(meta["time"], meta["interval"], values, columns, station)
 
-    hourly = response.Hourly()
-    hourly_data = {
-        "date": pd.date_range(
-            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-            freq=pd.Timedelta(seconds=hourly.Interval()),
-            inclusive="left"
-        ),
-        "temperature_2m": hourly.Variables(0).ValuesAsNumpy(),
-        "relative_humidity_2m": hourly.Variables(1).ValuesAsNumpy(),
-        "rain": hourly.Variables(2).ValuesAsNumpy(),
-        "snowfall": hourly.Variables(3).ValuesAsNumpy(),
-        "is_day": hourly.Variables(4).ValuesAsNumpy()
+    batch_size = max(1, batch_size)
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+
+    def fetch_batch(batch):
+        openmeteo = create_client()
+        batch_params = dict(params)
+        batch_params["latitude"] = [station.latitude for station, _ in batch]
+        batch_params["longitude"] = [station.longitude for station, _ in batch]
+        responses = openmeteo.weather_api(url, params=batch_params)
+        batch_frames = {}
+        for (station, key), response in zip(batch, responses):
+            time_start, interval, values = decode_response(response, len(columns))
+            cache.put(key, values, time_start, interval, ttl)
+            batch_frames[station.name] = arrays_to_frame(time_start, interval, values, columns, station)
+        return batch_frames
+
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+            for batch_frames in executor.map(fetch_batch, batches):
+                frames.update(batch_frames)
+
+    return pd.concat([frames[station.name] for station in stations], ignore_index=True)
+
+def fetch_aqi_data(stations=None, max_workers=DEFAULT_MAX_WORKERS, batch_size=DEFAULT_BATCH_SIZE, url=AQI_URL):
+    """
+    Pridobi sveže podatke o kakovosti zraka prek Open-Meteo API-ja za vse postaje iz registra.
+    """
+    params = {
+        "hourly": AQI_VARIABLES,
+        "past_days": 1,
+        "forecast_days": 1
     }
-    df_weather = pd.DataFrame(data=hourly_data)
-    return df_weather
+    return fetch_stations(url, params, AQI_COLUMNS, stations or get_stations(),
+                          max_workers=max_workers, batch_size=batch_size)
 
-def update_or_append_csv(df_new, filepath):
+def fetch_weather_data(stations=None, max_workers=DEFAULT_MAX_WORKERS, batch_size=DEFAULT_BATCH_SIZE, url=WEATHER_URL):
     """
-    Preveri, ali podatki za določen datum že obstajajo v CSV datoteki.
-    - Če datum že obstaja, podatkov ne doda ponovno.
-    - Če datum ne obstaja, doda nov zapis.
+    Pridobi sveže zgodovinske vremenske podatke prek Open-Meteo API-ja za vse postaje iz registra.
     """
-    df_new["date"] = pd.to_datetime(df_new["date"])
+    current_date = datetime.utcnow().strftime("%Y-%m-%d")
+    params = {
+        "start_date": current_date,
+        "end_date": current_date,
+        "hourly": WEATHER_VARIABLES
+    }
+    return fetch_stations(url, params, WEATHER_VARIABLES, stations or get_stations(),
+                          max_workers=max_workers, batch_size=batch_size)
 
-    if os.path.exists(filepath):
-        existing_df = pd.read_csv(filepath, parse_dates=["date"])
-        existing_dates = set(existing_df["date"].dt.date)
+def main():
+    parser = argparse.ArgumentParser(description="Pridobivanje svežih AQI in vremenskih podatkov.")
+    parser.add_argument("--stations", nargs="*", help="Imena postaj iz registra (privzeto vse).")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Največje število hkratnih zahtevkov.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Število koordinat v enem zahtevku.")
+    args = parser.parse_args()
 
-        df_new_filtered = df_new[~df_new["date"].dt.date.isin(existing_dates)]
-        
-        if df_new_filtered.empty:
-            print(f"📢 Ni novih podatkov za {filepath}.")
-        else:
-            combined_df = pd.concat([existing_df, df_new_filtered]).drop_duplicates(subset=["date"], keep="last")
-            combined_df.to_csv(filepath, index=False)
-            print(f"✅ Dodano {len(df_new_filtered)} novih zapisov v: {filepath}")
-    else:
-        df_new.to_csv(filepath, index=False)
-        print(f"✅ Prva shranitev podatkov v: {filepath}")
+    stations = get_stations(args.stations)
 
-def main():
-    print("📡 Pridobivanje svežih AQI podatkov...")
-    df_aqi = fetch_aqi_data()
+    print(f"📡 Pridobivanje svežih AQI podatkov za {len(stations)} postaj...")
+    df_aqi = fetch_aqi_data(stations, args.max_workers, args.batch_size)
     print("✅ Sveži AQI podatki (prvih 5 vrstic):")
     print(df_aqi.head(), "\n")
 
-    print("📡 Pridobivanje svežih vremenskih podatkov...")
-    df_weather = fetch_weather_data()
+    print(f"📡 Pridobivanje svežih vremenskih podatkov za {len(stations)} postaj...")
+    df_weather = fetch_weather_data(stations, args.max_workers, args.batch_size)
     print("✅ Sveži vremenski podatki (prvih 5 vrstic):")
     print(df_weather.head(), "\n")
 
-    aqi_filepath = os.path.join("data", "raw", "aqi", "aqi_data.csv")
-    weather_filepath = os.path.join("data", "raw", "weather", "weather_data.csv")
+    print(f"📦 Cache odgovorov: {get_cache().stats}")
+
+    # Starejšo CSV zgodovino ob prvem zagonu prenesemo v shrambo
+    import_csv(os.path.join(AQI_STORE, "aqi_data.csv"), AQI_STORE)
+    import_csv(os.path.join(WEATHER_STORE, "weather_data.csv"), WEATHER_STORE)
 
-    update_or_append_csv(df_aqi, aqi_filepath)
-    update_or_append_csv(df_weather, weather_filepath)
+    for df, store_path in [(df_aqi, AQI_STORE), (df_weather, WEATHER_STORE)]:
+        added = append(store_path, df)
+        if added:
+            print(f"✅ Dodano {added} novih zapisov v: {store_path}")
+        else:
+            print(f"📢 Ni novih podatkov za {store_path}.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
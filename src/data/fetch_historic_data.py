@@ -1,179 +1,179 @@
 import os
-from datetime import datetime
-import pandas as pd
-import requests_cache
-from retry_requests import retry
-import openmeteo_requests
+import json
+import time
+import argparse
+import threading
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def fetch_aqi_data():
-    """
-    Pridobi podatke o kakovosti zraka prek Open-Meteo API-ja.
-    
-    Uporablja endpoint:
-      https://air-quality-api.open-meteo.com/v1/air-quality
-    
-    Parametri:
-      - latitude: 46.55
-      - longitude: 15.64
-      - hourly: ["pm10", "pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "european_aqi"]
-      - past_days: 92
-      - forecast_days: 1
-    
-    Vrne:
-      pandas DataFrame s stolpci:
-        - date (časovna os)
-        - pm10, pm2_5, carbon_monoxide, carbon_dioxide, uv_index
-    """
-    # Nastavimo session z cache in retry (cache expira čez eno uro)
-    cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-    
-    # Ustvarimo Open-Meteo API klienta
-    openmeteo = openmeteo_requests.Client(session=retry_session)
-    
-    url = "https://air-quality-api.open-meteo.com/v1/air-quality"
-    params = {
-        "latitude": 46.55,
-        "longitude": 15.64,
-        "hourly": ["pm10", "pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "european_aqi"],
-        "past_days": 92,
-        "forecast_days": 1
-    }
-    
-    responses = openmeteo.weather_api(url, params=params)
-    # Predpostavljamo, da je rezultat seznam odgovorov; vzamemo prvi
-    response = responses[0]
-    
-    # Izpišemo nekaj metapodatkov
-    print(f"[AQI] Coordinates: {response.Latitude()}°N {response.Longitude()}°E")
-    print(f"[AQI] Elevation: {response.Elevation()} m asl")
-    print(f"[AQI] Timezone: {response.Timezone()} {response.TimezoneAbbreviation()}")
-    print(f"[AQI] UTC offset: {response.UtcOffsetSeconds()} s")
-    
-    # Pridobimo podatke iz odseka "Hourly"
-    hourly = response.Hourly()
-    # Vrstni red spremenljivk mora biti enak, kot je naveden v parametrih "hourly"
-    hourly_pm10 = hourly.Variables(0).ValuesAsNumpy()
-    hourly_pm2_5 = hourly.Variables(1).ValuesAsNumpy()
-    hourly_carbon_monoxide = hourly.Variables(2).ValuesAsNumpy()
-    hourly_carbon_dioxide = hourly.Variables(3).ValuesAsNumpy()
-    hourly_uv_index = hourly.Variables(4).ValuesAsNumpy()
-    hourly_european_aqi = hourly.Variables(5).ValuesAsNumpy()
-    
-    # Ustvarimo časovno os – uporabimo čas začetka, konec in interval iz odgovora
-    hourly_data = {
-        "date": pd.date_range(
-            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-            freq=pd.Timedelta(seconds=hourly.Interval()),
-            inclusive="left"
-        ),
-        "pm10": hourly_pm10,
-        "pm2_5": hourly_pm2_5,
-        "carbon_monoxide": hourly_carbon_monoxide,
-        "carbon_dioxide": hourly_carbon_dioxide,
-        "uv_index": hourly_uv_index,
-        "eu_aqi": hourly_european_aqi
-    }
-    
-    df_aqi = pd.DataFrame(data=hourly_data)
-    return df_aqi
-
-def fetch_weather_data():
+from src.data.fetch_data import (AQI_URL, WEATHER_URL, AQI_VARIABLES, AQI_COLUMNS, WEATHER_VARIABLES,
+                                 DEFAULT_BATCH_SIZE, fetch_stations, get_cache)
+from src.data.stations import get_stations
+from src.data.store import AQI_STORE, WEATHER_STORE, append
+from src.data.watermark import rewind_watermark
+
+CHECKPOINT_PATH = os.path.join("data", "backfill", "checkpoint.json")
+
+# Nabori podatkov: (URL, spremenljivke, imena stolpcev, shramba)
+DATASETS = {
+    "aqi": (AQI_URL, AQI_VARIABLES, AQI_COLUMNS, AQI_STORE),
+    "weather": (WEATHER_URL, WEATHER_VARIABLES, WEATHER_VARIABLES, WEATHER_STORE),
+}
+
+# Stopnje, ki morajo po zapolnitvi zgodovine ponovno obdelati starejše ure
+DOWNSTREAM_STAGES = ["merge", "process", "split", "validate"]
+
+class RateLimiter:
+    """Omeji število zahtevkov na sekundo (enakomerni razmik med začetki zahtevkov, varno za niti)."""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+class Checkpoint:
     """
-    Pridobi zgodovinske vremenske podatke prek arhivnega Open-Meteo API-ja.
-    
-    Uporablja endpoint:
-      https://archive-api.open-meteo.com/v1/archive
-    
-    Parametri:
-      - latitude: 46.55
-      - longitude: 15.64
-      - start_date: "2024-10-01"
-      - end_date: "2025-02-04"
-      - hourly: ["temperature_2m", "relative_humidity_2m", "rain", "snowfall", "is_day"]
-    
-    Vrne:
-      pandas DataFrame s stolpci:
-        - date (časovna os)
-        - temperature_2m, relative_humidity_2m, rain, snowfall, is_day
+    Seznam zaključenih oken (nabor, postaja, začetek, konec), shranjen v JSON datoteko.
+    Vsak zapis je atomaren, zato prekinjena zapolnitev nadaljuje brez ponovnega prenosa.
+    Hrani tudi najzgodnejši dan, od katerega morajo nadaljnje stopnje še ponovno obdelati zapisane ure
+    (`rewind_from`); zapiše se skupaj z oknom, zato ga prekinjen zagon ne izgubi.
     """
-    # Nastavimo session z cache in retry; tukaj nastavimo cache brez poteka (expire_after=-1)
-    cache_session = requests_cache.CachedSession('.cache', expire_after=-1)
-    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-    
-    # Ustvarimo Open-Meteo API klienta
-    openmeteo = openmeteo_requests.Client(session=retry_session)
-    
-    url = "https://archive-api.open-meteo.com/v1/archive"
-    params = {
-        "latitude": 46.55,
-        "longitude": 15.64,
-        "start_date": "2024-10-01",
-        "end_date": "2025-02-04",
-        "hourly": ["temperature_2m", "relative_humidity_2m", "rain", "snowfall", "is_day"]
-    }
-    
-    responses = openmeteo.weather_api(url, params=params)
-    response = responses[0]
-    
-    # Izpišemo metapodatke
-    print(f"[Weather] Coordinates: {response.Latitude()}°N {response.Longitude()}°E")
-    print(f"[Weather] Elevation: {response.Elevation()} m asl")
-    print(f"[Weather] Timezone: {response.Timezone()} {response.TimezoneAbbreviation()}")
-    print(f"[Weather] UTC offset: {response.UtcOffsetSeconds()} s")
-    
-    # Pridobimo podatke iz odseka "Hourly"
-    hourly = response.Hourly()
-    hourly_temperature_2m = hourly.Variables(0).ValuesAsNumpy()
-    hourly_relative_humidity_2m = hourly.Variables(1).ValuesAsNumpy()
-    hourly_rain = hourly.Variables(2).ValuesAsNumpy()
-    hourly_snowfall = hourly.Variables(3).ValuesAsNumpy()
-    hourly_is_day = hourly.Variables(4).ValuesAsNumpy()
-    
-    hourly_data = {
-        "date": pd.date_range(
-            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-            freq=pd.Timedelta(seconds=hourly.Interval()),
-            inclusive="left"
-        ),
-        "temperature_2m": hourly_temperature_2m,
-        "relative_humidity_2m": hourly_relative_humidity_2m,
-        "rain": hourly_rain,
-        "snowfall": hourly_snowfall,
-        "is_day": hourly_is_day
-    }
-    
-    df_weather = pd.DataFrame(data=hourly_data)
-    return df_weather
-
-def save_dataframe(df, directory, prefix):
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self.done = set()
+        self.rewind_from = None
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.done = set(state["done"])
+            self.rewind_from = state.get("rewind_from")
+
+    @staticmethod
+    def key(dataset, station, window):
+        return f"{dataset}/{station}/{window[0]}/{window[1]}"
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def mark(self, keys, rewind_from=None):
+        """Zabeleži zaključena okna; `rewind_from` (dan) premakne čakajoči začetek ponovne obdelave nazaj."""
+        self.done.update(keys)
+        if rewind_from is not None and (self.rewind_from is None or rewind_from < self.rewind_from):
+            self.rewind_from = rewind_from
+        self._save()
+
+    def clear_rewind(self):
+        self.rewind_from = None
+        self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"done": sorted(self.done), "rewind_from": self.rewind_from,
+                       "updated_at": datetime.utcnow().isoformat()}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+def make_windows(start, end, window_days):
+    """Razdeli interval [start, end] (vključno) na zaporedna okna po največ `window_days` dni."""
+    windows = []
+    current = start
+    while current <= end:
+        window_end = min(current + timedelta(days=window_days - 1), end)
+        windows.append((current.isoformat(), window_end.isoformat()))
+        current = window_end + timedelta(days=1)
+    return windows
+
+def backfill(start, end, stations=None, datasets=("aqi", "weather"), window_days=30, max_workers=4,
+             batch_size=DEFAULT_BATCH_SIZE, requests_per_second=5.0, checkpoint_path=CHECKPOINT_PATH, urls=None):
     """
-    Shrani podani pandas DataFrame v CSV datoteko v navedeni mapi.
+    Zapolni zgodovino za podan interval in postaje.
+    - Interval razdeli na okna, okna in skupine postaj prenaša hkrati (omejen bazen niti in hitrost zahtevkov).
+    - Rezultate sproti doda v shrambo (zapisovanje je zaporedno, da se particije ne prepisujejo hkrati).
+    - Zaključena okna zabeleži v kontrolno točko; ob ponovnem zagonu jih preskoči.
+    - Nadaljnje stopnje premakne nazaj, če je bil zapisan katerikoli zapis (tudi popravek obstoječe ure),
+      in to tudi v nadaljevanem zagonu, ki sam nima več novih oken.
+    Vrne število novih zapisov po naborih.
     """
-    os.makedirs(directory, exist_ok=True)
-    filepath = os.path.join(directory, f"{prefix}.csv")
-    df.to_csv(filepath, index=False)
-    print(f"Podatki so shranjeni v: {filepath}")
+    stations = stations or get_stations()
+    checkpoint = Checkpoint(checkpoint_path)
+    limiter = RateLimiter(requests_per_second)
+    write_lock = threading.Lock()
+    urls = urls or {}
+
+    tasks = []
+    for dataset in datasets:
+        for window in make_windows(start, end, window_days):
+            pending = [s for s in stations if Checkpoint.key(dataset, s.name, window) not in checkpoint]
+            for i in range(0, len(pending), batch_size):
+                tasks.append((dataset, window, pending[i:i + batch_size]))
+
+    skipped = len(datasets) * len(make_windows(start, end, window_days)) * len(stations) - sum(len(t[2]) for t in tasks)
+    print(f"📡 Zapolnjevanje: {len(tasks)} zahtevkov, {skipped} oken že zaključenih.")
+
+    def run_task(task):
+        dataset, window, batch = task
+        url, variables, columns, store_path = DATASETS[dataset]
+        params = {"start_date": window[0], "end_date": window[1], "hourly": variables}
+        limiter.wait()
+        df = fetch_stations(urls.get(dataset, url), params, columns, batch, max_workers=1, batch_size=len(batch))
+        with write_lock:
+            added = append(store_path, df)
+            # Čakajoči premik nazaj se zapiše hkrati z zaključenim oknom
+            checkpoint.mark((Checkpoint.key(dataset, s.name, window) for s in batch),
+                            rewind_from=window[0] if len(df) else None)
+        return dataset, window, len(batch), added
+
+    added_by_dataset = {dataset: 0 for dataset in datasets}
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(run_task, task) for task in tasks]
+        for future in as_completed(futures):
+            try:
+                dataset, window, n_stations, added = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"⚠️ Napaka pri prenosu okna: {e}")
+                continue
+            added_by_dataset[dataset] += added
+            print(f"✅ {dataset} {window[0]}..{window[1]} ({n_stations} postaj): {added} novih zapisov")
+
+    if checkpoint.rewind_from is not None:
+        for stage in DOWNSTREAM_STAGES:
+            rewind_watermark(stage, datetime.fromisoformat(checkpoint.rewind_from))
+        checkpoint.clear_rewind()
+
+    if failures:
+        print(f"❌ Neuspešnih zahtevkov: {failures}. Ponovni zagon bo nadaljeval pri nedokončanih oknih.")
+    return added_by_dataset
 
 def main():
-    print("Pridobivanje AQI podatkov...")
-    df_aqi = fetch_aqi_data()
-    print("Pridobljeni AQI podatki:")
-    print(df_aqi.head(), "\n")
-    
-    print("Pridobivanje vremenskih podatkov...")
-    df_weather = fetch_weather_data()
-    print("Pridobljeni vremenski podatki:")
-    print(df_weather.head(), "\n")
-    
-    # Shrani podatke v ustrezne mape:
-    aqi_dir = os.path.join("data", "raw", "aqi")
-    weather_dir = os.path.join("data", "raw", "weather")
-    
-    save_dataframe(df_aqi, aqi_dir, "aqi_data")
-    save_dataframe(df_weather, weather_dir, "weather_data")
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Zapolnjevanje zgodovinskih AQI in vremenskih podatkov.")
+    parser.add_argument("--start", type=date.fromisoformat, default=today - timedelta(days=92), help="Začetni datum (YYYY-MM-DD).")
+    parser.add_argument("--end", type=date.fromisoformat, default=today - timedelta(days=1), help="Končni datum (YYYY-MM-DD), vključno.")
+    parser.add_argument("--stations", nargs="*", help="Imena postaj iz registra (privzeto vse).")
+    parser.add_argument("--datasets", nargs="*", default=list(DATASETS), choices=list(DATASETS))
+    parser.add_argument("--window-days", type=int, default=30, help="Dolžina enega okna v dneh.")
+    parser.add_argument("--max-workers", type=int, default=4, help="Največje število hkratnih zahtevkov.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Število koordinat v enem zahtevku.")
+    parser.add_argument("--rate-limit", type=float, default=5.0, help="Največ zahtevkov na sekundo.")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH, help="Pot do kontrolne točke.")
+    args = parser.parse_args()
+
+    added = backfill(args.start, args.end, get_stations(args.stations), args.datasets, args.window_days,
+                     args.max_workers, args.batch_size, args.rate_limit, args.checkpoint)
+    print(f"📦 Cache odgovorov: {get_cache().stats}")
+    print(f"🚀 Zapolnjevanje zaključeno: {added}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
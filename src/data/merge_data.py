@@ -1,49 +1,104 @@
 import os
+import argparse
 import pandas as pd
 
-def merge_data(aqi_filepath, weather_filepath, output_filepath):
+from src.data.store import (AQI_STORE, WEATHER_STORE, MERGED_STORE, DEFAULT_MEMORY_BUDGET_MB, append, import_csv,
+                            list_partitions, chunk_rows_for_budget)
+from src.data.watermark import load_watermark, save_watermark, inputs_fingerprint, read_since, iter_since, advance_marks
+
+STAGE = "merge"
+JOIN_KEYS = ["station", "date"]
+
+def sort_merge_join(left_chunks, right_chunks):
     """
-    Prebere CSV datoteki z AQI in vremenskimi podatki,
-    združi podatke na podlagi stolpca 'date' (če se datum ujema, se prilepijo stolpci iz weather)
-    in shrani združen rezultat kot CSV.
+    Združi dva časovno urejena toka kosov (inner join po 'station' in 'date').
+    Združi se le del obeh medpomnilnikov pred manjšim od njunih zadnjih datumov (ti zapisi so v obeh
+    tokovih popolni); nato se dopolni tok, ki zaostaja. V pomnilniku sta tako največ dva kosa na tok.
     """
-    if not os.path.exists(aqi_filepath):
-        print(f"⚠️ AQI datoteka ne obstaja: {aqi_filepath}")
+    left_iter, right_iter = iter(left_chunks), iter(right_chunks)
+    left, right = next(left_iter, None), next(right_iter, None)
+    if left is None or right is None:
         return
+    left_done = right_done = False
+
+    while not (left_done and right_done):
+        bound = min(buf["date"].iloc[-1] for buf, done in ((left, left_done), (right, right_done)) if not done)
+
+        left_ready, right_ready = left["date"] < bound, right["date"] < bound
+        merged = pd.merge(left[left_ready], right[right_ready], on=JOIN_KEYS, how="inner")
+        if not merged.empty:
+            yield merged
+        left, right = left[~left_ready], right[~right_ready]
 
-    if not os.path.exists(weather_filepath):
-        print(f"⚠️ Weather datoteka ne obstaja: {weather_filepath}")
+        if not left_done and (left.empty or left["date"].iloc[-1] == bound):
+            chunk = next(left_iter, None)
+            left_done = chunk is None
+            left = left if left_done else pd.concat([left, chunk], ignore_index=True)
+        if not right_done and (right.empty or right["date"].iloc[-1] == bound):
+            chunk = next(right_iter, None)
+            right_done = chunk is None
+            right = right if right_done else pd.concat([right, chunk], ignore_index=True)
+
+    merged = pd.merge(left, right, on=JOIN_KEYS, how="inner")
+    if not merged.empty:
+        yield merged
+
+def merge_data(aqi_store, weather_store, output_store, chunked=False, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """
+    Prebere nove AQI in vremenske podatke iz shrambe (novejše od vodne oznake stopnje),
+    združi podatke na podlagi stolpcev 'station' in 'date' (če se ujemata, se prilepijo stolpci iz weather)
+    in združen rezultat doda v izhodno shrambo.
+    V postopnem načinu (`chunked`) bere oba toka po kosih in izhod zapisuje sproti.
+    """
+    if not list_partitions(aqi_store):
+        print(f"⚠️ AQI shramba je prazna: {aqi_store}")
         return
 
-    df_aqi = pd.read_csv(aqi_filepath, parse_dates=["date"])
-    df_weather = pd.read_csv(weather_filepath, parse_dates=["date"])
+    if not list_partitions(weather_store):
+        print(f"⚠️ Weather shramba je prazna: {weather_store}")
+        return
 
-    df_merged = pd.merge(df_aqi, df_weather, on="date", how="inner")
-    df_merged.sort_values("date", inplace=True)
+    watermark = load_watermark(STAGE)
+    fingerprint = inputs_fingerprint([aqi_store, weather_store])
+    if watermark.get("fingerprint") == fingerprint:
+        print("📢 Vhodni podatki se od zadnje združitve niso spremenili.")
+        return
 
-    os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
+    station_marks = watermark.get("stations", {})
+    if chunked:
+        # Proračun si delita oba vhodna toka
+        chunk_rows = chunk_rows_for_budget(aqi_store, memory_budget_mb / 4)
+        merged_chunks = sort_merge_join(
+            iter_since(aqi_store, station_marks, chunk_rows),
+            iter_since(weather_store, station_marks, chunk_rows),
+        )
+    else:
+        df_aqi = read_since(aqi_store, station_marks)
+        df_weather = read_since(weather_store, station_marks)
+        merged_chunks = [pd.merge(df_aqi, df_weather, on=JOIN_KEYS, how="inner")]
 
-    if os.path.exists(output_filepath):
-        existing_df = pd.read_csv(output_filepath, parse_dates=["date"])
-        existing_dates = set(existing_df["date"].dt.date)
-        df_new = df_merged[~df_merged["date"].dt.date.isin(existing_dates)]
+    added = 0
+    marks = dict(station_marks)
+    for df_merged in merged_chunks:
+        df_merged = df_merged.sort_values(["date", "station"])
+        added += append(output_store, df_merged)
+        marks = advance_marks(marks, df_merged)
 
-        if df_new.empty:
-            print("📢 Ni novih podatkov za združitev.")
-        else:
-            combined_df = pd.concat([existing_df, df_new]).drop_duplicates(subset=["date"], keep="last")
-            combined_df.to_csv(output_filepath, index=False)
-            print(f"✅ Dodano {len(df_new)} novih zapisov v: {output_filepath}")
+    if added:
+        print(f"✅ Dodano {added} novih zapisov v: {output_store}")
     else:
-        df_merged.to_csv(output_filepath, index=False)
-        print(f"✅ Prva shranitev podatkov v: {output_filepath}")
+        print("📢 Ni novih podatkov za združitev.")
+
+    save_watermark(STAGE, {"stations": marks, "fingerprint": fingerprint})
 
 def main():
-    aqi_filepath = os.path.join("data", "raw", "aqi", "aqi_data.csv")
-    weather_filepath = os.path.join("data", "raw", "weather", "weather_data.csv")
-    output_filepath = os.path.join("data", "raw", "merged_data_raw.csv")
-    
-    merge_data(aqi_filepath, weather_filepath, output_filepath)
+    parser = argparse.ArgumentParser(description="Združevanje AQI in vremenskih podatkov.")
+    parser.add_argument("--chunked", action="store_true", help="Postopni način za zgodovino, ki ne gre v pomnilnik.")
+    parser.add_argument("--memory-budget-mb", type=float, default=DEFAULT_MEMORY_BUDGET_MB)
+    args = parser.parse_args()
+
+    import_csv(os.path.join("data", "raw", "merged_data_raw.csv"), MERGED_STORE)
+    merge_data(AQI_STORE, WEATHER_STORE, MERGED_STORE, args.chunked, args.memory_budget_mb)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,72 +1,108 @@
 import os
+import argparse
 import pandas as pd
 import numpy as np
 
-def process_data(input_filepath, output_filepath):
+from src.data.store import (MERGED_STORE, PROCESSED_STORE, DEFAULT_MEMORY_BUDGET_MB, append, import_csv, chunk_rows_for_budget,
+                            iter_chunks, to_utc)
+from src.data.sketch import TDigest
+from src.data.transform import categorize_aqi, fill_missing
+from src.data.watermark import load_watermark, save_watermark, inputs_fingerprint, read_since, iter_since, advance_marks, fresh_rows
+
+STAGE = "process"
+
+def transform_chunk(df_new, sketches, station_marks=None):
     """
-    Procesira podatke iz vhodne CSV datoteke:
-      - Pretvori stolpec 'date' v tip datetime (če še ni)
-      - Odstrani podvajanje zapisov na podlagi stolpca 'date' (če za isti datum obstaja več zapisov, obdrži zadnji)
-      - V numeričnih stolpcih (razen 'date') zapolni manjkajoče vrednosti z mediano vrednostjo
-      - Doda stolpec 'category' na podlagi vrednosti 'eu_aqi'
-      - Pretvori kategorične stolpce (razen 'date') v dummy spremenljivke
-      - Preveri, ali podatki za določen datum že obstajajo; če ja, jih ne dodaja ponovno.
+    Obdela en paket (ali kos) podatkov in sproti posodobi kvantilne skice v `sketches`.
+    V skice gredo le zapisi, novejši od `station_marks`; ponovno prebrane ure (okno popravkov) so že v njih.
     """
-    # Preberi vhodno CSV datoteko, stolpec 'date' pretvori v datetime
-    df_new = pd.read_csv(input_filepath, parse_dates=["date"])
-    
-    # Odstrani podvajanje zapisov glede na 'date' (obdrži zadnji zapis za vsak datum)
-    df_new = df_new.drop_duplicates(subset=["date"], keep="last")
-    
+    # Odstrani podvajanje zapisov glede na 'station' in 'date' (obdrži zadnji zapis za vsak datum postaje)
+    df_new = df_new.drop_duplicates(subset=["station", "date"], keep="last")
+
     # Identificiramo numerične stolpce (razen 'date')
     numeric_cols = df_new.select_dtypes(include=[np.number]).columns.tolist()
-    
-    # Zapolnimo manjkajoče vrednosti v numeričnih stolpcih z mediano vrednostjo
+
+    # Posodobimo skice s paketom in zapolnimo manjkajoče vrednosti z mediano celotne zgodovine
+    fresh = fresh_rows(df_new, station_marks)
     for col in numeric_cols:
-        if df_new[col].isnull().any():
-            median_val = df_new[col].median()
-            df_new[col].fillna(median_val, inplace=True)
-    
-    # Dodajanje kategorije na podlagi 'eu_aqi'
-    def categorize_aqi(aqi):
-        if aqi <= 20:
-            return "good"
-        elif aqi <= 40:
-            return "fair"
-        elif aqi <= 60:
-            return "moderate"
-        elif aqi <= 80:
-            return "poor"
-        elif aqi <= 100:
-            return "very poor"
-        else:
-            return "extremely poor"
-    
-    df_new["category"] = df_new["eu_aqi"].apply(categorize_aqi)
-    
-    # Poskrbi, da je mapa za output ustvarjena
-    os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
-    
-    # Če datoteka že obstaja, preveri in dodaj samo nove podatke
-    if os.path.exists(output_filepath):
-        existing_df = pd.read_csv(output_filepath, parse_dates=["date"])
-        existing_dates = set(existing_df["date"].dt.date)
-        df_new = df_new[~df_new["date"].dt.date.isin(existing_dates)]
+        sketches.setdefault(col, TDigest()).update(df_new[col].to_numpy()[fresh])
+    df_new = fill_missing(df_new, {col: sketches[col].median() for col in numeric_cols})
+
+    # Dodajanje kategorije na podlagi 'eu_aqi' (skupna tabela mej iz src.data.transform)
+    df_new["category"] = categorize_aqi(df_new["eu_aqi"])
+    return df_new
+
+def rebuild_sketches(input_store, station_marks, chunk_rows):
+    """
+    Zgradi kvantilne skice iz vhodnih zapisov do vodnih oznak postaj (npr. po premiku oznak nazaj,
+    ko shranjene skice že vsebujejo ure, ki bodo ponovno obdelane).
+    """
+    marks = {station: to_utc(ts) for station, ts in station_marks.items()}
+    sketches = {}
+    for df in iter_chunks(input_store, chunk_rows, end=max(marks.values()) + pd.Timedelta(hours=1), stations=list(marks)):
+        df = df[~fresh_rows(df, marks)].drop_duplicates(subset=["station", "date"], keep="last")
+        for col in df.select_dtypes(include=[np.number]).columns:
+            sketches.setdefault(col, TDigest()).update(df[col].to_numpy())
+    return sketches
 
+def process_data(input_store, output_store, chunked=False, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """
+    Procesira nove podatke iz vhodne shrambe (novejše od vodne oznake stopnje):
+      - Pretvori stolpec 'date' v tip datetime (če še ni)
+      - Odstrani podvajanje zapisov na podlagi stolpcev 'station' in 'date' (če za isti datum postaje obstaja več zapisov, obdrži zadnji)
+      - V numeričnih stolpcih (razen 'date') zapolni manjkajoče vrednosti z mediano vrednostjo,
+        oceneno s kvantilno skico celotne zgodovine (skica se shrani skupaj z vodno oznako)
+      - Doda stolpec 'category' na podlagi vrednosti 'eu_aqi'
+      - Pretvori kategorične stolpce (razen 'date') v dummy spremenljivke
+      - Po zapisu premakne vodno oznako stopnje, da se isti zapisi ne obdelajo ponovno.
+    V postopnem načinu (`chunked`) bere vhod po kosih in izhod zapisuje sproti.
+    """
+    watermark = load_watermark(STAGE)
+    fingerprint = inputs_fingerprint([input_store])
+    if watermark.get("fingerprint") == fingerprint:
+        print("📢 Vhodni podatki se od zadnje obdelave niso spremenili.")
+        return
+
+    # Preberi samo zapise, novejše od vodne oznake (in okno naknadno popravljenih ur pred njo)
+    station_marks = watermark.get("stations", {})
+    if chunked:
+        chunks = iter_since(input_store, station_marks, chunk_rows_for_budget(input_store, memory_budget_mb))
+    else:
+        chunks = [read_since(input_store, station_marks)]
+
+    if station_marks and "sketches" not in watermark:
+        print("🔹 Gradim kvantilne skice iz že obdelanih ur...")
+        sketches = rebuild_sketches(input_store, station_marks, chunk_rows_for_budget(input_store, memory_budget_mb))
+    else:
+        sketches = {col: TDigest.from_dict(state) for col, state in watermark.get("sketches", {}).items()}
+    marks = dict(station_marks)
+    added = 0
+    for df_new in chunks:
         if df_new.empty:
-            print("📢 Ni novih podatkov za dodajanje.")
-        else:
-            combined_df = pd.concat([existing_df, df_new]).drop_duplicates(subset=["date"], keep="last")
-            combined_df.to_csv(output_filepath, index=False)
-            print(f"✅ Dodano {len(df_new)} novih zapisov v: {output_filepath}")
+            continue
+        df_new = transform_chunk(df_new, sketches, station_marks)
+        added += append(output_store, df_new)
+        marks = advance_marks(marks, df_new)
+
+    if added:
+        print(f"✅ Dodano {added} novih zapisov v: {output_store}")
     else:
-        df_new.to_csv(output_filepath, index=False)
-        print(f"✅ Prva shranitev podatkov v: {output_filepath}")
+        print("📢 Ni novih podatkov za dodajanje.")
+
+    save_watermark(STAGE, {
+        "stations": marks,
+        "fingerprint": fingerprint,
+        "sketches": {col: sketch.to_dict() for col, sketch in sketches.items()},
+    })
 
 def main():
-    input_filepath = os.path.join("data", "raw", "merged_data_raw.csv")
-    output_filepath = os.path.join("data", "processed", "dataset.csv")
-    process_data(input_filepath, output_filepath)
+    parser = argparse.ArgumentParser(description="Procesiranje združenih podatkov.")
+    parser.add_argument("--chunked", action="store_true", help="Postopni način za zgodovino, ki ne gre v pomnilnik.")
+    parser.add_argument("--memory-budget-mb", type=float, default=DEFAULT_MEMORY_BUDGET_MB)
+    args = parser.parse_args()
+
+    import_csv(os.path.join("data", "processed", "dataset.csv"), PROCESSED_STORE)
+    process_data(MERGED_STORE, PROCESSED_STORE, args.chunked, args.memory_budget_mb)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.getenv("OPENMETEO_CACHE_DIR", os.path.join(".cache", "openmeteo"))
+DEFAULT_MAX_MB = float(os.getenv("OPENMETEO_CACHE_MAX_MB", "512"))
+DEFAULT_TTL = 3600
+
+def cache_key(url, latitude, longitude, variables, params):
+    """
+    Ključ zapisa: končna točka, lokacija, nabor spremenljivk in časovno okno
+    (vsi ostali parametri zahtevka, npr. start_date/end_date ali past_days/forecast_days).
+    """
+    window = {k: v for k, v in params.items() if k not in ("latitude", "longitude", "hourly")}
+    raw = json.dumps([url, round(latitude, 4), round(longitude, 4), list(variables), window], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+def is_completed_window(params):
+    """Okno s končnim datumom pred današnjim dnem (UTC) se ne spreminja več."""
+    end_date = params.get("end_date")
+    return end_date is not None and str(end_date) < datetime.utcnow().strftime("%Y-%m-%d")
+
+def window_state(params):
+    """'settled' za zaključena okna, sicer 'open' (tekoči dan, napoved ali past_days/forecast_days)."""
+    return "settled" if is_completed_window(params) else "open"
+
+class ResponseCache:
+    """
+    Cache že dekodiranih Open-Meteo odgovorov (ena postaja, en nabor spremenljivk, eno okno).
+    - Vrednosti so shranjene kot float32 .npy (spremenljivke × ure) in se berejo z mmap.
+    - Časovna os je opisana z začetkom in intervalom v JSON metapodatkih.
+    - TTL je odvisen od končne točke in stanja okna: `ttls` = {url: {"settled": TTL, "open": TTL}}
+      (None = ne poteče); brez nastavitve zaključena okna ne potečejo, ostala po `default_ttl`.
+    - Ob preseganju `max_mb` odstrani najdlje neuporabljene zapise (LRU).
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_mb=DEFAULT_MAX_MB, ttls=None, default_ttl=DEFAULT_TTL):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _paths(self, key):
+        return os.path.join(self.directory, f"{key}.npy"), os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self):
+        """Ob prvi uporabi prebere metapodatke vseh zapisov (ključ → velikost, zadnja uporaba)."""
+        if self._index is not None:
+            return
+        self._index = {}
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy"):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                self._index[name[:-4]] = {"size": stat.st_size, "used": stat.st_mtime}
+
+    def ttl(self, url, params):
+        """Življenjska doba zapisa v sekundah (None = ne poteče)."""
+        state = window_state(params)
+        return self.ttls.get(url, {}).get(state, None if state == "settled" else self.default_ttl)
+
+    def get(self, key):
+        """Vrne (metapodatki, vrednosti) ali None, če zapisa ni ali je potekel."""
+        values_path, meta_path = self._paths(key)
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                self.stats["misses"] += 1
+                return None
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            if meta["expires_at"] is not None and meta["expires_at"] < time.time():
+                self._remove(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            now = time.time()
+            self._index[key]["used"] = now
+            os.utime(values_path, (now, now))
+            self.stats["hits"] += 1
+        return meta, np.load(values_path, mmap_mode="r")
+
+    def put(self, key, values, time_start, interval, ttl):
+        """Shrani dekodirane vrednosti (atomarno) in po potrebi sprosti prostor."""
+        os.makedirs(self.directory, exist_ok=True)
+        values_path, meta_path = self._paths(key)
+        meta = {
+            "time": int(time_start),
+            "interval": int(interval),
+            "expires_at": None if ttl is None else time.time() + ttl,
+        }
+        tmp_suffix = f".{threading.get_ident()}.tmp"
+        with open(values_path + tmp_suffix, "wb") as f:
+            np.save(f, np.ascontiguousarray(values, dtype=np.float32))
+        with open(meta_path + tmp_suffix, "w") as f:
+            json.dump(meta, f)
+        with self._lock:
+            self._load_index()
+            os.replace(meta_path + tmp_suffix, meta_path)
+            os.replace(values_path + tmp_suffix, values_path)
+            self._index[key] = {"size": os.path.getsize(values_path), "used": time.time()}
+            self._evict()
+
+    def _remove(self, key):
+        self._index.pop(key, None)
+        for path in self._paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]["size"]
+            self._remove(key)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._load_index()
+            for key in list(self._index):
+                self._remove(key)
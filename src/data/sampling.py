@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from src.data.store import iter_chunks, partition_row_counts, partition_bounds, to_utc, chunk_rows_for_budget
+
+SAMPLING_METHODS = ["reservoir", "time"]
+
+def reservoir_sample(chunks, k, seed=0):
+    """
+    Enakomeren vzorec največ `k` vrstic iz toka kosov (algoritem R, vektoriziran po kosih).
+    V pomnilniku sta le rezervoar in trenutni kos.
+    """
+    rng = np.random.default_rng(seed)
+    reservoir, seen = None, 0
+    for chunk in chunks:
+        chunk = chunk.reset_index(drop=True)
+        if reservoir is None:
+            reservoir = chunk.iloc[:0]
+
+        # Polnjenje rezervoarja
+        fill = min(max(k - len(reservoir), 0), len(chunk))
+        if fill:
+            reservoir = pd.concat([reservoir, chunk.iloc[:fill]], ignore_index=True)
+
+        # Vrstica z globalnim indeksom i nadomesti naključno mesto z verjetnostjo k / (i + 1)
+        positions = seen + np.arange(fill, len(chunk))
+        slots = (rng.random(positions.size) * (positions + 1)).astype(np.int64)
+        accepted = slots < k
+        if accepted.any():
+            rows, slots = np.arange(fill, len(chunk))[accepted], slots[accepted]
+            # Več zamenjav istega mesta: obvelja zadnja (kot pri zaporednem algoritmu)
+            _, last = np.unique(slots[::-1], return_index=True)
+            keep = slots.size - 1 - last
+            replaced = chunk.iloc[rows[keep]].set_axis(slots[keep])
+            reservoir = pd.concat([reservoir.drop(index=slots[keep]), replaced]).sort_index()
+        seen += len(chunk)
+    return reservoir.reset_index(drop=True) if reservoir is not None else pd.DataFrame()
+
+def time_stratified_sample(df, k, freq="D", seed=0):
+    """Vzorec z enakim deležem vrstic iz vsakega časovnega razreda (privzeto dneva)."""
+    if len(df) <= k:
+        return df
+    buckets = df["date"].dt.floor(freq)
+    return df.groupby(buckets, group_keys=False).sample(frac=k / len(df), random_state=seed).reset_index(drop=True)
+
+def sample_store(store_path, k, start=None, end=None, method="reservoir", seed=0, memory_budget_mb=64):
+    """
+    Vzorec največ `k` zapisov iz intervala [start, end) shrambe, branje po kosih.
+    - reservoir: enakomeren vzorec (algoritem R)
+    - time: časovno stratificiran vzorec (enak delež iz vsakega dneva)
+    """
+    chunk_rows = chunk_rows_for_budget(store_path, memory_budget_mb)
+    chunks = iter_chunks(store_path, chunk_rows, start=start, end=end)
+    if method == "reservoir":
+        return reservoir_sample(chunks, k, seed)
+    if method != "time":
+        raise ValueError(f"Neznan način vzorčenja: {method}")
+
+    # Delež ocenimo iz metapodatkov particij v intervalu (robni particiji štejeta v celoti)
+    start, end = to_utc(start), to_utc(end)
+    total = sum(
+        n for label, _, n in partition_row_counts(store_path)
+        if (start is None or partition_bounds(label)[1] > start) and (end is None or partition_bounds(label)[0] < end)
+    )
+    frac = min(1.0, k / total) if total else 1.0
+    samples = [time_stratified_sample(chunk, int(np.ceil(len(chunk) * frac)), seed=seed) for chunk in chunks]
+    return pd.concat(samples, ignore_index=True) if samples else pd.DataFrame()
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from src.data.transform import AQI_CATEGORY_DTYPE
+
+# Osrednja shema podatkov celotnega cevovoda
+DATE_COLUMN = "date"
+CATEGORY_COLUMN = "category"
+FLOAT_COLUMNS = [
+    "pm10", "pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "eu_aqi",
+    "temperature_2m", "relative_humidity_2m", "rain", "snowfall",
+]
+FLAG_COLUMNS = ["is_day"]
+
+# Tipi za branje CSV; zastavice se preberejo kot float32 (lahko manjkajo) in po potrebi skrčijo v uint8
+CSV_DTYPES = {
+    **{col: np.float32 for col in FLOAT_COLUMNS + FLAG_COLUMNS},
+    CATEGORY_COLUMN: AQI_CATEGORY_DTYPE,
+}
+
+def apply_schema(df):
+    """
+    Pretvori znane stolpce v kompaktne tipe:
+      - meritve → float32
+      - 'is_day' → uint8 (float32, dokler vsebuje manjkajoče vrednosti)
+      - 'category' → urejena kategorična spremenljivka
+      - 'date' → datetime64[ns, UTC]
+    Neznani stolpci ostanejo nespremenjeni.
+    """
+    conversions = {}
+    for col in df.columns:
+        if col in FLOAT_COLUMNS:
+            target = np.float32
+        elif col in FLAG_COLUMNS:
+            target = np.uint8 if not df[col].isna().any() else np.float32
+        elif col == CATEGORY_COLUMN:
+            target = AQI_CATEGORY_DTYPE
+        else:
+            continue
+        if df[col].dtype != target:
+            conversions[col] = target
+
+    if conversions:
+        df = df.astype(conversions)
+    if DATE_COLUMN in df.columns and str(df[DATE_COLUMN].dtype) != "datetime64[ns, UTC]":
+        df = df.assign(**{DATE_COLUMN: pd.to_datetime(df[DATE_COLUMN], utc=True)})
+    return df
+
+def read_csv(filepath, **kwargs):
+    """Prebere CSV datoteko cevovoda neposredno v kompaktne tipe osrednje sheme."""
+    df = pd.read_csv(filepath, dtype=CSV_DTYPES, **kwargs)
+    return apply_schema(df)
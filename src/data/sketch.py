@@ -0,0 +1,92 @@
+import numpy as np
+
+class TDigest:
+    """
+    Kvantilna skica (t-digest) za sprotno ocenjevanje mediane in drugih kvantilov.
+    - Posodablja se po paketih; pomnilnik je omejen s parametrom `compression` (≈ število centroidov).
+    - Skice je mogoče združevati in serializirati (to_dict/from_dict), zato jih lahko hranimo med zagoni.
+    Centroide združujemo vektorsko: centroid i pripada skupini floor(k(q_i)), kjer je k lestvična
+    funkcija k1 (gostejši centroidi na repih porazdelitve).
+    """
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def _scale(self, q):
+        return self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+
+        cumulative = np.cumsum(weights)
+        q_left = (cumulative - weights) / cumulative[-1]
+        groups = np.floor(self._scale(q_left))
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def update(self, values):
+        """Doda paket vrednosti (NaN vrednosti se ignorirajo)."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(values.size)]))
+        return self
+
+    def merge(self, other):
+        """Združi drugo skico v to (npr. profile več zagonov ali postaj)."""
+        if other.weights.size == 0:
+            return self
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, q):
+        """Oceni kvantil q (0 ≤ q ≤ 1); za prazno skico vrne NaN."""
+        if self.weights.size == 0:
+            return float("nan")
+
+        cumulative = np.cumsum(self.weights)
+        centers = cumulative - self.weights / 2
+        positions = np.r_[0.0, centers, cumulative[-1]]
+        values = np.r_[self.min, self.means, self.max]
+        return float(np.interp(q * cumulative[-1], positions, values))
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def to_dict(self):
+        """Serializira stanje skice v JSON-kompatibilen slovar."""
+        empty = self.weights.size == 0
+        return {
+            "compression": self.compression,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "min": None if empty else self.min,
+            "max": None if empty else self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Obnovi skico iz slovarja, ki ga vrne to_dict()."""
+        sketch = cls(compression=state["compression"])
+        sketch.means = np.asarray(state["means"], dtype=float)
+        sketch.weights = np.asarray(state["weights"], dtype=float)
+        if state["min"] is not None:
+            sketch.min, sketch.max = state["min"], state["max"]
+        return sketch
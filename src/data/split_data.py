@@ -1,51 +1,162 @@
 import os
+import argparse
 import pandas as pd
 
-def split_data(input_path, output_train, output_test, test_size_ratio=0.1):
-    """Razdeli podatke na train in test glede na časovne žige."""
-    
-    # Preverimo, ali datoteka obstaja
-    if not os.path.exists(input_path):
+from src.data.splits import (SPLIT_MANIFEST_PATH, LEGACY_SPLIT_PATHS, FOLD_MODES, build_manifest, add_folds,
+                             save_manifest)
+from src.data.store import (PROCESSED_STORE, DEFAULT_MEMORY_BUDGET_MB, read, iter_chunks, list_partitions, partition_row_counts,
+                            partition_bounds, chunk_rows_for_budget, store_columns, to_utc)
+from src.data.watermark import load_watermark, save_watermark, inputs_fingerprint, file_signature
+
+STAGE = "split"
+
+def find_boundary(input_path, test_size_ratio):
+    """
+    Poišče časovni žig, od katerega naprej so zapisi v testnem naboru.
+    Število vrstic prebere iz Parquet metapodatkov, datume pa le iz particije, v kateri je meja.
+    """
+    counts = partition_row_counts(input_path)
+    total = sum(n for _, _, n in counts)
+    if total == 0:
+        return None, 0
+
+    test_size = max(1, int(total * test_size_ratio))
+    position = total - test_size
+    for label, path, n in counts:
+        if position < n:
+            dates = pd.read_parquet(path, columns=["date"])["date"].sort_values(ignore_index=True)
+            return dates.iloc[position], total
+        position -= n
+    return None, total
+
+def write_csv(input_path, output_path, start, end, append_rows, chunk_rows=None):
+    """
+    Zapiše zapise iz intervala [start, end) v CSV in vrne njihovo število.
+    - `append_rows`: dodaj na konec obstoječe datoteke namesto prepisa.
+    - `chunk_rows`: piši po kosih (postopni način), sicer prebere interval naenkrat.
+    """
+    if chunk_rows is None:
+        chunks = [read(input_path, start=start, end=end).sort_values(by="date")]
+    else:
+        chunks = iter_chunks(input_path, chunk_rows, start=start, end=end)
+
+    written, first = 0, True
+    for df in chunks:
+        header = first and not append_rows
+        df.to_csv(output_path, mode="w" if header else "a", header=header, index=False)
+        written += len(df)
+        first = False
+
+    # Prazen interval: zapišemo le glavo
+    if first and not append_rows:
+        pd.DataFrame(columns=store_columns(input_path)).to_csv(output_path, index=False)
+    return written
+
+def split_data(input_path, output_train=None, output_test=None, test_size_ratio=0.1, chunked=False,
+               memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, manifest_path=SPLIT_MANIFEST_PATH, n_folds=0,
+               fold_mode="expanding"):
+    """
+    Razdeli podatke na train in test glede na časovne žige.
+    - Zapiše le manifest delitve (meja in obsegi vrstic v obdelani shrambi); nalagalniki ga razrešijo v rezine.
+    - `n_folds`: v manifest doda še časovne pregibe (`fold_mode`: expanding ali rolling) nad učnim delom.
+    - Če se vhod od zadnjega zagona ni spremenil, stopnjo preskoči.
+    - `output_train`/`output_test`: dodatno izvozi CSV datoteki. Če train datoteka ni bila spremenjena izven
+      te stopnje, vanjo doda le zapise med prejšnjo in novo mejo; v postopnem načinu (`chunked`) piše po kosih.
+    """
+
+    # Preverimo, ali shramba obstaja
+    if not list_partitions(input_path):
         print(f"⚠️ Opozorilo: {input_path} ne obstaja. Preskakujem...")
         return
-    
-    df = pd.read_csv(input_path, parse_dates=["date"])
 
-    if df.empty:
+    watermark = load_watermark(STAGE)
+    fingerprint = inputs_fingerprint([input_path])
+    export_paths = [path for path in (output_train, output_test) if path]
+    outputs = {path: file_signature(path) for path in export_paths}
+    folds = [n_folds, fold_mode]
+    if (watermark.get("fingerprint") == fingerprint and watermark.get("outputs", {}) == outputs
+            and watermark.get("manifest") == file_signature(manifest_path) and watermark.get("folds", [0, "expanding"]) == folds):
+        print("📢 Vhodni podatki se od zadnje delitve niso spremenili.")
+        return
+
+    # Določimo mejo med train in test (zapisi ob isti uri ostanejo skupaj)
+    boundary, total = find_boundary(input_path, test_size_ratio)
+
+    if boundary is None:
         print(f"⚠️ Opozorilo: {input_path} je prazna. Preskakujem...")
         return
-    
-    # Sortiramo podatke glede na čas (da ohranimo zaporedje)
-    df = df.sort_values(by="date")
-    
-    # Določimo velikost testnega nabora
-    test_size = max(1, int(len(df) * test_size_ratio))
-    
-    # Razdelimo na train in test
-    train_df = df.iloc[:-test_size]
-    test_df = df.iloc[-test_size:]
-
-    # Ustvarimo mape, če še ne obstajajo
-    os.makedirs(os.path.dirname(output_train), exist_ok=True)
-    os.makedirs(os.path.dirname(output_test), exist_ok=True)
-
-    # Shranimo podatke
-    train_df.to_csv(output_train, index=False)
-    test_df.to_csv(output_test, index=False)
-
-    print(f"✅ Podatki razdeljeni: Train ({len(train_df)}), Test ({len(test_df)})")
+
+    manifest = build_manifest(input_path, boundary)
+    if n_folds:
+        add_folds(manifest, n_folds, fold_mode)
+    save_manifest(manifest, manifest_path)
+    signatures = {p["label"]: p["signature"] for p in manifest["partitions"]}
+    train_rows, test_rows = (manifest["splits"][name]["rows"] for name in ("train", "test"))
+
+    if export_paths:
+        export_csv(input_path, output_train, output_test, boundary, watermark, outputs, signatures, chunked, memory_budget_mb)
+
+    save_watermark(STAGE, {
+        "train_end": boundary.isoformat(),
+        "partitions": signatures,
+        "fingerprint": fingerprint,
+        "manifest": file_signature(manifest_path),
+        "folds": folds,
+        "outputs": {path: file_signature(path) for path in export_paths},
+    })
+
+    print(f"✅ Podatki razdeljeni: Train ({train_rows[1] - train_rows[0]}), Test ({test_rows[1] - test_rows[0]})"
+          + (f", {n_folds} pregibov ({fold_mode})" if n_folds else "") + f" → {manifest_path}")
+
+def export_csv(input_path, output_train, output_test, boundary, watermark, outputs, signatures, chunked=False,
+               memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """Izvoz delitve v CSV datoteki (za orodja, ki manifesta ne poznajo)."""
+    chunk_rows = chunk_rows_for_budget(input_path, memory_budget_mb) if chunked else None
+
+    if output_train:
+        # Train: dodamo samo zapise med prejšnjo in novo mejo, če zgodovina pred njo ni spremenjena
+        os.makedirs(os.path.dirname(output_train), exist_ok=True)
+        train_end = to_utc(watermark["train_end"]) if watermark.get("train_end") else None
+        incremental = (
+            train_end is not None
+            and train_end <= boundary
+            and watermark.get("outputs", {}).get(output_train) == outputs[output_train]
+            and all(
+                signatures.get(label) == signature
+                for label, signature in watermark.get("partitions", {}).items()
+                if partition_bounds(label)[1] <= train_end
+            )
+        )
+        train_written = write_csv(input_path, output_train, train_end if incremental else None, boundary,
+                                  append_rows=incremental, chunk_rows=chunk_rows)
+        print(f"📄 Train CSV {'dodano' if incremental else 'zapisano'} {train_written}: {output_train}")
+
+    if output_test:
+        # Test: zadnji del zgodovine, zapisan v celoti
+        os.makedirs(os.path.dirname(output_test), exist_ok=True)
+        test_written = write_csv(input_path, output_test, boundary, None, append_rows=False, chunk_rows=chunk_rows)
+        print(f"📄 Test CSV zapisano {test_written}: {output_test}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Delitev podatkov na train in test.")
+    parser.add_argument("--chunked", action="store_true", help="Postopni način za zgodovino, ki ne gre v pomnilnik.")
+    parser.add_argument("--memory-budget-mb", type=float, default=DEFAULT_MEMORY_BUDGET_MB)
+    parser.add_argument("--export-csv", action="store_true", help="Dodatno izvozi train/test CSV datoteki.")
+    parser.add_argument("--folds", type=int, default=0, help="Število časovnih pregibov nad učnim delom.")
+    parser.add_argument("--fold-mode", choices=FOLD_MODES, default="expanding")
+    args = parser.parse_args()
+
     # Fiksne poti
-    input_path = "data/processed/dataset.csv"
-    output_train = "data/processed/train/train_data.csv"
-    output_test = "data/processed/test/test_data.csv"
-    
+    input_path = PROCESSED_STORE
+    output_train = LEGACY_SPLIT_PATHS["train"] if args.export_csv else None
+    output_test = LEGACY_SPLIT_PATHS["test"] if args.export_csv else None
+
     # Test size ratio (lahko prilagodimo)
     test_size_ratio = 0.1
 
     # Izvedemo delitev podatkov
-    split_data(input_path, output_train, output_test, test_size_ratio)
+    split_data(input_path, output_train, output_test, test_size_ratio, args.chunked, args.memory_budget_mb,
+               n_folds=args.folds, fold_mode=args.fold_mode)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
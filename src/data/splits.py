@@ -0,0 +1,151 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+from src.data.schema import read_csv
+from src.data.store import partition_bounds, partition_row_counts, read, read_rows, to_utc
+from src.data.watermark import file_signature
+
+# Manifest delitve: časovne meje in obsegi vrstic train/test (in izbirnih pregibov) v obdelani shrambi
+SPLIT_MANIFEST_PATH = os.path.join("data", "processed", "split.json")
+
+# Starejši izhodi stopnje split (uporabijo se le, če manifest še ne obstaja)
+LEGACY_SPLIT_PATHS = {
+    "train": "data/processed/train/train_data.csv",
+    "test": "data/processed/test/test_data.csv",
+}
+
+FOLD_MODES = ["expanding", "rolling"]
+
+def boundary_row(store_path, boundary, counts=None):
+    """Globalni indeks prve vrstice z datumom >= `boundary` (shramba je urejena po datumu)."""
+    boundary = to_utc(boundary)
+    position = 0
+    for label, path, n in counts if counts is not None else partition_row_counts(store_path):
+        # Datume preberemo le iz particije, v kateri je meja
+        if partition_bounds(label)[1] <= boundary:
+            position += n
+            continue
+        dates = pd.read_parquet(path, columns=["date"])["date"]
+        return position + int(np.searchsorted(dates.to_numpy(dtype="datetime64[ns]"), boundary.tz_convert(None).to_datetime64(), side="left"))
+    return position
+
+def build_manifest(store_path, boundary):
+    """
+    Manifest delitve na meji `boundary`: train = vrstice pred mejo, test = od meje naprej.
+    Vsebuje podpise in število vrstic particij, da je mogoče preveriti, ali obsegi še veljajo.
+    """
+    counts = partition_row_counts(store_path)
+    total = sum(n for _, _, n in counts)
+    split_row = boundary_row(store_path, boundary, counts)
+    return {
+        "store": store_path,
+        "partitions": [{"label": label, "rows": n, "signature": file_signature(path)} for label, path, n in counts],
+        "splits": {
+            "train": {"start": None, "end": to_utc(boundary).isoformat(), "rows": [0, split_row]},
+            "test": {"start": to_utc(boundary).isoformat(), "end": None, "rows": [split_row, total]},
+        },
+    }
+
+def save_manifest(manifest, manifest_path=SPLIT_MANIFEST_PATH):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+def load_manifest(manifest_path=SPLIT_MANIFEST_PATH):
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        return json.load(f)
+
+def manifest_is_current(manifest):
+    """Obsegi vrstic veljajo, dokler so particije shrambe enake kot ob zapisu manifesta."""
+    counts = partition_row_counts(manifest["store"])
+    return [(label, n) for label, _, n in counts] == [(p["label"], p["rows"]) for p in manifest["partitions"]] and all(
+        file_signature(path) == p["signature"] for (_, path, _), p in zip(counts, manifest["partitions"])
+    )
+
+def split_fingerprint(name, manifest_path=SPLIT_MANIFEST_PATH):
+    """
+    Prstni odtis dela delitve iz manifesta (obseg vrstic in podpisi particij), brez branja podatkov.
+    Vrne None, če manifest ne obstaja ali ne velja več.
+    """
+    manifest = load_manifest(manifest_path)
+    if manifest is None or not manifest_is_current(manifest):
+        return None
+    state = {"split": manifest["splits"][name], "partitions": manifest["partitions"]}
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+def make_folds(n_rows, n_folds=5, mode="expanding", window=None, test_size=None, gap=0):
+    """
+    Časovni pregibi nad prvimi `n_rows` vrsticami kot obsegi [začetek, konec) (enako kot TimeSeriesSplit).
+    - expanding: učni del se začne na začetku in raste,
+    - rolling: učni del ima fiksno dolžino `window` (privzeto dolžina testnega dela × 2).
+    `gap` vrstic med učnim in testnim delom se izpusti.
+    """
+    if mode not in FOLD_MODES:
+        raise ValueError(f"Neznan način pregibov: {mode}")
+    test_size = test_size or n_rows // (n_folds + 1)
+    if test_size < 1:
+        raise ValueError(f"Premalo vrstic ({n_rows}) za {n_folds} pregibov.")
+    window = window or 2 * test_size
+    folds = []
+    for i in range(n_folds):
+        test_start = n_rows - (n_folds - i) * test_size
+        train_end = test_start - gap
+        train_start = max(0, train_end - window) if mode == "rolling" else 0
+        if train_end <= train_start:
+            raise ValueError(f"Premalo vrstic ({n_rows}) za {n_folds} pregibov.")
+        folds.append({"train": [train_start, train_end], "test": [test_start, test_start + test_size]})
+    return folds
+
+def add_folds(manifest, n_folds=5, mode="expanding", window=None, test_size=None, gap=0, split="train"):
+    """Doda pregibe nad delom `split` v manifest (obsegi so globalni indeksi vrstic v shrambi)."""
+    offset, end = manifest["splits"][split]["rows"]
+    folds = make_folds(end - offset, n_folds, mode, window, test_size, gap)
+    manifest["folds"] = {"split": split, "mode": mode, "folds": [
+        {part: [offset + lo, offset + hi] for part, (lo, hi) in fold.items()} for fold in folds
+    ]}
+    return manifest
+
+def cv_splits(manifest):
+    """Pregibi manifesta kot (učni indeksi, testni indeksi) relativno na začetek dela (za `cv=` v scikit-learn)."""
+    offset = manifest["splits"][manifest["folds"]["split"]]["rows"][0]
+    return [(np.arange(*fold["train"]) - offset, np.arange(*fold["test"]) - offset)
+            for fold in manifest["folds"]["folds"]]
+
+def load_rows(rows, columns=None, manifest=None, manifest_path=SPLIT_MANIFEST_PATH):
+    """Vrstice z globalnimi indeksi [začetek, konec) iz shrambe manifesta (npr. en pregib)."""
+    manifest = manifest or load_manifest(manifest_path)
+    return read_rows(manifest["store"], rows[0], rows[1], columns)
+
+def load_split(name, columns=None, manifest_path=SPLIT_MANIFEST_PATH, start=None):
+    """
+    Naloži del delitve ('train' ali 'test') iz obdelane shrambe kot rezino vrstic.
+    Če se je shramba od delitve spremenila, uporabi časovne meje; brez manifesta prebere starejši CSV izhod.
+    `start`: le zapisi od tega časa naprej (particije pred njim se ne berejo).
+    Vrne None, če delitve ni.
+    """
+    manifest = load_manifest(manifest_path)
+    if manifest is None:
+        legacy_path = LEGACY_SPLIT_PATHS.get(name)
+        if legacy_path and os.path.exists(legacy_path):
+            df = read_csv(legacy_path)
+            df = df if start is None else df[df["date"] >= to_utc(start)].reset_index(drop=True)
+            return df if columns is None else df[[col for col in ["station", "date"] + list(columns) if col in df.columns]]
+        print(f"⚠️ Manifest delitve ne obstaja: {manifest_path}")
+        return None
+
+    split = manifest["splits"][name]
+    if start is not None:
+        split_start = to_utc(split["start"]) if split["start"] else None
+        start = max(to_utc(start), split_start) if split_start is not None else to_utc(start)
+        return read(manifest["store"], start=start, end=split["end"], columns=columns)
+    if manifest_is_current(manifest):
+        return load_rows(split["rows"], columns, manifest)
+    print(f"⚠️ Shramba se je od delitve spremenila, '{name}' berem po časovnih mejah.")
+    return read(manifest["store"], start=split["start"], end=split["end"], columns=columns)
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class Station:
+    """Merilna postaja z imenom in koordinatami."""
+    name: str
+    latitude: float
+    longitude: float
+
+# Register merilnih postaj (prva je izvorna postaja projekta)
+STATIONS = [
+    Station("maribor", 46.55, 15.64),
+    Station("ljubljana", 46.05, 14.51),
+    Station("celje", 46.23, 15.27),
+    Station("kranj", 46.24, 14.36),
+    Station("koper", 45.55, 13.73),
+    Station("novo_mesto", 45.80, 15.17),
+    Station("murska_sobota", 46.66, 16.17),
+    Station("nova_gorica", 45.96, 13.65),
+]
+
+DEFAULT_STATION = STATIONS[0].name
+
+def get_stations(names=None):
+    """
+    Vrne seznam postaj iz registra.
+    - Če `names` ni podan, vrne vse postaje.
+    - Sicer vrne postaje z navedenimi imeni (v podanem vrstnem redu).
+    """
+    if not names:
+        return list(STATIONS)
+
+    by_name = {station.name: station for station in STATIONS}
+    missing = [name for name in names if name not in by_name]
+    if missing:
+        raise ValueError(f"Neznane postaje: {', '.join(missing)}")
+    return [by_name[name] for name in names]
+
+def ensure_station_column(df):
+    """
+    Starejši CSV-ji nimajo stolpca 'station'; takšnim zapisom pripišemo privzeto postajo.
+    """
+    if "station" not in df.columns:
+        df = df.copy()
+        df.insert(0, "station", DEFAULT_STATION)
+    return df
@@ -0,0 +1,284 @@
+import os
+import glob
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.data.stations import ensure_station_column
+from src.data.schema import apply_schema, read_csv
+
+# Lokacije particioniranih Parquet shramb posameznih stopenj
+AQI_STORE = os.path.join("data", "raw", "aqi")
+WEATHER_STORE = os.path.join("data", "raw", "weather")
+MERGED_STORE = os.path.join("data", "raw", "merged")
+PROCESSED_STORE = os.path.join("data", "processed", "dataset")
+
+KEY_COLUMNS = ["station", "date"]
+PARTITION_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m"}
+PART_FILE = "part.parquet"
+
+# Pomnilniški proračun za postopni (chunked) način in ocena porabe na celico (z vmesnimi kopijami)
+DEFAULT_MEMORY_BUDGET_MB = int(os.getenv("PIPELINE_MEMORY_BUDGET_MB", "256"))
+BYTES_PER_CELL = 32
+# Manjše skupine vrstic omogočajo branje po kosih brez dekodiranja cele particije
+ROW_GROUP_SIZE = 65_536
+
+# Particije, zapisane v tem procesu (pot → (podpis datoteke, DataFrame)); aktivno le znotraj `partition_cache`
+_partition_cache = None
+_partition_cache_limit = 0
+_partition_cache_lock = threading.Lock()
+
+def partition_labels(dates, granularity="month"):
+    """Vrne oznako particije (npr. 'month=2025-02') za vsak časovni žig."""
+    return f"{granularity}=" + dates.dt.strftime(PARTITION_FORMATS[granularity])
+
+def list_partitions(store_path):
+    """Vrne urejen seznam (oznaka, pot) vseh particij v shrambi."""
+    partitions = []
+    for granularity in PARTITION_FORMATS:
+        for path in glob.glob(os.path.join(store_path, f"{granularity}=*", PART_FILE)):
+            partitions.append((os.path.basename(os.path.dirname(path)), path))
+    return sorted(partitions, key=lambda partition: partition_bounds(partition[0]))
+
+def partition_row_counts(store_path):
+    """Vrne (oznaka, pot, število vrstic) za vsako particijo; prebere samo Parquet metapodatke."""
+    return [(label, path, pq.read_metadata(path).num_rows) for label, path in list_partitions(store_path)]
+
+def partition_bounds(label):
+    """Vrne polodprt časovni interval [začetek, konec), ki ga pokriva particija."""
+    granularity, value = label.split("=", 1)
+    start = pd.Timestamp(value, tz="UTC")
+    offset = pd.DateOffset(days=1) if granularity == "day" else pd.DateOffset(months=1)
+    return start, start + offset
+
+def to_utc(ts):
+    """Pretvori časovni žig v UTC (naivne žige obravnava kot UTC)."""
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+def empty_frame(columns=None):
+    """Prazen DataFrame s pravilno tipiziranimi ključnimi stolpci (da ga je mogoče združevati)."""
+    df = pd.DataFrame({"station": pd.Series(dtype=object), "date": pd.Series(dtype="datetime64[ns, UTC]")})
+    for col in columns or []:
+        if col not in df.columns:
+            df[col] = pd.Series(dtype=float)
+    return df
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+@contextmanager
+def partition_cache(memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """
+    Znotraj bloka hrani pravkar zapisane (in prebrane) particije v pomnilniku, da jih naslednja stopnja
+    v istem procesu prebere brez ponovnega dekodiranja Parquet datotek.
+    Zapis velja, dokler se podpis datoteke ne spremeni; ob preseganju proračuna se odstranijo najstarejši.
+    Particije v cache-u so le za branje: `read` in `read_rows` vrneta kopije, zato spreminjanje
+    vrnjenih DataFrame-ov ne vpliva na kasnejša branja.
+    """
+    global _partition_cache, _partition_cache_limit
+    _partition_cache, _partition_cache_limit = OrderedDict(), int(memory_budget_mb * 1024 ** 2)
+    try:
+        yield
+    finally:
+        _partition_cache = None
+
+def _cache_get(path):
+    if _partition_cache is None:
+        return None
+    with _partition_cache_lock:
+        entry = _partition_cache.get(path)
+        if entry is None or entry[0] != _signature(path):
+            return None
+        _partition_cache.move_to_end(path)
+        return entry[1]
+
+def _cache_put(path, df):
+    if _partition_cache is None:
+        return
+    with _partition_cache_lock:
+        _partition_cache[path] = (_signature(path), df)
+        _partition_cache.move_to_end(path)
+        total = sum(entry[1].memory_usage(deep=False).sum() for entry in _partition_cache.values())
+        while total > _partition_cache_limit and len(_partition_cache) > 1:
+            _, (_, evicted) = _partition_cache.popitem(last=False)
+            total -= evicted.memory_usage(deep=False).sum()
+
+def _read_partition(path):
+    df = _cache_get(path)
+    if df is None:
+        df = pd.read_parquet(path)
+        _cache_put(path, df)
+    return df
+
+def _write_atomic(df, path):
+    """Zapiše Parquet v začasno datoteko in jo atomarno preimenuje, da bralci ne vidijo polovičnih zapisov."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, index=False, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp_path, path)
+    _cache_put(path, df)
+
+def append(store_path, df_new, granularity="month"):
+    """
+    Doda urne zapise v shrambo, ključ je par (postaja, ura).
+    - Prebere in prepiše samo particije, v katere padejo novi zapisi.
+    - Če zapis s tem ključem že obstaja, ga nadomesti novejši.
+    - Particije, katerih vsebina se ne spremeni, ostanejo nedotaknjene (njihov podpis se ne spremeni,
+      zato nadaljnje stopnje ne zaznajo sprememb).
+    Vrne število zapisov z ključi, ki jih v shrambi še ni bilo.
+    """
+    if df_new.empty:
+        return 0
+
+    df_new = apply_schema(ensure_station_column(df_new))
+    labels = partition_labels(df_new["date"], granularity)
+
+    added = 0
+    for label, df_part in df_new.groupby(labels, sort=True):
+        path = os.path.join(store_path, label, PART_FILE)
+        existing_df = None
+        if os.path.exists(path):
+            existing_df = _read_partition(path)
+            existing_keys = pd.MultiIndex.from_frame(existing_df[KEY_COLUMNS])
+            added += int((~pd.MultiIndex.from_frame(df_part[KEY_COLUMNS]).isin(existing_keys)).sum())
+            df_part = pd.concat([existing_df, df_part], ignore_index=True)
+        else:
+            added += len(df_part.drop_duplicates(subset=KEY_COLUMNS))
+
+        df_part = df_part.drop_duplicates(subset=KEY_COLUMNS, keep="last").sort_values(["date", "station"])
+        df_part = apply_schema(df_part).reset_index(drop=True)
+        if existing_df is not None and df_part.equals(existing_df):
+            continue
+        _write_atomic(df_part, path)
+
+    return added
+
+def _pruned_partitions(store_path, start, end):
+    """Particije, ki se prekrivajo z intervalom [start, end)."""
+    for label, path in list_partitions(store_path):
+        part_start, part_end = partition_bounds(label)
+        if (start is not None and part_end <= start) or (end is not None and part_start >= end):
+            continue
+        yield label, path
+
+def _filter_rows(df, start, end, stations):
+    if start is None and end is None and stations is None:
+        return df
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df["date"] >= start
+    if end is not None:
+        mask &= df["date"] < end
+    if stations is not None:
+        mask &= df["station"].isin(stations)
+    return df if mask.all() else df[mask].reset_index(drop=True)
+
+def _with_keys(columns):
+    return None if columns is None else list(dict.fromkeys(KEY_COLUMNS + list(columns)))
+
+def read(store_path, start=None, end=None, columns=None, stations=None):
+    """
+    Prebere zapise iz shrambe.
+    - Particije izven intervala [start, end) preskoči, ne da bi jih odprla.
+    - `columns` in `stations` dodatno omejita prebrane stolpce in postaje.
+    Vrne prazen DataFrame, če shramba (še) nima particij.
+    """
+    start, end = to_utc(start), to_utc(end)
+    columns = _with_keys(columns)
+
+    tables = []
+    for _, path in _pruned_partitions(store_path, start, end):
+        cached = _cache_get(path)
+        if cached is None:
+            tables.append(pq.read_table(path, columns=columns, partitioning=None))
+        else:
+            tables.append(cached if columns is None else cached[[col for col in columns if col in cached.columns]])
+    if not tables:
+        return empty_frame(columns)
+
+    if all(isinstance(table, pa.Table) for table in tables):
+        # Particije združimo v Arrow in v pandas pretvorimo le enkrat (starejše particije imajo lahko širše tipe)
+        df = pa.concat_tables(tables, promote_options="permissive").to_pandas()
+    else:
+        frames = [table.to_pandas() if isinstance(table, pa.Table) else table for table in tables]
+        # Particije v pomnilniku so le za branje: klicatelj dobi lastno kopijo (pd.concat jo naredi sam)
+        df = frames[0].copy() if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    return apply_schema(_filter_rows(df, start, end, stations))
+
+def read_rows(store_path, row_start, row_end, columns=None):
+    """
+    Prebere vrstice z globalnimi indeksi [row_start, row_end) v časovnem zaporedju shrambe.
+    Particije izven obsega se ne odprejo; iz ostalih se vzame le rezina (Arrow rezina oz. kopija rezine
+    particije v pomnilniku), Parquet datoteke se berejo prek pomnilniške preslikave.
+    """
+    columns = _with_keys(columns)
+    tables, offset = [], 0
+    for _, path, n in partition_row_counts(store_path):
+        lo, hi = max(row_start, offset), min(row_end, offset + n)
+        offset += n
+        if lo >= hi:
+            continue
+        cached = _cache_get(path)
+        if cached is None:
+            table = pq.read_table(path, columns=columns, partitioning=None, memory_map=True)
+            tables.append(table.slice(lo - (offset - n), hi - lo))
+        else:
+            part = cached if columns is None else cached[[col for col in columns if col in cached.columns]]
+            tables.append(part.iloc[lo - (offset - n):hi - (offset - n)])
+    if not tables:
+        return empty_frame(columns)
+
+    if all(isinstance(table, pa.Table) for table in tables):
+        df = pa.concat_tables(tables, promote_options="permissive").to_pandas()
+    else:
+        frames = [table.to_pandas() if isinstance(table, pa.Table) else table for table in tables]
+        if len(frames) == 1:
+            # Rezina particije v pomnilniku bi si delila podatke s cache-om, zato jo kopiramo
+            df = frames[0].copy()
+            df.index = pd.RangeIndex(len(df))
+        else:
+            df = pd.concat(frames, ignore_index=True)
+    return apply_schema(df)
+
+def store_columns(store_path):
+    """Imena stolpcev shrambe (iz sheme zadnje particije)."""
+    partitions = list_partitions(store_path)
+    return pq.read_schema(partitions[-1][1]).names if partitions else list(KEY_COLUMNS)
+
+def chunk_rows_for_budget(store_path, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """Število vrstic v enem kosu, da kos z vmesnimi kopijami ostane znotraj pomnilniškega proračuna."""
+    n_columns = len(store_columns(store_path))
+    return max(1_000, int(memory_budget_mb * 1024 ** 2 / (n_columns * BYTES_PER_CELL)))
+
+def iter_chunks(store_path, chunk_rows, start=None, end=None, columns=None, stations=None):
+    """
+    Bere shrambo po kosih z največ `chunk_rows` vrsticami, v časovnem zaporedju (datum, postaja).
+    V pomnilniku je naenkrat le en kos, ne glede na velikost zgodovine.
+    """
+    start, end = to_utc(start), to_utc(end)
+    columns = _with_keys(columns)
+
+    for _, path in _pruned_partitions(store_path, start, end):
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            df = apply_schema(_filter_rows(batch.to_pandas(), start, end, stations))
+            if not df.empty:
+                yield df
+
+def import_csv(csv_path, store_path, granularity="month"):
+    """
+    Enkratni prenos obstoječe CSV zgodovine v shrambo (če shramba še nima particij).
+    """
+    if list_partitions(store_path) or not os.path.exists(csv_path):
+        return 0
+    df = read_csv(csv_path)
+    added = append(store_path, df, granularity)
+    print(f"📦 Preneseno {added} zapisov iz {csv_path} v shrambo {store_path}")
+    return added
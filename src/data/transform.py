@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+# Skupna tabela mej EU AQI kategorij (zgornje meje so vključene: aqi <= 20 → "good")
+AQI_CATEGORY_BINS = np.array([20, 40, 60, 80, 100], dtype=float)
+AQI_CATEGORIES = ["good", "fair", "moderate", "poor", "very poor", "extremely poor"]
+AQI_CATEGORY_DTYPE = pd.CategoricalDtype(AQI_CATEGORIES, ordered=True)
+
+def categorize_aqi(eu_aqi):
+    """
+    Vektorsko razvrsti vrednosti 'eu_aqi' v urejene kategorije (pd.Categorical).
+    Manjkajoče vrednosti ostanejo brez kategorije.
+    """
+    values = np.asarray(eu_aqi, dtype=float)
+    codes = np.searchsorted(AQI_CATEGORY_BINS, values, side="left")
+    codes[np.isnan(values)] = -1
+    return pd.Categorical.from_codes(codes, dtype=AQI_CATEGORY_DTYPE)
+
+def fill_missing(df, fill_values):
+    """
+    Zapolni manjkajoče vrednosti v vseh podanih numeričnih stolpcih.
+    `fill_values` je slovar {stolpec: vrednost}; tipi stolpcev (npr. float32) se ohranijo.
+    """
+    if not fill_values:
+        return df
+
+    # Ena kopija (združeni bloki po tipih), nato zapolnjevanje na mestu; stolpci so pogledi na bloke kopije.
+    # Celoštevilski stolpci (npr. 'is_day' brez manjkajočih vrednosti) ne morejo vsebovati NaN.
+    filled = df.copy()
+    for col, value in fill_values.items():
+        values = filled[col].to_numpy()
+        if values.dtype.kind != "f":
+            continue
+        np.copyto(values, value, where=np.isnan(values))
+    return filled
@@ -1,102 +1,278 @@
 import os
-import shutil
-import pandas as pd
+import json
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from scipy.stats import ks_2samp
-from great_expectations.data_context import DataContext
-from great_expectations.core import ExpectationSuite, ExpectationConfiguration
-from great_expectations.dataset import PandasDataset
-from evidently.report import Report
-from evidently.metric_preset import DataDriftPreset
-
-# Fiksne poti do podatkov
-REFERENCE_DATA_PATH = "data/processed/train/train_data.csv"
-CURRENT_DATA_PATH = "data/processed/test/test_data.csv"
-
-def load_data(file_path):
-    """Naloži CSV podatke v pandas DataFrame."""
-    if os.path.exists(file_path):
-        return pd.read_csv(file_path, parse_dates=["date"])
-    else:
-        print(f"⚠️ Datoteka ne obstaja: {file_path}")
-        return None
 
-def validate_data(data, suite_name):
-    """Validacija podatkov s Great Expectations."""
-    print(f"🔹 Začenjam validacijo podatkov...")
+from src.data.drift import load_edges, profile_frame, reference_profile, detect_drift
+from src.data.expectations import AQI_EXPECTATIONS, validate
+from src.data.sampling import SAMPLING_METHODS, reservoir_sample, time_stratified_sample, sample_store
+from src.data.splits import load_split
+from src.data.store import PROCESSED_STORE, list_partitions, read
+from src.data.watermark import load_watermark, save_watermark, read_since, advance_marks
+
+STAGE = "validate"
+
+# Fiksne poti do poročil
+VALIDATION_SUMMARY_PATH = "reports/validation/summary.json"
+DRIFT_SUMMARY_PATH = "reports/drift/summary.json"
+EVIDENTLY_REPORT_PATH = "reports/drift/evidently_report"
+EVIDENTLY_METRICS_PATH = "reports/drift/evidently_metrics.jsonl"
+
+def load_data(split):
+    """Naloži del delitve ('train' ali 'test') iz obdelane shrambe (prek manifesta delitve)."""
+    df = load_split(split)
+    if df is None:
+        print(f"⚠️ Podatki '{split}' niso na voljo.")
+    return df
+
+def validate_new_rows():
+    """
+    Vrne zapise iz obdelane shrambe, ki so prispeli od zadnje uspešne validacije, in nove vodne oznake.
+    Obseg validacije je tako odvisen le od nove particije, ne od dolžine zgodovine.
+    """
+    station_marks = load_watermark(STAGE).get("stations", {})
+    df_new = read_since(PROCESSED_STORE, station_marks)
+    return df_new, advance_marks(station_marks, df_new)
+
+def save_summary(summary):
+    """Shrani povzetek validacije (GE oblika) v mapo s poročili."""
+    os.makedirs(os.path.dirname(VALIDATION_SUMMARY_PATH), exist_ok=True)
+    with open(VALIDATION_SUMMARY_PATH, "w") as f:
+        json.dump(summary, f, indent=2, default=str)
+
+def deep_audit(data, suite_name):
+    """Celotna validacija s Great Expectations (izbirni način za poglobljen pregled)."""
+    # Great Expectations je velik paket, zato ga uvozimo šele ob validaciji
+    from great_expectations.data_context import DataContext
+    from great_expectations.core import ExpectationSuite, ExpectationConfiguration
+    from great_expectations.dataset import PandasDataset
 
     context = DataContext()
-    
-    try:
-        suite = context.get_expectation_suite(suite_name)
-    except:
-        suite = ExpectationSuite(suite_name)
-        context.add_expectation_suite(expectation_suite=suite)
-
-    # Dodamo pravila validacije
-    suite.add_expectation(ExpectationConfiguration(expectation_type="expect_column_to_exist", kwargs={"column": "date"}))
-    suite.add_expectation(ExpectationConfiguration(expectation_type="expect_column_values_to_not_be_null", kwargs={"column": "pm10"}))
-    suite.add_expectation(ExpectationConfiguration(expectation_type="expect_column_values_to_be_between", kwargs={"column": "pm10", "min_value": 0, "max_value": 500}))
-    suite.add_expectation(ExpectationConfiguration(expectation_type="expect_column_values_to_not_be_null", kwargs={"column": "category"}))
+
+    # Zbirko pravil vsakič zgradimo na novo in jo prepišemo, da ne raste z vsakim zagonom
+    suite = ExpectationSuite(suite_name)
+    for config in AQI_EXPECTATIONS:
+        suite.add_expectation(ExpectationConfiguration(**config))
+    context.save_expectation_suite(suite)
 
     dataset = PandasDataset(data)
-    results = dataset.validate(expectation_suite=suite, only_return_failures=False)
+    return dataset.validate(expectation_suite=suite, only_return_failures=False).to_json_dict()
+
+def validate_data(data, suite_name, deep=False):
+    """
+    Validacija podatkov z lastnim vektoriziranim pogonom (src.data.expectations),
+    ali s Great Expectations, če je izbran poglobljen pregled (`deep`).
+    """
+    print(f"🔹 Začenjam validacijo podatkov ({'Great Expectations' if deep else f'{len(data)} novih zapisov'})...")
 
-    if not results.success:
-        print(f"❌ Validacija ni uspela! Napake: {results}")
+    summary = deep_audit(data, suite_name) if deep else validate(data, AQI_EXPECTATIONS, suite_name)
+    save_summary(summary)
+    statistics = summary["statistics"]
+
+    if not summary["success"]:
+        failed = [result["expectation_config"] for result in summary["results"] if not result["success"]]
+        print(f"❌ Validacija ni uspela! Napake: {failed}")
         exit(1)
     else:
-        print(f"✅ Validacija uspešna!")
+        print(f"✅ Validacija uspešna! ({statistics['successful_expectations']}/{statistics['evaluated_expectations']} pričakovanj)")
 
-def test_data_drift(reference_data, current_data):
-    """Izvede Evidently test za odkrivanje data drift-a."""
-    print(f"🔹 Testiranje data drift-a...")
+def run_evidently(reference_data, current_data):
+    """Izvede evidently DataDriftPreset; vrne poročilo in povzetek DatasetDriftMetric."""
+    from evidently.report import Report
+    from evidently.metric_preset import DataDriftPreset
 
     report = Report(metrics=[DataDriftPreset()])
     report.run(reference_data=reference_data, current_data=current_data)
+    return report, report.as_dict()["metrics"][0]["result"]
+
+def _evidently_columns(args):
+    reference_data, current_data, columns = args
+    return run_evidently(reference_data[columns], current_data[columns])[1]
+
+def parallel_dataset_drift(reference_data, current_data, jobs):
+    """
+    Odločitev o premiku nabora z evidently, razdeljena po skupinah stolpcev med `jobs` procesov.
+    Delež premaknjenih stolpcev se sešteje čez skupine (enako pravilo kot v DatasetDriftMetric).
+    """
+    columns = [col for col in reference_data.columns if col in current_data.columns]
+    groups = [list(group) for group in np.array_split(columns, min(jobs, len(columns))) if len(group)]
+    with ProcessPoolExecutor(max_workers=len(groups)) as executor:
+        results = list(executor.map(_evidently_columns, [(reference_data, current_data, group) for group in groups]))
+
+    n_columns = sum(result["number_of_columns"] for result in results)
+    n_drifted = sum(result["number_of_drifted_columns"] for result in results)
+    share = n_drifted / max(n_columns, 1)
+    return {"number_of_columns": n_columns, "number_of_drifted_columns": n_drifted,
+            "share_of_drifted_columns": share, "dataset_drift": share >= results[0]["drift_share"]}
+
+def render_full_report(sampled=None):
+    """
+    Celotno evidently poročilo (HTML in JSON) nad celotnima naboroma; teče v ozadju.
+    Če je podan rezultat vzorčenega zagona (`sampled`), zapiše primerjavo časov in odločitev.
+    """
+    reference_data, current_data = load_split("train"), load_split("test")
+    start = time.perf_counter()
+    report, result = run_evidently(reference_data, current_data)
+    full_seconds = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(EVIDENTLY_REPORT_PATH), exist_ok=True)
+    report.save_html(f"{EVIDENTLY_REPORT_PATH}.html")
+    report.save_json(f"{EVIDENTLY_REPORT_PATH}.json")
+
+    record = {"timestamp": datetime.utcnow().isoformat(), "full_seconds": full_seconds, "full_drift": bool(result["dataset_drift"])}
+    if sampled is not None:
+        record.update(sampled, agree=sampled["sampled_drift"] == bool(result["dataset_drift"]))
+        with open(EVIDENTLY_METRICS_PATH, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    return record
 
-    drift_results = report.as_dict()
-    if drift_results["metrics"][0]["result"]["dataset_drift"]:
+def agreement_summary():
+    """Delež zagonov, v katerih se vzorčena odločitev ujema s celotnim poročilom, in povprečna pohitritev."""
+    with open(EVIDENTLY_METRICS_PATH) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    agree = np.mean([record["agree"] for record in records])
+    speedup = np.mean([record["full_seconds"] / max(record["sampled_seconds"], 1e-9) for record in records])
+    return len(records), agree, speedup
+
+def sample_frames(reference_data, current_data, sample_size, sampling, seed=0):
+    """Vzorca reference in trenutnih podatkov: iz shrambe (po kosih) ali iz naloženih DataFrame-ov."""
+    boundary = load_watermark("split").get("train_end")
+    if reference_data is None and boundary is None:
+        reference_data, current_data = load_data("train"), load_data("test")
+    if reference_data is None:
+        return (sample_store(PROCESSED_STORE, sample_size, end=boundary, method=sampling, seed=seed),
+                sample_store(PROCESSED_STORE, sample_size, start=boundary, method=sampling, seed=seed))
+
+    def sample(df):
+        if sampling == "time":
+            return time_stratified_sample(df, sample_size, seed=seed)
+        return reservoir_sample([df], sample_size, seed=seed)
+    return sample(reference_data), sample(current_data)
+
+def test_data_drift(reference_data, current_data, sample_size=None, sampling="reservoir", jobs=1, executor=None):
+    """
+    Izvede Evidently test za odkrivanje data drift-a.
+    - Brez `sample_size`: celotno poročilo nad celotnima naboroma (kot doslej).
+    - Z `sample_size`: odločitev (`dataset_drift`) na vzorcu (rezervoar ali časovno stratificiran),
+      po potrebi razdeljeno po stolpcih med `jobs` procesov; celotno poročilo (HTML/JSON) in primerjava
+      s vzorčeno odločitvijo se izvedeta v ozadju (`executor`). Vrne odločitev in Future poročila.
+    """
+    print(f"🔹 Testiranje data drift-a...")
+
+    start = time.perf_counter()
+    if sample_size is None:
+        _, result = run_evidently(reference_data, current_data)
+        future = None
+    else:
+        reference_sample, current_sample = sample_frames(reference_data, current_data, sample_size, sampling)
+        if jobs > 1:
+            result = parallel_dataset_drift(reference_sample, current_sample, jobs)
+        else:
+            result = run_evidently(reference_sample, current_sample)[1]
+        sampled = {"sampled_seconds": time.perf_counter() - start, "sampled_drift": bool(result["dataset_drift"]),
+                   "sample_size": sample_size, "sampling": sampling}
+        future = executor.submit(render_full_report, sampled) if executor else None
+    print(f"⏱️ Odločitev o data drift-u v {time.perf_counter() - start:.2f}s"
+          + (f" (vzorec {sample_size}, {sampling})" if sample_size else ""))
+
+    if result["dataset_drift"]:
         print(f"❌ Opozorilo: Zaznan data drift!")
     else:
         print(f"✅ Ni zaznanega data drift-a.")
+    return result["dataset_drift"], future
 
-def kolmogorov_smirnov_test(reference_data, current_data):
-    """Kolmogorov-Smirnov test za preverjanje sprememb v distribuciji podatkov."""
-    print(f"🔹 Izvajanje Kolmogorov-Smirnov testa...")
+def profile_drift_test(reference_data=None, current_data=None, window_months=None):
+    """
+    Zaznavanje premika porazdelitev iz shranjenih profilov (histogrami s fiksnimi mejami).
+    - Referenca: profili particij obdelane shrambe pred mejo train/test (drseče okno z `window_months`).
+    - Trenutno okno: zapisi od meje naprej.
+    Po stolpcih (vzporedno) izračuna KS, PSI in Wassersteinovo razdaljo; celotne učne množice ne naloži.
+    Brez shrambe uporabi podana DataFrame-a.
+    """
+    print(f"🔹 Testiranje data drift-a (profili)...")
 
-    numeric_columns = reference_data.select_dtypes(include=[np.number]).columns
-    for col in numeric_columns:
-        ks_stat, ks_p_value = ks_2samp(reference_data[col].dropna(), current_data[col].dropna())
+    boundary = load_watermark("split").get("train_end")
+    if boundary is not None and list_partitions(PROCESSED_STORE):
+        edges = load_edges(store_path=PROCESSED_STORE)
+        reference = reference_profile(PROCESSED_STORE, boundary, edges, window_months)
+        current = profile_frame(read(PROCESSED_STORE, start=boundary, columns=list(edges)), edges)
+    else:
+        edges = load_edges(reference_data)
+        reference, current = profile_frame(reference_data, edges), profile_frame(current_data, edges)
 
-        if ks_p_value < 0.05:
-            print(f"❌ KS test ni uspešen za stolpec: {col} (p-value={ks_p_value:.5f})")
-        else:
-            print(f"✅ KS test uspešen za stolpec: {col} (p-value={ks_p_value:.5f})")
+    summary = detect_drift(reference, current)
+    os.makedirs(os.path.dirname(DRIFT_SUMMARY_PATH), exist_ok=True)
+    with open(DRIFT_SUMMARY_PATH, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    for col, stats in summary["columns"].items():
+        if stats["ks_stat"] is None:
+            continue
+        status = "❌" if stats["drift"] else "✅"
+        print(f"{status} {col}: KS={stats['ks_stat']:.3f} (p-value={stats['ks_p_value']:.5f}), "
+              f"PSI={stats['psi']:.3f}, Wasserstein={stats['wasserstein']:.3f}")
+
+    if summary["dataset_drift"]:
+        print(f"❌ Opozorilo: Zaznan data drift! ({', '.join(summary['drifted_columns'])})")
+    else:
+        print(f"✅ Ni zaznanega data drift-a.")
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validacija in testiranje podatkov.")
+    parser.add_argument("--deep-audit", action="store_true", help="Validacija testnih podatkov s Great Expectations.")
+    parser.add_argument("--evidently-report", action="store_true", help="Dodatno izvedi celotno evidently poročilo.")
+    parser.add_argument("--sample-size", type=int, default=None,
+                        help="Evidently odločitev na vzorcu te velikosti; celotno poročilo se izdela v ozadju.")
+    parser.add_argument("--sampling", choices=SAMPLING_METHODS, default="reservoir", help="Način vzorčenja.")
+    parser.add_argument("--evidently-jobs", type=int, default=1, help="Število procesov za vzorčeno odločitev (po stolpcih).")
+    parser.add_argument("--drift-window-months", type=int, default=None,
+                        help="Drseče referenčno okno (število mesecev pred mejo train/test); privzeto vsa zgodovina.")
+    args = parser.parse_args(argv)
 
-def main():
-    print("📡 Nalagam referenčne in trenutne podatke...")
-    
-    reference_data = load_data(REFERENCE_DATA_PATH)
-    current_data = load_data(CURRENT_DATA_PATH)
+    has_store = bool(list_partitions(PROCESSED_STORE))
 
-    if reference_data is None or current_data is None:
-        print("❌ Manjkajo podatki! Prekinjam validacijo.")
+    # Celotna train/test nabora potrebujemo le za GE, celotno evidently poročilo ali kadar shramba še ne obstaja
+    reference_data = current_data = None
+    if args.deep_audit or (args.evidently_report and args.sample_size is None) or not has_store:
+        print("📡 Nalagam referenčne in trenutne podatke...")
+        reference_data = load_data("train")
+        current_data = load_data("test")
 
-    # Validacija podatkov
-    validate_data(current_data, "aqi_validation")
+        if reference_data is None or current_data is None:
+            print("❌ Manjkajo podatki! Prekinjam validacijo.")
+            return
 
-    # Test data drift
-    test_data_drift(reference_data, current_data)
+    # Validacija podatkov: privzeto le novi zapisi iz shrambe, sicer (ali brez shrambe) celotni testni podatki
+    if args.deep_audit or not has_store:
+        validate_data(current_data, "aqi_validation", deep=args.deep_audit)
+    else:
+        df_new, marks = validate_new_rows()
+        if df_new.empty:
+            print("📢 Ni novih zapisov za validacijo.")
+        else:
+            validate_data(df_new, "aqi_validation")
+            save_watermark(STAGE, {"stations": marks})
 
-    # Kolmogorov-Smirnov test
-    kolmogorov_smirnov_test(reference_data, current_data)
+    # Test data drift iz profilov (KS, PSI, Wasserstein)
+    profile_drift_test(reference_data, current_data, args.drift_window_months)
 
-    # Posodobitev referenčnih podatkov
-    print(f"📌 Posodabljam referenčne podatke...")
-    shutil.copy(CURRENT_DATA_PATH, REFERENCE_DATA_PATH)
+    # Evidently poročilo (izbirno); pri vzorčenju se celotno poročilo izdela v ozadju
+    if args.evidently_report:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            _, future = test_data_drift(reference_data, current_data, args.sample_size, args.sampling,
+                                        args.evidently_jobs, executor)
+            if future is not None:
+                print("⏳ Čakam na celotno evidently poročilo v ozadju...")
+                record = future.result()
+                runs, agree, speedup = agreement_summary()
+                print(f"📊 Celotno poročilo: {record['full_seconds']:.2f}s (vzorec {record['sampled_seconds']:.2f}s); "
+                      f"ujemanje odločitev v {runs} zagonih: {agree:.0%}, povprečna pohitritev {speedup:.1f}x")
 
     print("🚀 Validacija in testiranje uspešno zaključeno!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,158 @@
+import os
+import json
+import hashlib
+from datetime import datetime
+import pandas as pd
+
+from src.data.store import list_partitions, read, iter_chunks, to_utc
+from src.data.stations import STATIONS
+
+# Vodne oznake so shranjene ob podatkih, da jih DVC verzionira skupaj z izhodi stopenj
+WATERMARK_DIR = os.path.join("data", "watermarks")
+
+# Koliko ur pred vodno oznako se ob vsakem zagonu prebere znova: vir te ure naknadno dopolni
+# (napovedi AQI in vremena), ponovni zapis v shrambo pa je idempotenten (ključ postaja + ura)
+REVISION_HOURS = int(os.getenv("WATERMARK_REVISION_HOURS", "48"))
+
+def watermark_path(stage):
+    return os.path.join(WATERMARK_DIR, f"{stage}.json")
+
+def load_watermark(stage):
+    """
+    Naloži vodno oznako stopnje. Vsebuje vsaj:
+      - stations: zadnja obdelana ura za vsako postajo (ISO niz)
+      - fingerprint: prstni odtis vhodov ob zadnji obdelavi
+    Če stopnja še ni bila izvedena, vrne prazen slovar.
+    """
+    path = watermark_path(stage)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_watermark(stage, watermark):
+    """
+    Atomarno shrani vodno oznako (začasna datoteka + preimenovanje).
+    Stopnje jo shranijo šele po zapisu izhoda; ker so zapisi v shrambo idempotentni
+    (ključ postaja + ura), prekinjen zagon le ponovi isto delto.
+    """
+    os.makedirs(WATERMARK_DIR, exist_ok=True)
+    path = watermark_path(stage)
+    tmp_path = f"{path}.tmp"
+    watermark = dict(watermark, updated_at=datetime.utcnow().isoformat())
+    with open(tmp_path, "w") as f:
+        json.dump(watermark, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+# Vsebinski podpisi, izračunani v tem procesu: (pot, velikost, čas spremembe) → podpis
+_signature_memo = {}
+
+def file_signature(path):
+    """
+    Vsebinski podpis datoteke (BLAKE2 zgoščena vrednost) ali None, če ne obstaja.
+    Ne spremeni se ob ponovni obnovitvi istih podatkov (npr. `dvc pull`), ki spremeni le čas spremembe;
+    dokler se velikost in čas spremembe ne spremenita, se podpis ne računa znova.
+    """
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    memo_key = (path, stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _signature_memo:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _signature_memo[memo_key] = digest.hexdigest()
+    return _signature_memo[memo_key]
+
+def partition_signatures(store_path):
+    """Vrne podpis vsake particije v shrambi."""
+    return {label: file_signature(path) for label, path in list_partitions(store_path)}
+
+def inputs_fingerprint(store_paths):
+    """Prstni odtis vhodnih shramb; spremeni se ob vsakem zapisu v katerokoli particijo."""
+    digest = hashlib.sha1()
+    for store_path in store_paths:
+        digest.update(store_path.encode())
+        digest.update(json.dumps(partition_signatures(store_path), sort_keys=True).encode())
+    return digest.hexdigest()
+
+def _filter_since(df, marks):
+    return df[fresh_rows(df, marks)].reset_index(drop=True)
+
+def fresh_rows(df, marks):
+    """Maska zapisov, novejših od vodne oznake svoje postaje (postaje brez oznake so vedno nove)."""
+    station_marks = pd.to_datetime(df["station"].map({station: to_utc(ts) for station, ts in (marks or {}).items()}), utc=True)
+    return (station_marks.isna() | (df["date"] > station_marks)).to_numpy()
+
+def _marks_start(station_marks, stations):
+    """
+    Vodne oznake, premaknjene za okno popravkov, začetek branja za postaje z oznako
+    in postaje brez oznake (te se berejo od začetka shrambe).
+    """
+    window = pd.Timedelta(hours=REVISION_HOURS)
+    marks = {station: to_utc(ts) - window for station, ts in (station_marks or {}).items()}
+    start = min(marks.values()) + pd.Timedelta(hours=1) if marks else None
+    if stations is None:
+        stations = [station.name for station in STATIONS]
+    unmarked = [station for station in stations if station not in marks]
+    return marks, start, unmarked
+
+def read_since(store_path, station_marks, columns=None, stations=None):
+    """
+    Prebere samo zapise, novejše od vodne oznake posamezne postaje, skupaj z zadnjimi REVISION_HOURS urami
+    pred oznako (vir te ure naknadno popravi, npr. napoved, ki je bila ob prvem prenosu še prazna).
+    Particije pred najstarejšo oznako se preskočijo; postaje brez oznake (iz `stations`, privzeto
+    register postaj) se iz njih preberejo ločeno, od začetka shrambe.
+    """
+    marks, start, unmarked = _marks_start(station_marks, stations)
+    df = read(store_path, start=start, columns=columns)
+    if not marks:
+        return df
+    df = _filter_since(df, marks) if not df.empty else df
+    if start is not None and unmarked:
+        earlier = read(store_path, end=start, columns=columns, stations=unmarked)
+        if not earlier.empty:
+            df = pd.concat([earlier, df], ignore_index=True)
+    return df
+
+def iter_since(store_path, station_marks, chunk_rows, columns=None, stations=None):
+    """Kot read_since, le da zapise vrača po kosih v časovnem zaporedju."""
+    marks, start, unmarked = _marks_start(station_marks, stations)
+    if start is not None and unmarked:
+        yield from iter_chunks(store_path, chunk_rows, end=start, columns=columns, stations=unmarked)
+    for df in iter_chunks(store_path, chunk_rows, start=start, columns=columns):
+        df = _filter_since(df, marks) if marks else df
+        if not df.empty:
+            yield df
+
+def advance_marks(station_marks, df):
+    """Premakne vodne oznake postaj na zadnjo obdelano uro v `df`."""
+    marks = dict(station_marks or {})
+    if df.empty:
+        return marks
+    for station, last in df.groupby("station")["date"].max().items():
+        current = marks.get(station)
+        if current is None or to_utc(current) < last:
+            marks[station] = last.isoformat()
+    return marks
+
+def rewind_watermark(stage, timestamp):
+    """
+    Premakne vodne oznake stopnje nazaj pred `timestamp`, da se starejši (npr. naknadno
+    pridobljeni) podatki ob naslednjem zagonu ponovno obdelajo.
+    """
+    watermark = load_watermark(stage)
+    if not watermark:
+        return
+    limit = to_utc(timestamp) - pd.Timedelta(hours=1)
+    watermark["stations"] = {
+        station: min(to_utc(ts), limit).isoformat() for station, ts in watermark.get("stations", {}).items()
+    }
+    # Stopnje z eno samo globalno mejo (npr. split) se naslednjič izvedejo v celoti
+    watermark.pop("train_end", None)
+    # Kvantilne skice (process) že vsebujejo ponovno obdelane ure; stopnja jih ob naslednjem zagonu
+    # zgradi znova iz zapisov do novih oznak, sicer bi se te ure štele dvakrat
+    watermark.pop("sketches", None)
+    watermark["fingerprint"] = None
+    save_watermark(stage, watermark)
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.data.fetch_data import DEFAULT_MAX_WORKERS, DEFAULT_BATCH_SIZE, fetch_aqi_data, fetch_weather_data, get_cache
+from src.data.merge_data import merge_data
+from src.data.process_data import process_data
+from src.data.split_data import split_data
+from src.data.splits import SPLIT_MANIFEST_PATH
+from src.data.stations import get_stations
+from src.data.store import (AQI_STORE, WEATHER_STORE, MERGED_STORE, PROCESSED_STORE, DEFAULT_MEMORY_BUDGET_MB,
+                            append, import_csv, partition_cache)
+from src.data.watermark import WATERMARK_DIR, inputs_fingerprint, file_signature
+
+# Stanje zaganjalnika: prstni odtis vhodov vsake stopnje ob zadnji izvedbi
+PIPELINE_STATE_PATH = os.path.join(WATERMARK_DIR, "pipeline.json")
+
+def load_state():
+    if not os.path.exists(PIPELINE_STATE_PATH):
+        return {}
+    with open(PIPELINE_STATE_PATH) as f:
+        return json.load(f)
+
+def save_state(state):
+    os.makedirs(WATERMARK_DIR, exist_ok=True)
+    tmp_path = f"{PIPELINE_STATE_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(dict(state, updated_at=datetime.utcnow().isoformat()), f, indent=2, sort_keys=True)
+    os.replace(tmp_path, PIPELINE_STATE_PATH)
+
+def frame_hash(df):
+    """Vsebinski prstni odtis DataFrame-a (neodvisen od indeksa)."""
+    digest = hashlib.sha1(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def files_fingerprint(paths):
+    """Prstni odtis vsebine datotek."""
+    return hashlib.sha1(json.dumps({path: file_signature(path) for path in paths}, sort_keys=True).encode()).hexdigest()
+
+def import_legacy_csv():
+    """Starejšo CSV zgodovino ob prvem zagonu prenesemo v shrambe (enako kot samostojni skripti stopenj)."""
+    import_csv(os.path.join(AQI_STORE, "aqi_data.csv"), AQI_STORE)
+    import_csv(os.path.join(WEATHER_STORE, "weather_data.csv"), WEATHER_STORE)
+    import_csv(os.path.join("data", "raw", "merged_data_raw.csv"), MERGED_STORE)
+    import_csv(os.path.join("data", "processed", "dataset.csv"), PROCESSED_STORE)
+
+def run_fetch(state, stations, max_workers, batch_size):
+    """
+    Hkrati pridobi AQI in vremenske podatke in ju doda v shrambi.
+    Če je vsebina odgovora enaka kot ob prejšnjem zagonu, shrambe ne odpre.
+    """
+    fetchers = {"fetch_aqi": (fetch_aqi_data, AQI_STORE), "fetch_weather": (fetch_weather_data, WEATHER_STORE)}
+    with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+        futures = {name: executor.submit(fetch, stations, max_workers, batch_size) for name, (fetch, _) in fetchers.items()}
+        frames = {name: future.result() for name, future in futures.items()}
+
+    for name, df in frames.items():
+        store_path = fetchers[name][1]
+        content = frame_hash(df)
+        if state.get(name) == content:
+            print(f"⏭️ {name}: odgovor enak kot ob prejšnjem zagonu, preskakujem.")
+            continue
+        added = append(store_path, df)
+        print(f"✅ {name}: dodano {added} novih zapisov v: {store_path}")
+        state[name] = content
+    print(f"📦 Cache odgovorov: {get_cache().stats}")
+
+def run_stage(state, name, fingerprint_inputs, func):
+    """
+    Izvede stopnjo, če se prstni odtis njenih vhodov od zadnje izvedbe spremenil.
+    Shrani se odtis po izvedbi (stopnja lahko spremeni lastne vhode, npr. validacija).
+    """
+    if state.get(name) == fingerprint_inputs():
+        print(f"⏭️ {name}: vhodi nespremenjeni, preskakujem.")
+        return False
+    start = time.perf_counter()
+    func()
+    state[name] = fingerprint_inputs()
+    print(f"⏱️ {name}: {time.perf_counter() - start:.2f}s")
+    return True
+
+def run_validation():
+    # Validacija uvozi težke knjižnice (GE, evidently), zato jo naložimo le, ko je potrebna
+    from src.data.validate_and_test_data import main as validate_main
+    validate_main([])
+
+def run_pipeline(stations=None, chunked=False, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, validate=True,
+                 max_workers=DEFAULT_MAX_WORKERS, batch_size=DEFAULT_BATCH_SIZE, test_size_ratio=0.1):
+    """
+    Izvede celoten podatkovni cevovod v enem procesu:
+    fetch (AQI in vreme hkrati) → merge → process → split → validate.
+    - Particije, ki jih stopnja zapiše, ostanejo v pomnilniku (`partition_cache`), zato jih naslednja
+      stopnja prebere brez ponovnega branja z diska.
+    - Stopnja se preskoči, če se prstni odtis njenih vhodov ni spremenil.
+    """
+    state = load_state()
+    stations = stations or get_stations()
+    import_legacy_csv()
+
+    with partition_cache(memory_budget_mb):
+        try:
+            run_fetch(state, stations, max_workers, batch_size)
+            run_stage(state, "merge", lambda: inputs_fingerprint([AQI_STORE, WEATHER_STORE]),
+                      lambda: merge_data(AQI_STORE, WEATHER_STORE, MERGED_STORE, chunked, memory_budget_mb))
+            run_stage(state, "process", lambda: inputs_fingerprint([MERGED_STORE]),
+                      lambda: process_data(MERGED_STORE, PROCESSED_STORE, chunked, memory_budget_mb))
+            run_stage(state, "split", lambda: inputs_fingerprint([PROCESSED_STORE]) + files_fingerprint([SPLIT_MANIFEST_PATH]),
+                      lambda: split_data(PROCESSED_STORE, test_size_ratio=test_size_ratio, chunked=chunked,
+                                         memory_budget_mb=memory_budget_mb))
+            if validate:
+                run_stage(state, "validate", lambda: files_fingerprint([SPLIT_MANIFEST_PATH]), run_validation)
+        finally:
+            save_state(state)
+
+def main():
+    parser = argparse.ArgumentParser(description="Celoten podatkovni cevovod v enem procesu.")
+    parser.add_argument("--stations", nargs="*", help="Imena postaj iz registra (privzeto vse).")
+    parser.add_argument("--chunked", action="store_true", help="Postopni način za zgodovino, ki ne gre v pomnilnik.")
+    parser.add_argument("--memory-budget-mb", type=float, default=DEFAULT_MEMORY_BUDGET_MB)
+    parser.add_argument("--skip-validation", action="store_true", help="Ne izvedi validacije in testiranja podatkov.")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Največje število hkratnih zahtevkov.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Število koordinat v enem zahtevku.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    run_pipeline(get_stations(args.stations), args.chunked, args.memory_budget_mb, not args.skip_validation,
+                 args.max_workers, args.batch_size)
+    print(f"🚀 Cevovod zaključen v {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import os
+from functools import lru_cache
+
+MONGODB_DATABASE = "aqiPredictions"
+MONGODB_COLLECTION = "predictions"
+
+# Pisanje v MongoDB: velikost paketa enega insert_many, število hkratnih paketov in največ povezav v bazenu klienta
+MONGODB_WRITE_CHUNK_SIZE = int(os.getenv("MONGODB_WRITE_CHUNK_SIZE", "1000"))
+MONGODB_WRITE_WORKERS = int(os.getenv("MONGODB_WRITE_WORKERS", "4"))
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "16"))
+
+# Ključ napovedi (ena napoved na uro, postajo in par verzij modelov) in rok hranjenja napovedi
+PREDICTION_KEY = ["model_regression", "model_classification", "station", "target_time"]
+PREDICTION_TTL_DAYS = float(os.getenv("PREDICTION_TTL_DAYS", "90"))
+
+@lru_cache(maxsize=None)
+def load_env():
+    """Naloži spremenljivke okolja iz .env (le enkrat na proces)."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+@lru_cache(maxsize=None)
+def get_mlflow():
+    """
+    Vrne nastavljen modul mlflow (uvoz in nastavitev ob prvem klicu).
+    Uvoz modula, ki MLflow uporablja, tako ne zahteva dostopa do strežnika.
+    """
+    load_env()
+    import mlflow
+    import mlflow.sklearn
+
+    mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI"))
+    for var in ("MLFLOW_TRACKING_USERNAME", "MLFLOW_TRACKING_PASSWORD"):
+        if os.getenv(var) is not None:
+            os.environ[var] = os.getenv(var)
+    return mlflow
+
+@lru_cache(maxsize=None)
+def get_mlflow_client():
+    """Vrne skupnega MLflow klienta."""
+    mlflow = get_mlflow()
+    return mlflow.tracking.MlflowClient()
+
+@lru_cache(maxsize=None)
+def get_mongo_client():
+    """Vrne skupnega MongoDB klienta z bazenom povezav (povezava se vzpostavi ob prvi operaciji)."""
+    load_env()
+    from pymongo import MongoClient
+    return MongoClient(os.getenv("MONGODB_URI"), maxPoolSize=MONGODB_MAX_POOL_SIZE)
+
+def ensure_prediction_indexes(collection):
+    """
+    Indeksi zbirke napovedi (create_index je idempotenten):
+    - edinstven sestavljen ključ napovedi (verziji modelov, postaja, ura); velja le za dokumente s ključem,
+      zato starejši dokumenti brez postaje in ure ne motijo,
+    - zadnje napovedi postaje (postaja, ura padajoče),
+    - TTL na času zapisa, da zbirka ne raste brez meje.
+    """
+    collection.create_index([(field, 1) for field in PREDICTION_KEY], name="prediction_key", unique=True,
+                            partialFilterExpression={"target_time": {"$exists": True}})
+    collection.create_index([("station", 1), ("target_time", -1)], name="station_target_time")
+    collection.create_index("created_at", name="created_at_ttl", expireAfterSeconds=int(PREDICTION_TTL_DAYS * 86400))
+
+@lru_cache(maxsize=None)
+def get_predictions_collection():
+    """Vrne zbirko z napovedmi (indeksi se zagotovijo ob prvem klicu v procesu)."""
+    collection = get_mongo_client()[MONGODB_DATABASE][MONGODB_COLLECTION]
+    ensure_prediction_indexes(collection)
+    return collection
+
+def insert_documents(collection, documents, chunk_size=MONGODB_WRITE_CHUNK_SIZE, max_workers=MONGODB_WRITE_WORKERS):
+    """
+    Zapiše dokumente v paketih po `chunk_size` z `ordered=False` (strežnik jih vstavi neodvisno drug od drugega).
+    Paketi se pošiljajo hkrati prek bazena povezav klienta; napaka v enem dokumentu ne ustavi ostalih.
+    Vrne (število vstavljenih, število napak).
+    """
+    from pymongo.errors import BulkWriteError
+
+    def write(chunk):
+        try:
+            return len(collection.insert_many(chunk, ordered=False).inserted_ids), 0
+        except BulkWriteError as e:
+            return e.details.get("nInserted", 0), len(e.details.get("writeErrors", []))
+
+    return _write_chunks(write, documents, chunk_size, max_workers)
+
+def upsert_documents(collection, documents, key=PREDICTION_KEY, on_insert=(), chunk_size=MONGODB_WRITE_CHUNK_SIZE,
+                     max_workers=MONGODB_WRITE_WORKERS):
+    """
+    Idempotentno zapiše dokumente kot bulk_write(UpdateOne(..., upsert=True), ordered=False) po ključu `key`.
+    Polja `on_insert` (npr. čas zapisa) se nastavijo le ob prvem vstavljanju, zato ponovni zapis ne spremeni ničesar.
+    Vrne (število vstavljenih, število spremenjenih, število napak).
+    """
+    from pymongo import UpdateOne
+    from pymongo.errors import BulkWriteError
+
+    def write(chunk):
+        operations = []
+        for doc in chunk:
+            update = {"$set": {field: value for field, value in doc.items() if field not in on_insert}}
+            if on_insert:
+                update["$setOnInsert"] = {field: doc[field] for field in on_insert if field in doc}
+            operations.append(UpdateOne({field: doc[field] for field in key}, update, upsert=True))
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            return result.upserted_count, result.modified_count, 0
+        except BulkWriteError as e:
+            return e.details.get("nUpserted", 0), e.details.get("nModified", 0), len(e.details.get("writeErrors", []))
+
+    return _write_chunks(write, documents, chunk_size, max_workers, n_counts=3)
+
+def _write_chunks(write, documents, chunk_size, max_workers, n_counts=2):
+    """Izvede `write` nad paketi dokumentov (hkrati prek bazena povezav) in sešteje vrnjene števce."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    chunks = [documents[i:i + chunk_size] for i in range(0, len(documents), chunk_size)]
+    if len(chunks) <= 1 or max_workers <= 1:
+        results = [write(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            results = list(executor.map(write, chunks))
+    return tuple(sum(result[i] for result in results) for i in range(n_counts))
@@ -0,0 +1,163 @@
+import os
+import argparse
+import numpy as np
+
+from src.models.features import FEATURES, decode_category, split_pipeline
+
+# Izvožena modela za strežbo (ena datoteka .npz s polji float32)
+COMPILED_MODEL_PATH = os.path.join("models", "compiled.npz")
+
+HEADS = {"regression": "regression_model", "classification": "classification_model"}
+
+ACTIVATIONS = {
+    "identity": lambda z: z,
+    "relu": lambda z: np.maximum(z, 0, out=z),
+    "tanh": lambda z: np.tanh(z, out=z),
+    "logistic": lambda z: np.divide(1, 1 + np.exp(-z, out=z), out=z),
+}
+
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    return z / z.sum(axis=1, keepdims=True)
+
+ACTIVATIONS["softmax"] = _softmax
+
+def export_head(model, features=FEATURES):
+    """
+    Naučen Pipeline (ColumnTransformer z SimpleImputer in StandardScaler → MLP) kot polja float32:
+    - `fill`: vrednosti za manjkajoče značilke v izvirni lestvici (imputer),
+    - standardizacija je vgrajena v uteži in pristranskost prve plasti:
+      ((x - mean) / scale) W + b = x (W / scale) + (b - (mean / scale) W).
+    Značilke, ki jih je imputer izpustil (same manjkajoče vrednosti), dobijo ničelne uteži.
+    """
+    preprocessor, estimator = split_pipeline(model)
+    imputer = preprocessor.named_transformers_["num"].named_steps["imputer"]
+    scaler = preprocessor.named_transformers_["num"].named_steps["scaler"]
+    columns = list(preprocessor.transformers_[0][2])
+    if columns != list(features):
+        raise ValueError(f"Predprocesor uporablja drugačne značilke: {columns}")
+
+    statistics = np.asarray(imputer.statistics_, dtype=np.float64)
+    kept = ~np.isnan(statistics)
+    mean = np.zeros(len(features))
+    scale = np.ones(len(features))
+    mean[kept] = scaler.mean_ if scaler.with_mean else 0.0
+    scale[kept] = scaler.scale_ if scaler.with_std else 1.0
+
+    first = np.zeros((len(features), estimator.coefs_[0].shape[1]))
+    first[kept] = estimator.coefs_[0]
+    weights = [first / scale[:, None]] + [np.asarray(w, dtype=np.float64) for w in estimator.coefs_[1:]]
+    biases = [estimator.intercepts_[0] - (mean / scale) @ first] + [np.asarray(b, dtype=np.float64) for b in estimator.intercepts_[1:]]
+    return {
+        "fill": np.where(kept, statistics, 0.0).astype(np.float32),
+        "weights": [w.astype(np.float32) for w in weights],
+        "biases": [b.astype(np.float32) for b in biases],
+        "activation": estimator.activation,
+        "out_activation": estimator.out_activation_,
+    }
+
+def save_compiled(heads, path=COMPILED_MODEL_PATH, versions=None, features=FEATURES):
+    """Zapiše izvožene glave v eno .npz datoteko (atomarno)."""
+    arrays = {"features": np.asarray(features)}
+    for name, head in heads.items():
+        arrays[f"{name}/fill"] = head["fill"]
+        arrays[f"{name}/activation"] = np.asarray([head["activation"], head["out_activation"]])
+        arrays[f"{name}/version"] = np.asarray(str((versions or {}).get(name)))
+        for i, (w, b) in enumerate(zip(head["weights"], head["biases"])):
+            arrays[f"{name}/W{i}"] = w
+            arrays[f"{name}/b{i}"] = b
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+def load_compiled(path=COMPILED_MODEL_PATH):
+    """Prebere izvožene glave iz .npz (brez pickle)."""
+    with np.load(path, allow_pickle=False) as data:
+        names = sorted({key.split("/")[0] for key in data.files if "/" in key})
+        heads, versions = {}, {}
+        for name in names:
+            n_layers = sum(1 for key in data.files if key.startswith(f"{name}/W"))
+            activation, out_activation = data[f"{name}/activation"].tolist()
+            heads[name] = {
+                "fill": data[f"{name}/fill"],
+                "weights": [data[f"{name}/W{i}"] for i in range(n_layers)],
+                "biases": [data[f"{name}/b{i}"] for i in range(n_layers)],
+                "activation": activation,
+                "out_activation": out_activation,
+            }
+            versions[name] = str(data[f"{name}/version"])
+        features = data["features"].tolist()
+    return CompiledModels(heads, features, versions)
+
+def forward(head, X):
+    """Prehod naprej čez plasti MLP nad že dopolnjenimi značilkami (float32)."""
+    activation = ACTIVATIONS[head["activation"]]
+    for i, (w, b) in enumerate(zip(head["weights"], head["biases"])):
+        X = X @ w
+        X += b
+        X = activation(X) if i < len(head["weights"]) - 1 else ACTIVATIONS[head["out_activation"]](X)
+    return X
+
+class CompiledModels:
+    """
+    Regresijska in klasifikacijska glava nad enim skupnim korakom predprocesiranja.
+    Če imata glavi enake vrednosti za dopolnjevanje (isti predprocesor), se manjkajoče vrednosti dopolnijo le enkrat.
+    """
+
+    def __init__(self, heads, features=FEATURES, versions=None):
+        self.heads = heads
+        self.features = list(features)
+        self.versions = versions or {}
+        fills = [head["fill"] for head in heads.values()]
+        self.shared_fill = fills[0] if all(np.array_equal(fill, fills[0]) for fill in fills) else None
+
+    @classmethod
+    def from_pipelines(cls, models, versions=None, features=FEATURES):
+        return cls({name: export_head(model, features) for name, model in models.items()}, features, versions)
+
+    def save(self, path=COMPILED_MODEL_PATH):
+        save_compiled(self.heads, path, self.versions, self.features)
+
+    def _matrix(self, X):
+        if hasattr(X, "columns"):
+            X = X[self.features].to_numpy()
+        return np.array(X, dtype=np.float32, ndmin=2)
+
+    @staticmethod
+    def _fill(X, fill):
+        missing = np.isnan(X)
+        if missing.any():
+            X = np.where(missing, fill, X)
+        return X
+
+    def predict_raw(self, X):
+        """{glava: izhod zadnje plasti} (regresija: vrednosti, klasifikacija: verjetnosti)."""
+        X = self._matrix(X)
+        shared = self._fill(X, self.shared_fill) if self.shared_fill is not None else None
+        return {name: forward(head, shared if shared is not None else self._fill(X, head["fill"]))
+                for name, head in self.heads.items()}
+
+    def predict(self, X):
+        """Napoved PM10 in kategorije za matriko ali DataFrame značilk."""
+        outputs = self.predict_raw(X)
+        return {"pm10": outputs["regression"].ravel(), "category": decode_category(outputs["classification"])}
+
+def main():
+    from src.models.predict_model import load_production_model
+
+    parser = argparse.ArgumentParser(description="Izvoz produkcijskih modelov v obliko za napovedovanje z NumPy.")
+    parser.add_argument("--output", default=COMPILED_MODEL_PATH)
+    args = parser.parse_args()
+
+    loaded = {name: load_production_model(model_name) for name, model_name in HEADS.items()}
+    if any(model is None for model, _ in loaded.values()):
+        return
+    compiled = CompiledModels.from_pipelines({name: model for name, (model, _) in loaded.items()},
+                                             {name: version for name, (_, version) in loaded.items()})
+    compiled.save(args.output)
+    print(f"✅ Modela izvožena v {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+if __name__ == "__main__":
+    main()
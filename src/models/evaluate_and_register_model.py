@@ -1,25 +1,18 @@
 import os
-import mlflow
 import pandas as pd
 import numpy as np
-from mlflow.tracking import MlflowClient
-from sklearn.metrics import mean_absolute_error, mean_squared_error, explained_variance_score, accuracy_score, f1_score
-from dotenv import load_dotenv
 
-# Nastavitev MLflow
-load_dotenv()
-mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI"))
-mlflow_client = MlflowClient()
-
-# Fiksne poti do testnih podatkov
-TEST_DATA_PATH = "data/processed/test/test_data.csv"
+from src.data.splits import load_split, split_fingerprint
+from src.models.clients import get_mlflow_client
+from src.models.features import FEATURES, TARGET_REGRESSION, TARGET_CLASSIFICATION, predict_cached, predict_category
+from src.models.model_cache import get_model_cache
 
 def get_latest_model(model_name):
     """
     Pridobi zadnjo verzijo modela iz MLflow Model Registry, ki je v fazi 'None'.
     """
     try:
-        versions = mlflow_client.get_latest_versions(model_name, stages=["None"])
+        versions = get_mlflow_client().get_latest_versions(model_name, stages=["None"])
         if versions:
             return versions[0].version
     except Exception as e:
@@ -32,7 +25,7 @@ def get_production_model(model_name):
     Pridobi trenutno produkcijsko verzijo modela.
     """
     try:
-        versions = mlflow_client.get_latest_versions(model_name, stages=["Production"])
+        versions = get_mlflow_client().get_latest_versions(model_name, stages=["Production"])
         if versions:
             return versions[0].version
     except Exception as e:
@@ -40,17 +33,19 @@ def get_production_model(model_name):
         return None
     return None
 
-def evaluate_regression_model(model_uri, X_test, y_test):
+def evaluate_regression_model(model_uri, X_test, y_test, data_key=None):
     """
     Izvede evalvacijo regresijskega modela (napoved PM10).
     """
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, explained_variance_score
+
     try:
-        model = mlflow.sklearn.load_model(model_uri)
+        model = get_model_cache().load_uri(model_uri)
     except Exception:
         print("❌ Napaka pri nalaganju regresijskega modela!")
         return None, None, None
 
-    predictions = model.predict(X_test).flatten()
+    predictions = predict_cached(model, X_test, data_key=data_key).flatten()
 
     mae = mean_absolute_error(y_test, predictions)
     mse = mean_squared_error(y_test, predictions)
@@ -58,17 +53,20 @@ def evaluate_regression_model(model_uri, X_test, y_test):
 
     return mae, mse, evs
 
-def evaluate_classification_model(model_uri, X_test, y_test):
+def evaluate_classification_model(model_uri, X_test, y_test, data_key=None):
     """
     Izvede evalvacijo klasifikacijskega modela (napoved kategorije).
     """
+    from sklearn.metrics import accuracy_score, f1_score
+
     try:
-        model = mlflow.sklearn.load_model(model_uri)
+        model = get_model_cache().load_uri(model_uri)
     except Exception:
         print("❌ Napaka pri nalaganju klasifikacijskega modela!")
         return None, None
 
-    predictions = model.predict(X_test)
+    predictions = predict_category(model, X_test, data_key=data_key)
+    y_test = np.asarray(y_test, dtype=object)
 
     accuracy = accuracy_score(y_test, predictions)
     f1 = f1_score(y_test, predictions, average="weighted")
@@ -77,17 +75,23 @@ def evaluate_classification_model(model_uri, X_test, y_test):
 
 def main():
     print("📡 Nalagam testne podatke...")
-    test_data = pd.read_csv(TEST_DATA_PATH, parse_dates=["date"])
+    test_data = load_split("test")
+    if test_data is None:
+        print("❌ Testni podatki niso na voljo.")
+        return
 
-    features = ["pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "temperature_2m",
-                "relative_humidity_2m", "rain", "snowfall", "is_day"]
-    target_regression = "pm10"
-    target_classification = "category"
+    features = FEATURES
+    target_regression = TARGET_REGRESSION
+    target_classification = TARGET_CLASSIFICATION
 
     X_test = test_data[features]
+    # Vse verzije modelov z enakim predprocesorjem si delijo eno transformacijo testnih podatkov
+    data_key = split_fingerprint("test")
     y_test_reg = test_data[target_regression]
     y_test_class = test_data[target_classification]
 
+    mlflow_client = get_mlflow_client()
+
     # Pridobimo zadnjo verzijo modelov
     latest_reg_version = get_latest_model("regression_model")
     latest_class_version = get_latest_model("classification_model")
@@ -100,8 +104,8 @@ def main():
     latest_class_uri = f"models:/classification_model/{latest_class_version}"
 
     # Evaluacija novih modelov
-    latest_mae, latest_mse, latest_evs = evaluate_regression_model(latest_reg_uri, X_test, y_test_reg)
-    latest_acc, latest_f1 = evaluate_classification_model(latest_class_uri, X_test, y_test_class)
+    latest_mae, latest_mse, latest_evs = evaluate_regression_model(latest_reg_uri, X_test, y_test_reg, data_key)
+    latest_acc, latest_f1 = evaluate_classification_model(latest_class_uri, X_test, y_test_class, data_key)
 
     if latest_mae is None or latest_acc is None:
         return
@@ -122,8 +126,8 @@ def main():
     prod_reg_uri = f"models:/regression_model/{prod_reg_version}"
     prod_class_uri = f"models:/classification_model/{prod_class_version}"
 
-    prod_mae, prod_mse, prod_evs = evaluate_regression_model(prod_reg_uri, X_test, y_test_reg)
-    prod_acc, prod_f1 = evaluate_classification_model(prod_class_uri, X_test, y_test_class)
+    prod_mae, prod_mse, prod_evs = evaluate_regression_model(prod_reg_uri, X_test, y_test_reg, data_key)
+    prod_acc, prod_f1 = evaluate_classification_model(prod_class_uri, X_test, y_test_class, data_key)
 
     if prod_mae is None or prod_acc is None:
         return
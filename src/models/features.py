@@ -0,0 +1,145 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+from src.data.transform import AQI_CATEGORIES
+
+# Značilke in ciljne spremenljivke (skupne učenju, evalvaciji in napovedovanju)
+FEATURES = ["pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "temperature_2m",
+            "relative_humidity_2m", "rain", "snowfall", "is_day"]
+TARGET_REGRESSION = "pm10"
+TARGET_CLASSIFICATION = "category"
+
+# Nastavitve predprocesiranja; so del ključa predpomnilnika
+PREPROCESSOR_CONFIG = {"imputer": "mean", "scaler": "standard", "dtype": "float32"}
+
+# Predpomnilnik predprocesiranih matrik značilk (.npy, berljive prek pomnilniške preslikave)
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", os.path.join(".cache", "features"))
+FEATURE_CACHE_MAX_ENTRIES = int(os.getenv("FEATURE_CACHE_MAX_ENTRIES", "16"))
+
+def build_preprocessor(features=FEATURES, config=PREPROCESSOR_CONFIG):
+    """Predprocesiranje značilk: zapolnitev manjkajočih vrednosti in standardizacija."""
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.impute import SimpleImputer
+    from sklearn.compose import ColumnTransformer
+
+    return ColumnTransformer([
+        ("num", Pipeline([
+            ("imputer", SimpleImputer(strategy=config["imputer"])),
+            ("scaler", StandardScaler())
+        ]), list(features))
+    ])
+
+def encode_category(values):
+    """One-hot kodiranje kategorij (vrstni red stolpcev določa skupna tabela kategorij)."""
+    from sklearn.preprocessing import OneHotEncoder
+    encoder = OneHotEncoder(categories=[AQI_CATEGORIES], handle_unknown="ignore", sparse_output=False)
+    return encoder.fit_transform(np.asarray(values, dtype=object).reshape(-1, 1))
+
+def decode_category(encoded):
+    """Obratno od `encode_category`: kategorija z največjo vrednostjo (one-hot ali verjetnosti) v vsaki vrstici."""
+    encoded = np.asarray(encoded)
+    if encoded.ndim == 1:
+        return encoded
+    return np.asarray(AQI_CATEGORIES, dtype=object)[encoded.argmax(axis=1)]
+
+def data_fingerprint(df, features=FEATURES, data_key=None):
+    """
+    Vsebinski prstni odtis stolpcev značilk (neodvisen od indeksa).
+    `data_key`: že znan prstni odtis podatkov (npr. iz manifesta delitve), da se vsebina ne zgošča.
+    """
+    digest = hashlib.sha1(",".join(features).encode())
+    if data_key is not None:
+        digest.update(data_key.encode())
+    else:
+        digest.update(pd.util.hash_pandas_object(df[list(features)], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def preprocessor_fingerprint(preprocessor):
+    """Prstni odtis naučenega predprocesorja (naučeni parametri določajo rezultat transformacije)."""
+    import joblib
+    return joblib.hash(preprocessor)
+
+def _matrix_path(key):
+    return os.path.join(FEATURE_CACHE_DIR, f"{key}.npy")
+
+def _evict():
+    """Ohrani le zadnjih FEATURE_CACHE_MAX_ENTRIES matrik (po času zadnje uporabe)."""
+    entries = sorted((os.path.join(FEATURE_CACHE_DIR, name) for name in os.listdir(FEATURE_CACHE_DIR) if name.endswith(".npy")),
+                     key=os.path.getmtime)
+    for path in entries[:-FEATURE_CACHE_MAX_ENTRIES]:
+        for stale in (path, path[:-len(".npy")] + ".joblib"):
+            if os.path.exists(stale):
+                os.remove(stale)
+
+def _load(key):
+    path = _matrix_path(key)
+    if not os.path.exists(path):
+        return None
+    os.utime(path)
+    return np.load(path, mmap_mode="r")
+
+def _store(key, X, preprocessor=None):
+    """Atomarno zapiše matriko (float32) in po potrebi predprocesor; vrne pomnilniško preslikan pogled."""
+    import joblib
+    os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+    path = _matrix_path(key)
+    if preprocessor is not None:
+        joblib.dump(preprocessor, path[:-len(".npy")] + ".joblib")
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, np.ascontiguousarray(X, dtype=np.float32))
+    os.replace(tmp_path, path)
+    _evict()
+    return np.load(path, mmap_mode="r")
+
+def fit_transform_cached(df, features=FEATURES, config=PREPROCESSOR_CONFIG, data_key=None):
+    """
+    Nauči predprocesor na `df` in vrne (matrika float32, naučen predprocesor).
+    Ključ sta prstni odtis podatkov in nastavitve; ob zadetku se ne uči ničesar, matrika se le preslika v pomnilnik.
+    """
+    import joblib
+    key = hashlib.sha1((data_fingerprint(df, features, data_key) + json.dumps(config, sort_keys=True)).encode()).hexdigest()
+    X = _load(key)
+    if X is not None:
+        return X, joblib.load(_matrix_path(key)[:-len(".npy")] + ".joblib")
+
+    preprocessor = build_preprocessor(features, config)
+    X = preprocessor.fit_transform(df[list(features)])
+    return _store(key, X, preprocessor), preprocessor
+
+def transform_cached(preprocessor, df, features=FEATURES, data_key=None):
+    """
+    Transformira `df` z naučenim predprocesorjem; ključ sta prstni odtis podatkov in predprocesorja,
+    zato modeli z istim predprocesorjem (npr. regresijski in klasifikacijski iz istega učenja) delijo en prehod.
+    """
+    key = hashlib.sha1((data_fingerprint(df, features, data_key) + preprocessor_fingerprint(preprocessor)).encode()).hexdigest()
+    X = _load(key)
+    if X is None:
+        X = _store(key, preprocessor.transform(df[list(features)]))
+    return X
+
+def split_pipeline(model):
+    """Razdeli scikit-learn Pipeline na (predprocesor, končni model); brez predprocesorja vrne (None, model)."""
+    steps = getattr(model, "steps", None)
+    if not steps or len(steps) < 2:
+        return None, model
+    return steps[0][1] if len(steps) == 2 else model[:-1], steps[-1][1]
+
+def predict_cached(model, df, method="predict", features=FEATURES, data_key=None):
+    """Napoved modela (Pipeline) nad `df`, pri čemer se transformirane značilke vzamejo iz predpomnilnika."""
+    preprocessor, estimator = split_pipeline(model)
+    if preprocessor is None:
+        return getattr(estimator, method)(df[list(features)])
+    return getattr(estimator, method)(transform_cached(preprocessor, df, features, data_key))
+
+def predict_category(model, df, features=FEATURES, data_key=None):
+    """
+    Napovedane kategorije klasifikatorja, naučenega na one-hot kategorijah.
+    Kategorijo določijo verjetnosti (če jih model ima), tudi ko predict ne izbere nobene.
+    """
+    estimator = split_pipeline(model)[1]
+    method = "predict_proba" if hasattr(estimator, "predict_proba") else "predict"
+    return decode_category(predict_cached(model, df, method=method, features=features, data_key=data_key))
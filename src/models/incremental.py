@@ -0,0 +1,129 @@
+import copy
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+from src.data.splits import load_split
+from src.data.store import to_utc
+from src.models.clients import get_mlflow, get_mlflow_client
+from src.models.features import FEATURES, TARGET_REGRESSION, TARGET_CLASSIFICATION, encode_category, split_pipeline
+from src.models.model_cache import get_model_cache
+
+# Število prehodov (partial_fit) čez nove vrstice pri eni inkrementalni posodobitvi
+INCREMENTAL_EPOCHS = 5
+
+# Varnostna mreža: celotno učenje po toliko zaporednih inkrementalnih posodobitvah
+# ali ko je zadnje celotno učenje starejše od toliko dni
+FULL_RETRAIN_EVERY = 24
+FULL_RETRAIN_MAX_DAYS = 7
+
+MODEL_NAMES = {"reg": "regression_model", "class": "classification_model"}
+
+def production_lineage(model_name):
+    """
+    Rodovnik trenutnega produkcijskega modela iz parametrov njegovega zagona:
+    verzija, zagon, vodna oznaka učenja, število inkrementalnih posodobitev in izvorno celotno učenje.
+    Vrne None, če produkcijskega modela ni.
+    """
+    versions = get_mlflow_client().get_latest_versions(model_name, stages=["Production"])
+    if not versions:
+        return None
+    version = versions[0]
+    params = get_mlflow_client().get_run(version.run_id).data.params
+    return {
+        "version": version.version,
+        "run_id": version.run_id,
+        "train_watermark": params.get("train_watermark"),
+        "incremental_updates": int(params.get("incremental_updates", 0)),
+        "full_run_id": params.get("full_run_id", version.run_id),
+        "full_trained_at": params.get("full_trained_at"),
+    }
+
+def full_retrain_reason(lineages, now=None, every=FULL_RETRAIN_EVERY, max_days=FULL_RETRAIN_MAX_DAYS):
+    """Razlog za celotno učenje namesto inkrementalne posodobitve ali None, če posodobitev zadošča."""
+    now = now or datetime.utcnow()
+    for name, lineage in lineages.items():
+        if lineage is None:
+            return f"{name}: ni produkcijskega modela"
+        if lineage["train_watermark"] in (None, "None"):
+            return f"{name}: model nima vodne oznake učenja"
+        if lineage["incremental_updates"] >= every:
+            return f"{name}: {lineage['incremental_updates']} zaporednih inkrementalnih posodobitev"
+        if lineage["full_trained_at"] and now - datetime.fromisoformat(lineage["full_trained_at"]) > timedelta(days=max_days):
+            return f"{name}: zadnje celotno učenje je starejše od {max_days} dni"
+    return None
+
+def continue_training(model, X_new, y_new, epochs=INCREMENTAL_EPOCHS, random_state=42):
+    """
+    Nadaljuje učenje kopije modela (Pipeline s predprocesorjem) na novih vrsticah s `partial_fit`.
+    Predprocesor ostane nespremenjen, da se lestvica značilk med posodobitvami ne premika.
+    """
+    model = copy.deepcopy(model)
+    preprocessor, estimator = split_pipeline(model)
+    Xt = preprocessor.transform(X_new) if preprocessor is not None else np.asarray(X_new)
+    Xt = np.ascontiguousarray(Xt, dtype=np.float32)
+    y = np.asarray(y_new)
+    rng = np.random.default_rng(random_state)
+    for _ in range(epochs):
+        order = rng.permutation(len(Xt))
+        estimator.partial_fit(Xt[order], y[order])
+    return model
+
+def train_incremental(epochs=INCREMENTAL_EPOCHS, full_every=FULL_RETRAIN_EVERY, max_days=FULL_RETRAIN_MAX_DAYS):
+    """
+    Inkrementalna posodobitev produkcijskih modelov z vrsticami, dodanimi po njuni vodni oznaki učenja.
+    Vrne False, ko je potrebno celotno učenje (ni modela, preveč posodobitev ali prestar model), sicer True.
+    """
+    lineages = {name: production_lineage(model_name) for name, model_name in MODEL_NAMES.items()}
+    reason = full_retrain_reason(lineages, every=full_every, max_days=max_days)
+    if reason is not None:
+        print(f"🔁 Potrebno je celotno učenje ({reason}).")
+        return False
+
+    # Oba modela nadaljujeta od starejše vodne oznake, da nobena nova vrstica ni izpuščena
+    watermark = min(to_utc(lineage["train_watermark"]) for lineage in lineages.values())
+    df = load_split("train", start=watermark + pd.Timedelta(hours=1))
+    if df is None or df.empty:
+        print(f"📢 Ni novih učnih podatkov po {watermark.isoformat()}, posodobitev ni potrebna.")
+        return True
+    df = df.dropna(subset=[TARGET_REGRESSION, TARGET_CLASSIFICATION])
+    if df.empty:
+        print(f"📢 Novi učni podatki po {watermark.isoformat()} nimajo ciljnih vrednosti.")
+        return True
+    new_watermark = df["date"].max()
+
+    mlflow = get_mlflow()
+    models = {name: get_model_cache().get(model_name, lineages[name]["version"]) for name, model_name in MODEL_NAMES.items()}
+    X_new = df[FEATURES]
+    targets = {"reg": df[TARGET_REGRESSION].to_numpy(), "class": encode_category(df[TARGET_CLASSIFICATION])}
+
+    print(f"🚀 Inkrementalna posodobitev modelov na {len(df)} novih vrsticah ({epochs} prehodov)...")
+    with mlflow.start_run(run_name="Train_Hybrid_Model_Incremental"):
+        updated = {}
+        for name, model in models.items():
+            # Ocena pred in po posodobitvi na novih vrsticah (prej še nevidenih)
+            score_before = model.score(X_new, targets[name])
+            updated[name] = continue_training(model, X_new, targets[name], epochs)
+            score_after = updated[name].score(X_new, targets[name])
+            print(f"✅ {MODEL_NAMES[name]}: ocena na novih vrsticah {score_before:.3f} → {score_after:.3f}")
+            mlflow.log_metric(f"new_rows_score_{name}_before", score_before)
+            mlflow.log_metric(f"new_rows_score_{name}_after", score_after)
+            mlflow.log_param(f"parent_model_version_{name}", lineages[name]["version"])
+            mlflow.log_param(f"parent_run_id_{name}", lineages[name]["run_id"])
+
+        # Rodovnik: vodni oznaki, izvorno celotno učenje in število posodobitev od njega
+        lineage = lineages["reg"]
+        mlflow.log_param("training_mode", "incremental")
+        mlflow.log_param("train_watermark_start", watermark.isoformat())
+        mlflow.log_param("train_watermark", new_watermark.isoformat())
+        mlflow.log_param("rows_added", len(df))
+        mlflow.log_param("incremental_epochs", epochs)
+        mlflow.log_param("incremental_updates", max(l["incremental_updates"] for l in lineages.values()) + 1)
+        mlflow.log_param("full_run_id", lineage["full_run_id"])
+        mlflow.log_param("full_trained_at", lineage["full_trained_at"])
+
+        mlflow.sklearn.log_model(updated["reg"], "regression_model")
+        mlflow.sklearn.log_model(updated["class"], "classification_model")
+
+        print("📌 Posodobljena modela sta shranjena v MLflow!")
+    return True
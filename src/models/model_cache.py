@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import threading
+from functools import lru_cache
+
+from src.models.clients import get_mlflow, get_mlflow_client
+
+DEFAULT_MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", os.path.join(".cache", "models"))
+DEFAULT_MAX_MB = float(os.getenv("MODEL_CACHE_MAX_MB", "2048"))
+DEFAULT_POLL_SECONDS = float(os.getenv("MODEL_POLL_SECONDS", "60"))
+# Pomnilniška preslikava se splača šele pri večjih modelih; manjše joblib hitreje prebere v celoti
+# (benchmarks/bench_model_cache: pri 2 MB 2.3 ms brez in 3.0 ms s preslikavo, pri 32 MB 17.6 ms proti 3.7 ms)
+MMAP_MIN_MB = float(os.getenv("MODEL_CACHE_MMAP_MIN_MB", "8"))
+
+def parse_model_uri(model_uri):
+    """models:/<ime>/<verzija> → (ime, verzija)."""
+    prefix = "models:/"
+    name, _, version = model_uri[len(prefix):].partition("/") if model_uri.startswith(prefix) else ("", "", "")
+    if not name or not version:
+        raise ValueError(f"Nepodprt URI modela: {model_uri}")
+    return name, str(version)
+
+class ModelCache:
+    """
+    Lokalni predpomnilnik modelov iz MLflow Model Registry po (ime, verzija).
+    - Verzija modela se ne spreminja, zato zapisi ne potečejo; naložen model ostane tudi v pomnilniku procesa.
+    - Na disku je model shranjen z joblib brez stiskanja; modeli nad `mmap_min_mb` se berejo s pomnilniško
+      preslikavo (numpy polja se ne kopirajo), manjši v celoti.
+    - Ob preseganju `max_mb` odstrani najdlje neuporabljene modele (LRU).
+    - Zadnja znana produkcijska verzija vsakega modela je zapisana na disk, da zagon ne potrebuje registra.
+    """
+
+    def __init__(self, directory=DEFAULT_MODEL_CACHE_DIR, max_mb=DEFAULT_MAX_MB, mmap_min_mb=MMAP_MIN_MB):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.mmap_min_bytes = int(mmap_min_mb * 1024 ** 2)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "downloads": 0, "evictions": 0}
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name, version):
+        return os.path.join(self.directory, f"{name}-{version}.joblib")
+
+    def _pointer_path(self, name):
+        return os.path.join(self.directory, "production", f"{name}.json")
+
+    def get(self, name, version):
+        """Model (ime, verzija): iz pomnilnika, z diska ali iz MLflow (in ga shrani na disk)."""
+        import joblib
+
+        version = str(version)
+        with self._lock:
+            model = self._memory.get((name, version))
+            if model is not None:
+                self.stats["memory_hits"] += 1
+                return model
+
+        path = self._path(name, version)
+        if os.path.exists(path):
+            model = joblib.load(path, mmap_mode="r" if os.path.getsize(path) >= self.mmap_min_bytes else None)
+            now = time.time()
+            os.utime(path, (now, now))
+            self.stats["disk_hits"] += 1
+        else:
+            model = get_mlflow().sklearn.load_model(f"models:/{name}/{version}")
+            self.stats["downloads"] += 1
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            joblib.dump(model, tmp_path)
+            os.replace(tmp_path, path)
+            self._evict(keep=path)
+        with self._lock:
+            self._memory[(name, version)] = model
+        return model
+
+    def load_uri(self, model_uri):
+        """Model po URI models:/<ime>/<verzija>."""
+        return self.get(*parse_model_uri(model_uri))
+
+    def _evict(self, keep=None):
+        entries = sorted((os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".joblib")),
+                         key=os.path.getmtime)
+        total = sum(os.path.getsize(path) for path in entries)
+        for path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            total -= os.path.getsize(path)
+            os.remove(path)
+            with self._lock:
+                self._memory = {key: model for key, model in self._memory.items() if self._path(*key) != path}
+            self.stats["evictions"] += 1
+
+    def save_production(self, name, version):
+        path = self._pointer_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": str(version), "updated": time.time()}, f)
+        os.replace(tmp_path, path)
+
+    def load_production(self, name):
+        """Zadnja znana produkcijska verzija modela (brez klica registra) ali None."""
+        path = self._pointer_path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)["version"]
+
+    def production_version(self, name):
+        """
+        Trenutna produkcijska verzija iz registra; ob nedosegljivem registru zadnja znana verzija.
+        Vrne None, če je ni.
+        """
+        try:
+            versions = get_mlflow_client().get_latest_versions(name, stages=["Production"])
+        except Exception as e:
+            version = self.load_production(name)
+            print(f"⚠️ Register modelov ni dosegljiv ({e}); uporabljam zadnjo znano verzijo {name}: {version}")
+            return version
+        if not versions:
+            return None
+        version = str(versions[0].version)
+        if version != self.load_production(name):
+            self.save_production(name, version)
+        return version
+
+    def get_production(self, name):
+        """(model, verzija) trenutnega produkcijskega modela ali (None, None)."""
+        version = self.production_version(name)
+        if version is None:
+            return None, None
+        return self.get(name, version), version
+
+@lru_cache(maxsize=None)
+def get_model_cache():
+    """Vrne skupen predpomnilnik modelov procesa."""
+    return ModelCache()
+
+class ProductionPoller:
+    """
+    Drži produkcijske modele v pomnilniku in jih v ozadju posodablja.
+    - Nit vsakih `interval` sekund preveri produkcijsko verzijo v registru; nova verzija se naloži v ozadju
+      in šele nato zamenja trenutni model, zato klici `current()` nikoli ne čakajo na register ali prenos.
+    - Napaka registra ali nalaganja ohrani trenutni model.
+    """
+
+    def __init__(self, names, cache=None, interval=DEFAULT_POLL_SECONDS):
+        self.names = list(names)
+        self.cache = cache or get_model_cache()
+        self.interval = interval
+        self.stats = {"polls": 0, "swaps": 0, "errors": 0}
+        self._current = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Preveri register in zamenja modele, katerih produkcijska verzija se je spremenila; vrne zamenjana imena."""
+        self.stats["polls"] += 1
+        swapped = []
+        for name in self.names:
+            try:
+                version = self.cache.production_version(name)
+                if version is None or self._current.get(name, (None, None))[1] == version:
+                    continue
+                model = self.cache.get(name, version)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"⚠️ Posodobitev modela {name} ni uspela: {e}")
+                continue
+            # Zamenjava celotnega slovarja je atomarna; bralci vidijo star ali nov par, nikoli mešanice
+            self._current = dict(self._current, **{name: (model, version)})
+            self.stats["swaps"] += 1
+            swapped.append(name)
+            print(f"🔄 {name}: produkcijska verzija {version}")
+        return swapped
+
+    def current(self):
+        """{ime: (model, verzija)} trenutno naloženih modelov."""
+        return self._current
+
+    def start(self):
+        """Prvo nalaganje (sinhrono) in zagon niti za preverjanje registra."""
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
@@ -1,61 +1,99 @@
 import os
 import json
+import numpy as np
 import pandas as pd
-import mlflow
-import mlflow.sklearn
 import argparse
-from dotenv import load_dotenv
 from datetime import datetime
-from pymongo import MongoClient
-
-# Nastavitev okolja
-load_dotenv()
-mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI"))
-os.environ["MLFLOW_TRACKING_USERNAME"] = os.getenv("MLFLOW_TRACKING_USERNAME")
-os.environ["MLFLOW_TRACKING_PASSWORD"] = os.getenv("MLFLOW_TRACKING_PASSWORD")
-
-# Povezava z MongoDB
-client = MongoClient(os.getenv("MONGODB_URI"))
-db = client["aqiPredictions"]
-collection = db["predictions"]
-
-# Fiksna pot do testnih podatkov
-INPUT_DATA_PATH = "data/processed/test/test_data.csv"
-
-def save_predictions_to_mongo(input_data, predictions_reg, predictions_class, model_reg, model_class):
-    """Shrani napovedi za PM10 in category v MongoDB."""
-    timestamp = datetime.now().isoformat()
-    documents = []
-
-    for i in range(len(predictions_reg)):
-        doc = {
-            "timestamp": timestamp,
-            "model_regression": model_reg,
-            "model_classification": model_class,
-            "features": {col: float(input_data.iloc[i][col]) for col in input_data.columns},
-            "predicted_pm10": float(predictions_reg[i]),
-            "predicted_category": predictions_class[i]  # Ostane kategorična vrednost
-        }
-        documents.append(doc)
-
-    collection.insert_many(documents)
-    print(f"✅ Napovedi shranjene v MongoDB.")
+
+from src.data.splits import load_split, split_fingerprint
+from src.models.clients import (MONGODB_WRITE_CHUNK_SIZE, MONGODB_WRITE_WORKERS, get_predictions_collection,
+                                insert_documents, upsert_documents)
+from src.models.features import FEATURES, predict_cached, predict_category
+from src.models.model_cache import get_model_cache
+
+def build_prediction_documents(input_data, predictions_reg, predictions_class, model_reg, model_class, timestamp=None,
+                               keys=None):
+    """
+    Dokumenti napovedi, zgrajeni iz celotnih stolpcev (brez dostopa do posameznih celic).
+    `keys`: stolpca "station" in "date" vrstic; dodata postajo in uro napovedi (ključ napovedi).
+    """
+    created_at = datetime.utcnow()
+    timestamp = timestamp or created_at.isoformat()
+    features = input_data.astype("float64").to_dict("records")
+    pm10 = np.asarray(predictions_reg, dtype="float64").ravel().tolist()
+    categories = np.asarray(predictions_class, dtype=object).tolist()
+    documents = [{
+        "timestamp": timestamp,
+        "created_at": created_at,
+        "model_regression": model_reg,
+        "model_classification": model_class,
+        "features": row,
+        "predicted_pm10": value,
+        "predicted_category": category,
+    } for row, value, category in zip(features, pm10, categories)]
+    if keys is not None:
+        # MongoDB hrani čas v UTC brez časovnega pasu
+        target_times = pd.to_datetime(keys["date"], utc=True).dt.tz_convert(None).dt.to_pydatetime()
+        for doc, station, target_time in zip(documents, keys["station"].astype(str).tolist(), target_times):
+            doc["station"] = station
+            doc["target_time"] = target_time
+    return documents
+
+def save_predictions_to_mongo(input_data, predictions_reg, predictions_class, model_reg, model_class, keys=None,
+                              chunk_size=MONGODB_WRITE_CHUNK_SIZE, max_workers=MONGODB_WRITE_WORKERS):
+    """
+    Shrani napovedi za PM10 in category v MongoDB (v paketih, hkrati prek bazena povezav).
+    S ključi (postaja, ura) se napovedi zapišejo idempotentno: enaka ura, postaja in verziji modelov
+    prepišejo obstoječi dokument namesto novega.
+    """
+    documents = build_prediction_documents(input_data, predictions_reg, predictions_class, model_reg, model_class, keys=keys)
+    collection = get_predictions_collection()
+    if keys is None:
+        inserted, errors = insert_documents(collection, documents, chunk_size, max_workers)
+        updated = 0
+    else:
+        inserted, updated, errors = upsert_documents(collection, documents, on_insert=("timestamp", "created_at"),
+                                                     chunk_size=chunk_size, max_workers=max_workers)
+    if errors:
+        print(f"⚠️ {errors} napovedi ni bilo mogoče shraniti.")
+    print(f"✅ Napovedi shranjene v MongoDB ({inserted} novih, {updated} posodobljenih).")
+
+def predicted_keys(collection, model_reg, model_class, start, end):
+    """Množica (postaja, ura) z že shranjeno napovedjo verzij modelov na intervalu [start, end] (pokrito z indeksom ključa)."""
+    cursor = collection.find(
+        {"model_regression": model_reg, "model_classification": model_class,
+         "target_time": {"$gte": start, "$lte": end}},
+        {"_id": 0, "station": 1, "target_time": 1},
+    )
+    return {(doc["station"], pd.Timestamp(doc["target_time"])) for doc in cursor}
+
+def missing_rows(df, collection, model_reg, model_class):
+    """Vrstice brez napovedi za trenutni verziji modelov."""
+    if df.empty:
+        return df
+    times = pd.to_datetime(df["date"], utc=True).dt.tz_convert(None)
+    done = predicted_keys(collection, model_reg, model_class, times.min().to_pydatetime(), times.max().to_pydatetime())
+    if not done:
+        return df
+    mask = [(station, time) not in done for station, time in zip(df["station"].astype(str), times)]
+    return df[np.asarray(mask, dtype=bool)]
 
 def load_production_model(model_name):
-    """Naloži najnovejši 'Production' model iz MLflow Model Registry."""
-    client = mlflow.tracking.MlflowClient()
-    models = client.get_latest_versions(model_name, stages=["Production"])
+    """Naloži najnovejši 'Production' model iz MLflow Model Registry (prek lokalnega predpomnilnika modelov)."""
+    model, version = get_model_cache().get_production(model_name)
 
-    if not models:
+    if model is None:
         print(f"❌ Ni modelov v 'Production' za {model_name}")
-        return None
+        return None, None
 
-    model_uri = f"models:/{model_name}/{models[0].version}"
-    print(f"✅ Nalagam model {model_name} (verzija {models[0].version})...")
-    return mlflow.sklearn.load_model(model_uri), models[0].version
+    print(f"✅ Naložen model {model_name} (verzija {version})")
+    return model, version
 
-def predict():
-    """Izvede napovedi s produkcijskim modelom in jih shrani v MongoDB."""
+def predict(incremental=True):
+    """
+    Izvede napovedi s produkcijskim modelom in jih shrani v MongoDB.
+    `incremental`: napove le ure, ki za trenutni verziji modelov še nimajo napovedi.
+    """
     # Nalaganje modelov
     model_reg, version_reg = load_production_model("regression_model")
     model_class, version_class = load_production_model("classification_model")
@@ -64,24 +102,47 @@ def predict():
         return
 
     # Nalaganje podatkov
-    df = pd.read_csv(INPUT_DATA_PATH)
-    features = ["pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "temperature_2m",
-                "relative_humidity_2m", "rain", "snowfall", "is_day"]
+    df = load_split("test")
+    if df is None:
+        print("❌ Podatki za napoved niso na voljo.")
+        return
+    features = FEATURES
 
     if not all(f in df.columns for f in features):
-        print(f"❌ Manjkajoče značilke v {INPUT_DATA_PATH}")
+        print(f"❌ Manjkajoče značilke v podatkih za napoved")
         return
 
+    # Modela iz istega učenja imata enak predprocesor, zato se značilke transformirajo le enkrat
+    data_key = split_fingerprint("test")
+    if incremental:
+        total = len(df)
+        df = missing_rows(df, get_predictions_collection(), version_reg, version_class)
+        if df.empty:
+            print(f"⏭️ Vseh {total} ur že ima napoved za verziji modelov {version_reg}/{version_class}.")
+            return
+        if len(df) < total:
+            # Podmnožica vrstic ima drugačen prstni odtis kot celoten testni del
+            print(f"🔎 Napovedujem {len(df)} od {total} ur (ostale že imajo napoved).")
+            df, data_key = df.reset_index(drop=True), None
+
     X = df[features]
 
     # Napovedi
-    predictions_reg = model_reg.predict(X)
-    predictions_class = model_class.predict(X)  # Kategorije ostanejo nespremenjene
+    predictions_reg = predict_cached(model_reg, X, data_key=data_key)
+    # Klasifikator vrne one-hot kodiranje; v bazo gre ime kategorije (kot v storitvi in evalvaciji)
+    predictions_class = predict_category(model_class, X, data_key=data_key)
 
-    # Shrani napovedi v MongoDB
-    save_predictions_to_mongo(df[features], predictions_reg, predictions_class, version_reg, version_class)
+    # Shrani napovedi v MongoDB (idempotentno po uri, postaji in verzijah modelov)
+    save_predictions_to_mongo(df[features], predictions_reg, predictions_class, version_reg, version_class,
+                              keys=df[["station", "date"]])
 
     print(f"✅ Napovedi za PM10 in kategorijo uspešno izvedene.")
 
+def main():
+    parser = argparse.ArgumentParser(description="Napovedi s produkcijskima modeloma.")
+    parser.add_argument("--full", action="store_true", help="Napovej vse ure (tudi tiste, ki že imajo napoved).")
+    args = parser.parse_args()
+    predict(incremental=not args.full)
+
 if __name__ == "__main__":
-    predict()
\ No newline at end of file
+    main()
@@ -0,0 +1,155 @@
+import math
+import time
+import numpy as np
+
+from src.models.trials import fold_key, trial_key
+
+# Privzete nastavitve zaporednega prepolovljenja (kot HalvingGridSearchCV)
+DEFAULT_FACTOR = 3
+DEFAULT_RESOURCE = "n_samples"
+DEFAULT_CV = 3
+
+def _fit_candidate(estimator, params, X, y, train_idx, test_idx, return_model=False):
+    """Nauči kandidata na učnem delu pregiba in ga oceni na testnem; vrne (ocena, čas v sekundah, model)."""
+    from sklearn.base import clone
+
+    start = time.perf_counter()
+    model = clone(estimator).set_params(**params)
+    model.fit(X[train_idx], y[train_idx])
+    score = model.score(X[test_idx], y[test_idx])
+    return score, time.perf_counter() - start, model if return_model else None
+
+def _refit(estimator, params, X, y):
+    from sklearn.base import clone
+
+    start = time.perf_counter()
+    model = clone(estimator).set_params(**params).fit(X, y)
+    return model, time.perf_counter() - start
+
+def _n_rounds(n_candidates, factor):
+    """Število krogov, da v zadnjem ostane največ `factor` kandidatov (v vsakem krogu ostane ceil(n / factor))."""
+    rounds = 1
+    while n_candidates > factor:
+        n_candidates = math.ceil(n_candidates / factor)
+        rounds += 1
+    return rounds
+
+def run_searches(tasks, X, cv=DEFAULT_CV, n_jobs=-1, halving=True, factor=DEFAULT_FACTOR, resource=DEFAULT_RESOURCE,
+                 min_resources=None, random_state=42, verbose=True, store=None, data_key=None, warm_start=None):
+    """
+    Skupno iskanje hiperparametrov za več nalog (npr. regresija in klasifikacija) nad isto matriko značilk `X`.
+    - `tasks`: {ime: {"estimator": ..., "param_grid": ..., "y": ...}}
+    - Vsa učenja (vse naloge, kandidati in pregibi) se razporedijo v en skupen bazen procesov.
+    - `halving`: zaporedno prepolovljenje; kandidati dobijo v vsakem krogu `factor`-krat več vira, naprej pa gre
+      najboljša 1/`factor` kandidatov vsake naloge. Vir je podvzorec učnega dela pregiba (`resource="n_samples"`)
+      ali parameter modela (npr. `resource="max_iter"`: kratka učenja kot zgodnja ustavitev slabih kandidatov).
+    - `store` (TrialStore) in `data_key`: ocene pregibov se najprej poiščejo v shrambi poskusov, nova učenja se vanjo zapišejo.
+    - `warm_start`: {ime: prejšnji najboljši zapis}; naloga se ne išče, uporabijo se prejšnji najboljši parametri.
+    - Najboljši kandidat vsake naloge se nauči na vseh podatkih in se vrne neposredno (brez ponovnega učenja).
+    Vrne {ime: {"best_estimator": ..., "best_params": ..., "best_score": ..., "refit_seconds": ..., "results": [...]}}.
+    """
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import KFold, ParameterGrid
+
+    splits = list(KFold(n_splits=cv).split(X)) if isinstance(cv, int) else list(cv)
+    rng = np.random.default_rng(random_state)
+    targets = {name: np.asarray(task["y"]) for name, task in tasks.items()}
+    candidates = {name: list(ParameterGrid(task["param_grid"])) for name, task in tasks.items()}
+    results = {name: [] for name in tasks}
+    for name, best in (warm_start or {}).items():
+        if name in tasks:
+            candidates[name] = [best["params"]]
+            results[name].append({"params": best["params"], "round": None, "n_resources": None,
+                                  "mean_score": best["score"], "fit_seconds": 0.0, "warm_start": True})
+    alive = {name: list(range(len(grid))) for name, grid in candidates.items()}
+
+    n_rounds = _n_rounds(max(len(grid) for grid in candidates.values()), factor) if halving else 1
+    n_train = min(len(train_idx) for train_idx, _ in splits)
+    # Največji vir: vse vrstice pregiba ali vrednost parametra v podanih modelih
+    max_resources = n_train if resource == "n_samples" else min(task["estimator"].get_params()[resource] for task in tasks.values())
+    min_resources = min_resources or max(max_resources // factor ** (n_rounds - 1), 1)
+
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for round_ in range(n_rounds):
+            n_resources = max_resources if round_ == n_rounds - 1 else min(max_resources, min_resources * factor ** round_)
+            fold_splits = splits
+            round_params = {}
+            if resource == "n_samples":
+                # Podvzorec učnega dela vsakega pregiba (enak za vse kandidate v krogu)
+                fold_splits = [(np.sort(rng.permutation(train_idx)[:n_resources]), test_idx) for train_idx, test_idx in splits]
+            else:
+                round_params = {resource: n_resources}
+
+            # Naloge, pri katerih je ostal en sam kandidat (in so že ocenjene), ne potrebujejo novih učenj
+            jobs = [(name, index, fold) for name in tasks if len(alive[name]) > 1 or not results[name]
+                    for index in alive[name] for fold in range(len(fold_splits))]
+            if not jobs:
+                break
+
+            # Poskusi, ki so že v shrambi (enaki podatki, pregib in parametri), se ne učijo znova
+            outcomes, keys = {}, {}
+            if store is not None and data_key is not None:
+                folds = [fold_key(*fold_split) for fold_split in fold_splits]
+                for name, index, fold in jobs:
+                    key = trial_key(data_key, folds[fold], tasks[name]["estimator"], dict(candidates[name][index], **round_params))
+                    record = store.get(key)
+                    if record is None:
+                        keys[(name, index, fold)] = key
+                    else:
+                        outcomes[(name, index, fold)] = (record["score"], record["seconds"], True)
+            pending = [job for job in jobs if job not in outcomes]
+
+            if verbose:
+                print(f"🔎 Krog {round_ + 1}/{n_rounds}: {len(pending)} učenj ({len(jobs) - len(pending)} iz shrambe), "
+                      f"{resource}={n_resources}")
+            return_model = store is not None and store.store_models
+            outputs = parallel(
+                delayed(_fit_candidate)(tasks[name]["estimator"], dict(candidates[name][index], **round_params), X, targets[name],
+                                        *fold_splits[fold], return_model)
+                for name, index, fold in pending
+            )
+            for job, (score, seconds, model) in zip(pending, outputs):
+                if job in keys:
+                    store.put(keys[job], score, seconds, model)
+                outcomes[job] = (score, seconds, False)
+
+            scores = {}
+            for name, index, fold in jobs:
+                scores.setdefault((name, index), []).append(outcomes[(name, index, fold)])
+            for (name, index), fold_results in scores.items():
+                results[name].append({
+                    "params": candidates[name][index],
+                    "round": round_,
+                    "n_resources": n_resources,
+                    "mean_score": float(np.mean([score for score, _, _ in fold_results])),
+                    "fit_seconds": float(sum(seconds for _, seconds, _ in fold_results)),
+                    "cached_folds": sum(cached for _, _, cached in fold_results),
+                })
+
+            # Naprej gre najboljša 1/factor kandidatov vsake naloge
+            for name in {name for name, _ in scores}:
+                ranked = sorted(alive[name], key=lambda index: -np.mean([score for score, _, _ in scores[(name, index)]]))
+                alive[name] = ranked[:math.ceil(len(ranked) / factor)] if round_ < n_rounds - 1 else ranked[:1]
+
+        # Ponovno učenje najboljših kandidatov vseh nalog hkrati
+        names = list(tasks)
+        refits = parallel(
+            delayed(_refit)(tasks[name]["estimator"], candidates[name][alive[name][0]], X, targets[name]) for name in names
+        )
+
+    summary = {}
+    for name, (model, seconds) in zip(names, refits):
+        best_params = candidates[name][alive[name][0]]
+        best_score = [result["mean_score"] for result in results[name] if result["params"] == best_params][-1]
+        summary[name] = {"best_estimator": model, "best_params": best_params, "best_score": best_score,
+                         "refit_seconds": seconds, "results": results[name]}
+    return summary
+
+def log_search(mlflow, name, search):
+    """Zapiše čas in oceno vsakega kandidata v MLflow (metrika po korakih in tabela rezultatov)."""
+    for step, result in enumerate(search["results"]):
+        mlflow.log_metric(f"search_{name}_fit_seconds", result["fit_seconds"], step=step)
+        mlflow.log_metric(f"search_{name}_score", result["mean_score"], step=step)
+    mlflow.log_metric(f"search_{name}_refit_seconds", search["refit_seconds"])
+    mlflow.log_dict({"results": [dict(result, params={k: str(v) for k, v in result["params"].items()})
+                                 for result in search["results"]]}, f"search/{name}.json")
@@ -1,49 +1,56 @@
 import os
 import json
+from datetime import datetime
 import pandas as pd
 import numpy as np
-import mlflow
-import mlflow.sklearn
-from mlflow.tracking import MlflowClient
-from dotenv import load_dotenv
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.impute import SimpleImputer
-from sklearn.neural_network import MLPRegressor, MLPClassifier
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.compose import ColumnTransformer
 import argparse
 
-# Nastavitev MLflow
-load_dotenv()
-mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI"))
-mlflow_client = MlflowClient()
-os.environ["MLFLOW_TRACKING_USERNAME"] = os.getenv("MLFLOW_TRACKING_USERNAME")
-os.environ["MLFLOW_TRACKING_PASSWORD"] = os.getenv("MLFLOW_TRACKING_PASSWORD")
+from src.data.splits import load_split, split_fingerprint
+from src.models.clients import get_mlflow
+from src.models.features import (FEATURES, TARGET_REGRESSION, TARGET_CLASSIFICATION, data_fingerprint, encode_category,
+                                 fit_transform_cached, transform_cached)
+from src.models.search import DEFAULT_FACTOR, run_searches, log_search
+from src.models.trials import TrialStore
+
+# Pri zaporednem prepolovljenju je vir število epoh: v prvem krogu se kandidati učijo le SEARCH_MIN_EPOCHS epoh
+SEARCH_MIN_EPOCHS = 50
+
+def train_model(halving=True, factor=DEFAULT_FACTOR, n_jobs=-1, warm_start=True, use_trial_store=True):
+    """
+    Treniranje hibridnega modela za napovedovanje PM10 (regresija) in category (klasifikacija).
+    Iskanje hiperparametrov obeh modelov teče skupaj v enem bazenu procesov (privzeto z zaporednim
+    prepolovljenjem); najboljša modela iz iskanja sta hkrati končna modela.
+    - Ocene pregibov se hranijo v shrambi poskusov, zato se na enakih podatkih ne računajo znova.
+    - `warm_start`: če je od zadnjega iskanja prispelo le malo novih podatkov, se uporabijo prejšnji najboljši parametri.
+    """
+    # scikit-learn (in z njim scipy) uvozimo šele ob učenju, da je uvoz modula hiter
+    from sklearn.pipeline import Pipeline
+    from sklearn.neural_network import MLPRegressor, MLPClassifier
+    from sklearn.model_selection import train_test_split
 
-# Fiksne poti do podatkov
-TRAIN_DATA_PATH = "data/processed/train/train_data.csv"
-
-def train_model():
-    """Treniranje hibridnega modela za napovedovanje PM10 (regresija) in category (klasifikacija)."""
     print(f"🚀 Začenjam učenje modelov...")
 
     # Nalaganje podatkov
-    df = pd.read_csv(TRAIN_DATA_PATH, parse_dates=["date"])
+    df = load_split("train")
+    if df is None:
+        print("❌ Napaka: Učni podatki niso na voljo (zaženite stopnjo split).")
+        return
+
+    # Vodna oznaka učenja: zadnja ura v učnih podatkih (od nje nadaljuje inkrementalno učenje)
+    train_watermark = df["date"].max() if "date" in df.columns and not df.empty else None
 
-    # Odstranimo stolpec "date", ker ni uporaben za učenje
-    df = df.drop(columns=["date"])
+    # Odstranimo stolpca "station" in "date", ker nista uporabna za učenje
+    df = df.drop(columns=["station", "date"], errors="ignore")
 
     # Določimo značilke in ciljne spremenljivke
-    features = ["pm2_5", "carbon_monoxide", "carbon_dioxide", "uv_index", "temperature_2m",
-                "relative_humidity_2m", "rain", "snowfall", "is_day"]
-    target_regression = "pm10"
-    target_classification = "category"
+    features = FEATURES
+    target_regression = TARGET_REGRESSION
+    target_classification = TARGET_CLASSIFICATION
 
     # Preverimo, ali so vsi zahtevani stolpci prisotni
     required_columns = features + [target_regression, target_classification]
     if not all(col in df.columns for col in required_columns):
-        print(f"❌ Napaka: Manjkajo stolpci v {TRAIN_DATA_PATH}")
+        print(f"❌ Napaka: Manjkajo stolpci v učnih podatkih")
         return
 
     # Razdelimo podatke na regresijski in klasifikacijski model
@@ -51,100 +58,103 @@ def train_model():
     y_regression = df[target_regression]
     y_classification = df[target_classification]
 
-    # Pretvorimo kategorije v numerične vrednosti
-    encoder = OneHotEncoder(handle_unknown="ignore", sparse=False)
-    y_classification_encoded = encoder.fit_transform(y_classification.to_numpy().reshape(-1, 1))
+    # Pretvorimo kategorije v numerične vrednosti (vrstni red stolpcev določa skupna tabela kategorij)
+    y_classification_encoded = encode_category(y_classification)
 
     # Razdelimo na train/test sklope
     X_train, X_test, y_train_reg, y_test_reg = train_test_split(X, y_regression, test_size=0.2, random_state=42)
     _, _, y_train_class, y_test_class = train_test_split(X, y_classification_encoded, test_size=0.2, random_state=42)
 
-    # Predprocesiranje podatkov
-    preprocessor = ColumnTransformer([
-        ("num", Pipeline([
-            ("imputer", SimpleImputer(strategy="mean")),
-            ("scaler", StandardScaler())
-        ]), features)
-    ])
+    # Predprocesiranje podatkov: en prehod, skupen vsem iskanjem in končnim modelom (float32, predpomnjeno na disku)
+    train_key = split_fingerprint("train")
+    data_key = f"{train_key}:train:0.2:42" if train_key else data_fingerprint(df, required_columns)
+    Xt_train, preprocessor = fit_transform_cached(X_train, data_key=train_key and data_key)
+    Xt_test = transform_cached(preprocessor, X_test, data_key=train_key and f"{train_key}:test:0.2:42")
 
     # Model za regresijo (napoved PM10)
-    mlp_regressor = MLPRegressor(max_iter=500, random_state=42)
-
-    pipeline_regression = Pipeline([
-        ("preprocess", preprocessor),
-        ("MLPR", mlp_regressor)
-    ])
+    mlp_regressor = MLPRegressor(max_iter=1000, random_state=42)
 
     # Model za klasifikacijo (napoved kategorije)
-    mlp_classifier = MLPClassifier(max_iter=500, random_state=42)
-
-    pipeline_classification = Pipeline([
-        ("preprocess", preprocessor),
-        ("MLPC", mlp_classifier)
-    ])
+    mlp_classifier = MLPClassifier(max_iter=1000, random_state=42)
 
     # Parametri za optimizacijo modelov
     param_grid_regression = {
-        "MLPR__hidden_layer_sizes": [(32,), (16,)],
-        "MLPR__learning_rate_init": [0.001, 0.01]
+        "hidden_layer_sizes": [(32,), (16,)],
+        "learning_rate_init": [0.001, 0.01]
     }
     param_grid_classification = {
-        "MLPC__hidden_layer_sizes": [(32,), (16,)],
-        "MLPC__learning_rate_init": [0.001, 0.01]
+        "hidden_layer_sizes": [(32,), (16,)],
+        "learning_rate_init": [0.001, 0.01]
     }
 
-    print("🔎 Optimizacija hiperparametrov za regresijski model...")
-    search_reg = GridSearchCV(pipeline_regression, param_grid_regression, cv=3, verbose=2, n_jobs=-1)
-    
-    print("🔎 Optimizacija hiperparametrov za klasifikacijski model...")
-    search_class = GridSearchCV(pipeline_classification, param_grid_classification, cv=3, verbose=2, n_jobs=-1)
+    # Shramba poskusov in topel začetek iz prejšnjih najboljših parametrov
+    store = TrialStore() if use_trial_store else None
+    warm = {}
+    if store is not None and warm_start:
+        warm = {name: best for name in ("reg", "class") if (best := store.warm_start(name, len(Xt_train), data_key)) is not None}
+        for name, best in warm.items():
+            print(f"♻️ {name}: topel začetek s parametri {best['params']} (zadnje iskanje na {best['n_rows']} vrsticah)")
 
+    mlflow = get_mlflow()
     with mlflow.start_run(run_name="Train_Hybrid_Model"):
-        search_reg.fit(X_train, y_train_reg)
-        search_class.fit(X_train, y_train_class)
-
-        best_params_reg = search_reg.best_params_
-        best_params_class = search_class.best_params_
-
-        # Končni modeli z optimiziranimi parametri
-        final_regressor = Pipeline([
-            ("preprocess", preprocessor),
-            ("MLPR", MLPRegressor(
-                hidden_layer_sizes=best_params_reg["MLPR__hidden_layer_sizes"], 
-                learning_rate_init=best_params_reg["MLPR__learning_rate_init"], 
-                max_iter=1000, random_state=42))
-        ])
-        final_regressor.fit(X_train, y_train_reg)
-
-        final_classifier = Pipeline([
-            ("preprocess", preprocessor),
-            ("MLPC", MLPClassifier(
-                hidden_layer_sizes=best_params_class["MLPC__hidden_layer_sizes"], 
-                learning_rate_init=best_params_class["MLPC__learning_rate_init"], 
-                max_iter=1000, random_state=42))
-        ])
-        final_classifier.fit(X_train, y_train_class)
+        print("🔎 Optimizacija hiperparametrov za regresijski in klasifikacijski model...")
+        searches = run_searches({
+            "reg": {"estimator": mlp_regressor, "param_grid": param_grid_regression, "y": y_train_reg},
+            "class": {"estimator": mlp_classifier, "param_grid": param_grid_classification, "y": y_train_class},
+        }, Xt_train, cv=3, n_jobs=n_jobs, halving=halving, factor=factor, resource="max_iter",
+            min_resources=SEARCH_MIN_EPOCHS, store=store, data_key=data_key, warm_start=warm)
+        if store is not None:
+            print(f"📦 Shramba poskusov: {store.stats}")
+            for name, search in searches.items():
+                if name not in warm:
+                    store.save_best(name, search["best_params"], search["best_score"], len(Xt_train), data_key)
+
+        best_params_reg = searches["reg"]["best_params"]
+        best_params_class = searches["class"]["best_params"]
+
+        # Končna modela sta najboljša kandidata, naučena na vseh učnih podatkih že med iskanjem
+        mlp_regressor = searches["reg"]["best_estimator"]
+        mlp_classifier = searches["class"]["best_estimator"]
+
+        # Shranjena modela vsebujeta naučen predprocesor, zato ju napovedovanje uporablja nad surovimi značilkami
+        final_regressor = Pipeline([("preprocess", preprocessor), ("MLPR", mlp_regressor)])
+        final_classifier = Pipeline([("preprocess", preprocessor), ("MLPC", mlp_classifier)])
 
         # Ocene modelov
-        train_score_reg = final_regressor.score(X_train, y_train_reg)
-        test_score_reg = final_regressor.score(X_test, y_test_reg)
-        train_score_class = final_classifier.score(X_train, y_train_class)
-        test_score_class = final_classifier.score(X_test, y_test_class)
+        train_score_reg = mlp_regressor.score(Xt_train, y_train_reg)
+        test_score_reg = mlp_regressor.score(Xt_test, y_test_reg)
+        train_score_class = mlp_classifier.score(Xt_train, y_train_class)
+        test_score_class = mlp_classifier.score(Xt_test, y_test_class)
 
         print(f"✅ Regresijski model: Train Score: {train_score_reg:.3f}, Test Score: {test_score_reg:.3f}")
         print(f"✅ Klasifikacijski model: Train Score: {train_score_class:.3f}, Test Score: {test_score_class:.3f}")
 
         # Logiranje parametrov in metrik v MLflow
-        mlflow.log_param("best_hidden_layer_sizes_reg", best_params_reg["MLPR__hidden_layer_sizes"])
-        mlflow.log_param("best_learning_rate_reg", best_params_reg["MLPR__learning_rate_init"])
+        mlflow.log_param("best_hidden_layer_sizes_reg", best_params_reg["hidden_layer_sizes"])
+        mlflow.log_param("best_learning_rate_reg", best_params_reg["learning_rate_init"])
         mlflow.log_metric("train_score_reg", train_score_reg)
         mlflow.log_metric("test_score_reg", test_score_reg)
 
-        mlflow.log_param("best_hidden_layer_sizes_class", best_params_class["MLPC__hidden_layer_sizes"])
-        mlflow.log_param("best_learning_rate_class", best_params_class["MLPC__learning_rate_init"])
+        mlflow.log_param("best_hidden_layer_sizes_class", best_params_class["hidden_layer_sizes"])
+        mlflow.log_param("best_learning_rate_class", best_params_class["learning_rate_init"])
         mlflow.log_metric("train_score_class", train_score_class)
         mlflow.log_metric("test_score_class", test_score_class)
 
+        # Čas in ocena vsakega kandidata iskanja
+        mlflow.log_param("search_halving", halving)
+        mlflow.log_param("search_factor", factor)
+        mlflow.log_param("search_warm_start", ",".join(sorted(warm)) or "none")
+
+        # Rodovnik: celotno učenje je začetek verige inkrementalnih posodobitev
+        mlflow.log_param("training_mode", "full")
+        mlflow.log_param("train_watermark", train_watermark.isoformat() if train_watermark is not None else None)
+        mlflow.log_param("trained_rows", len(df))
+        mlflow.log_param("incremental_updates", 0)
+        mlflow.log_param("full_run_id", mlflow.active_run().info.run_id)
+        mlflow.log_param("full_trained_at", datetime.utcnow().isoformat())
+        for name, search in searches.items():
+            log_search(mlflow, name, search)
+
         # Shranjevanje modelov v MLflow
         mlflow.sklearn.log_model(final_regressor, "regression_model")
         mlflow.sklearn.log_model(final_classifier, "classification_model")
@@ -152,7 +162,22 @@ def train_model():
         print("📌 Modeli so shranjeni in registrirani v MLflow!")
 
 def main():
-    train_model()
+    parser = argparse.ArgumentParser(description="Učenje regresijskega in klasifikacijskega modela.")
+    parser.add_argument("--no-halving", action="store_true", help="Izčrpno iskanje (vsi kandidati na vseh podatkih).")
+    parser.add_argument("--factor", type=int, default=DEFAULT_FACTOR, help="Faktor zaporednega prepolovljenja.")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Velikost skupnega bazena procesov.")
+    parser.add_argument("--no-warm-start", action="store_true", help="Vedno izvedi celotno iskanje hiperparametrov.")
+    parser.add_argument("--no-trial-store", action="store_true", help="Ne uporabi shrambe poskusov.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Nadaljuj učenje produkcijskih modelov na novih vrsticah (celotno učenje le, ko je potrebno).")
+    parser.add_argument("--incremental-epochs", type=int, default=None, help="Število prehodov inkrementalne posodobitve.")
+    args = parser.parse_args()
+
+    if args.incremental:
+        from src.models.incremental import INCREMENTAL_EPOCHS, train_incremental
+        if train_incremental(args.incremental_epochs or INCREMENTAL_EPOCHS):
+            return
+    train_model(not args.no_halving, args.factor, args.n_jobs, not args.no_warm_start, not args.no_trial_store)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,173 @@
+import os
+import time
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.data.splits import load_split
+from src.models.clients import get_mlflow
+from src.models.features import FEATURES, TARGET_REGRESSION, TARGET_CLASSIFICATION, build_preprocessor, encode_category
+from src.models.trials import TrialStore
+
+# Postaje z manj učnimi vrsticami se ne učijo (premalo podatkov za ločen model)
+MIN_SHARD_ROWS = 200
+
+# Privzeti parametri, če shramba poskusov še nima najboljših parametrov globalnih modelov
+DEFAULT_PARAMS = {"hidden_layer_sizes": (32,), "learning_rate_init": 0.001}
+
+def station_model_name(base_name, station):
+    """Ime registriranega modela postaje (npr. regression_model_maribor)."""
+    return f"{base_name}_{station}"
+
+def pool_size(n_shards, workers=None, blas_threads=None, cpus=None):
+    """
+    Velikost bazena procesov in število BLAS niti na proces, da skupaj ne presežeta števila jeder
+    (procesi × niti ≤ jedra); privzeto čim več procesov, ostanek jeder gre nitim.
+    """
+    cpus = cpus or os.cpu_count() or 1
+    workers = max(1, min(workers or cpus, n_shards, cpus))
+    blas_threads = blas_threads or max(1, cpus // workers)
+    return workers, blas_threads
+
+def best_params():
+    """Najboljši parametri globalnih modelov iz shrambe poskusov (izhodišče za modele postaj)."""
+    store = TrialStore()
+    params = {}
+    for name in ("reg", "class"):
+        best = store.load_best(name)
+        params[name] = best["params"] if best is not None else dict(DEFAULT_PARAMS)
+    return params
+
+def train_shard(station, df, params, blas_threads, test_size=0.2, random_state=42):
+    """
+    Nauči regresijski in klasifikacijski model ene postaje (teče v procesu bazena).
+    Število niti BLAS je omejeno, da se procesi bazena ne prerivajo za jedra.
+    """
+    from threadpoolctl import threadpool_limits
+    from sklearn.pipeline import Pipeline
+    from sklearn.neural_network import MLPRegressor, MLPClassifier
+    from sklearn.model_selection import train_test_split
+
+    start = time.perf_counter()
+    with threadpool_limits(limits=blas_threads):
+        train_watermark = df["date"].max()
+        X = df[FEATURES]
+        y_reg = df[TARGET_REGRESSION].to_numpy()
+        y_class = encode_category(df[TARGET_CLASSIFICATION])
+        X_train, X_test, y_train_reg, y_test_reg, y_train_class, y_test_class = train_test_split(
+            X, y_reg, y_class, test_size=test_size, random_state=random_state)
+
+        models, scores = {}, {}
+        for name, estimator, y_train, y_test in (
+            ("reg", MLPRegressor(max_iter=1000, random_state=random_state, **params["reg"]), y_train_reg, y_test_reg),
+            ("class", MLPClassifier(max_iter=1000, random_state=random_state, **params["class"]), y_train_class, y_test_class),
+        ):
+            models[name] = Pipeline([("preprocess", build_preprocessor()), ("MLPR" if name == "reg" else "MLPC", estimator)])
+            models[name].fit(X_train, y_train)
+            scores[f"train_score_{name}"] = models[name].score(X_train, y_train)
+            scores[f"test_score_{name}"] = models[name].score(X_test, y_test)
+
+    return {"station": station, "models": models, "scores": scores, "rows": len(df),
+            "train_watermark": train_watermark, "seconds": time.perf_counter() - start}
+
+def _train_shard_safe(station, df, params, blas_threads):
+    """Napaka ene postaje se vrne kot rezultat, da ne prekine ostalih."""
+    try:
+        return train_shard(station, df, params, blas_threads)
+    except Exception as e:
+        return {"station": station, "error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc()}
+
+def register_shard(mlflow, result, workers, blas_threads):
+    """Zapiše zagon postaje in oba modela registrira kot novi verziji modelov postaje."""
+    station = result["station"]
+    with mlflow.start_run(run_name=f"Train_Station_{station}"):
+        mlflow.log_param("station", station)
+        mlflow.log_param("training_mode", "full")
+        mlflow.log_param("train_watermark", result["train_watermark"].isoformat())
+        mlflow.log_param("trained_rows", result["rows"])
+        mlflow.log_param("pool_workers", workers)
+        mlflow.log_param("blas_threads", blas_threads)
+        for name, value in result["scores"].items():
+            mlflow.log_metric(name, value)
+        mlflow.log_metric("shard_fit_seconds", result["seconds"])
+        mlflow.sklearn.log_model(result["models"]["reg"], "regression_model",
+                                 registered_model_name=station_model_name("regression_model", station))
+        mlflow.sklearn.log_model(result["models"]["class"], "classification_model",
+                                 registered_model_name=station_model_name("classification_model", station))
+
+def train_stations(stations=None, workers=None, blas_threads=None, min_rows=MIN_SHARD_ROWS, register=True):
+    """
+    Učenje ločenih modelov za vsako postajo v bazenu procesov.
+    - Učni del delitve se razdeli po postajah; postaje z manj kot `min_rows` vrsticami se preskočijo.
+    - Napaka pri učenju ali registraciji ene postaje ne prekine ostalih.
+    Vrne {postaja: {"status": "ok" | "failed" | "skipped", ...}}.
+    """
+    df = load_split("train")
+    if df is None:
+        print("❌ Napaka: Učni podatki niso na voljo (zaženite stopnjo split).")
+        return {}
+    df = df.dropna(subset=[TARGET_REGRESSION, TARGET_CLASSIFICATION])
+
+    summary, shards = {}, {}
+    for station, shard in df.groupby("station", observed=True, sort=True):
+        if stations and station not in stations:
+            continue
+        if len(shard) < min_rows:
+            print(f"⏭️ {station}: le {len(shard)} učnih vrstic, preskakujem.")
+            summary[station] = {"status": "skipped", "rows": len(shard)}
+            continue
+        shards[station] = shard.reset_index(drop=True)
+    if not shards:
+        print("❌ Ni postaj z dovolj učnimi podatki.")
+        return summary
+
+    workers, blas_threads = pool_size(len(shards), workers, blas_threads)
+    params = best_params()
+    print(f"🚀 Učim modele za {len(shards)} postaj: {workers} procesov × {blas_threads} BLAS niti...")
+
+    mlflow = get_mlflow() if register else None
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_train_shard_safe, station, shard, params, blas_threads): station
+                   for station, shard in shards.items()}
+        for future in as_completed(futures):
+            station = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Npr. nenadna prekinitev procesa
+                result = {"station": station, "error": f"{type(e).__name__}: {e}"}
+            if "error" in result:
+                print(f"❌ {station}: učenje ni uspelo ({result['error']})")
+                summary[station] = {"status": "failed", "error": result["error"]}
+                continue
+
+            scores = result["scores"]
+            print(f"✅ {station}: {result['rows']} vrstic, {result['seconds']:.1f}s, "
+                  f"R2 {scores['test_score_reg']:.3f}, točnost {scores['test_score_class']:.3f}")
+            summary[station] = {"status": "ok", "rows": result["rows"], "seconds": result["seconds"], **scores}
+            if mlflow is not None:
+                try:
+                    register_shard(mlflow, result, workers, blas_threads)
+                except Exception as e:
+                    print(f"❌ {station}: registracija modelov ni uspela ({e})")
+                    summary[station] = dict(summary[station], status="failed", error=f"{type(e).__name__}: {e}")
+
+    failed = [station for station, entry in summary.items() if entry["status"] == "failed"]
+    ok = sum(entry["status"] == "ok" for entry in summary.values())
+    print(f"📌 Modeli postaj: {ok} uspešnih, {len(failed)} neuspešnih" + (f" ({', '.join(failed)})" if failed else ""))
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Učenje ločenih modelov za vsako postajo.")
+    parser.add_argument("--stations", nargs="+", default=None, help="Le navedene postaje (privzeto vse).")
+    parser.add_argument("--workers", type=int, default=None, help="Število procesov (privzeto število jeder).")
+    parser.add_argument("--blas-threads", type=int, default=None, help="Število BLAS niti na proces (privzeto jedra / procesi).")
+    parser.add_argument("--min-rows", type=int, default=MIN_SHARD_ROWS, help="Najmanjše število učnih vrstic postaje.")
+    parser.add_argument("--no-register", action="store_true", help="Ne zapisuj in ne registriraj modelov v MLflow.")
+    args = parser.parse_args()
+    summary = train_stations(args.stations, args.workers, args.blas_threads, args.min_rows, not args.no_register)
+    if any(entry["status"] == "failed" for entry in summary.values()):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
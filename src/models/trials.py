@@ -0,0 +1,161 @@
+import os
+import ast
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+
+DEFAULT_TRIAL_DIR = os.getenv("TRIAL_STORE_DIR", os.path.join(".cache", "trials"))
+DEFAULT_MAX_MB = float(os.getenv("TRIAL_STORE_MAX_MB", "1024"))
+
+# Ponovno učenje z malo novimi podatki (npr. nekaj novih ur): če se število učnih vrstic od zadnjega iskanja
+# poveča za največ ta delež, se iskanje preskoči in uporabijo prejšnji najboljši parametri
+WARM_START_MAX_GROWTH = 0.05
+
+def fold_key(train_idx, test_idx):
+    """Prstni odtis definicije pregiba (indeksi učnega in testnega dela)."""
+    digest = hashlib.sha1()
+    for indices in (train_idx, test_idx):
+        indices = np.ascontiguousarray(indices, dtype=np.int64)
+        digest.update(str(indices.size).encode())
+        digest.update(indices.tobytes())
+    return digest.hexdigest()
+
+def trial_key(data_key, fold, estimator, params):
+    """Ključ poskusa: podatki, pregib in vsi parametri modela (vključno s kandidatovimi)."""
+    all_params = dict(estimator.get_params(deep=False), **params)
+    raw = json.dumps([data_key, fold, type(estimator).__name__, sorted((k, repr(v)) for k, v in all_params.items())])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+def encode_params(params):
+    return {name: repr(value) for name, value in params.items()}
+
+def decode_params(params):
+    return {name: ast.literal_eval(value) for name, value in params.items()}
+
+class TrialStore:
+    """
+    Trajna shramba rezultatov poskusov navzkrižnega preverjanja (ena ocena pregiba za en nabor parametrov).
+    - Zapis: ocena in čas učenja (JSON) ter po izbiri naučen model pregiba (joblib).
+    - Ob preseganju `max_mb` odstrani najdlje neuporabljene zapise (LRU).
+    - Najboljši parametri vsake naloge (`best/<naloga>.json`) se ne odstranjujejo; uporabljajo se za topel začetek.
+    """
+
+    def __init__(self, directory=DEFAULT_TRIAL_DIR, max_mb=DEFAULT_MAX_MB, store_models=True):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.store_models = store_models
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _paths(self, key):
+        return os.path.join(self.directory, f"{key}.json"), os.path.join(self.directory, f"{key}.joblib")
+
+    def _load_index(self):
+        """Ob prvi uporabi prebere velikost in zadnjo uporabo vseh zapisov."""
+        if self._index is not None:
+            return
+        self._index = {}
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                key = name[:-5]
+                record_path, model_path = self._paths(key)
+                size = os.path.getsize(record_path) + (os.path.getsize(model_path) if os.path.exists(model_path) else 0)
+                self._index[key] = {"size": size, "used": os.path.getmtime(record_path)}
+
+    def get(self, key):
+        """Vrne zapis poskusa (score, seconds, ...) ali None."""
+        record_path, _ = self._paths(key)
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                self.stats["misses"] += 1
+                return None
+            try:
+                with open(record_path) as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            now = time.time()
+            self._index[key]["used"] = now
+            os.utime(record_path, (now, now))
+            self.stats["hits"] += 1
+        return record
+
+    def load_model(self, key):
+        """Naučen model pregiba ali None, če ni shranjen."""
+        import joblib
+        _, model_path = self._paths(key)
+        return joblib.load(model_path) if os.path.exists(model_path) else None
+
+    def put(self, key, score, seconds, model=None):
+        """Shrani rezultat poskusa (atomarno) in po potrebi sprosti prostor."""
+        import joblib
+        os.makedirs(self.directory, exist_ok=True)
+        record_path, model_path = self._paths(key)
+        tmp_suffix = f".{threading.get_ident()}.tmp"
+        if model is not None and self.store_models:
+            joblib.dump(model, model_path + tmp_suffix)
+            os.replace(model_path + tmp_suffix, model_path)
+        with open(record_path + tmp_suffix, "w") as f:
+            json.dump({"score": float(score), "seconds": float(seconds), "created": time.time()}, f)
+        with self._lock:
+            self._load_index()
+            os.replace(record_path + tmp_suffix, record_path)
+            size = os.path.getsize(record_path) + (os.path.getsize(model_path) if os.path.exists(model_path) else 0)
+            self._index[key] = {"size": size, "used": time.time()}
+            self._evict()
+
+    def _remove(self, key):
+        self._index.pop(key, None)
+        for path in self._paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]["size"]
+            self._remove(key)
+            self.stats["evictions"] += 1
+
+    def _best_path(self, task):
+        return os.path.join(self.directory, "best", f"{task}.json")
+
+    def save_best(self, task, params, score, n_rows, data_key):
+        """Zapiše najboljše parametre naloge po iskanju (za topel začetek naslednjega učenja)."""
+        path = self._best_path(task)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"params": encode_params(params), "score": score, "n_rows": int(n_rows), "data_key": data_key,
+                       "created": time.time()}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def load_best(self, task):
+        path = self._best_path(task)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            best = json.load(f)
+        return dict(best, params=decode_params(best["params"]))
+
+    def warm_start(self, task, n_rows, data_key=None, max_growth=WARM_START_MAX_GROWTH):
+        """
+        Prejšnji najboljši parametri naloge, če se je učni nabor od zadnjega iskanja le malo povečal
+        (med 0 in `max_growth` deleža vrstic); sicer None in iskanje se izvede v celoti.
+        Na enakih podatkih (`data_key`) topel začetek ni potreben, ker so vse ocene že v shrambi.
+        """
+        best = self.load_best(task)
+        if best is None or best["n_rows"] <= 0 or (data_key is not None and best["data_key"] == data_key):
+            return None
+        growth = (n_rows - best["n_rows"]) / best["n_rows"]
+        return best if 0 <= growth <= max_growth else None
@@ -0,0 +1,122 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+from sklearn.neural_network import MLPRegressor, MLPClassifier
+
+from src.data.transform import categorize_aqi
+from src.models.compiled import CompiledModels, export_head, forward, load_compiled
+from src.models.features import FEATURES, build_preprocessor, decode_category, encode_category
+
+def make_frame(rows, seed=0, missing=0.0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.gamma(2.0, 10.0, (rows, len(FEATURES))), columns=FEATURES)
+    df["pm10"] = df[FEATURES[0]] * 1.3 + df[FEATURES[-1]] * 0.2 + rng.normal(0, 2, rows)
+    df["category"] = categorize_aqi(df["pm10"] * 0.8)
+    for feature in FEATURES:
+        df.loc[rng.random(rows) < missing, feature] = np.nan
+    return df
+
+def fit(estimator, df, y):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return Pipeline([("preprocess", build_preprocessor()), ("MLP", estimator)]).fit(df[FEATURES], y)
+
+@pytest.fixture(scope="module")
+def train():
+    return make_frame(2000, missing=0.02)
+
+@pytest.fixture(scope="module")
+def models(train):
+    return {
+        "regression": fit(MLPRegressor(hidden_layer_sizes=(16, 8), max_iter=200, random_state=0), train, train["pm10"]),
+        "classification": fit(MLPClassifier(hidden_layer_sizes=(16,), max_iter=200, random_state=0), train,
+                              encode_category(train["category"])),
+    }
+
+@pytest.fixture(scope="module")
+def test_frame():
+    # Manjkajoče vrednosti v vseh značilkah (dopolnijo se z vrednostmi imputerja)
+    return make_frame(500, seed=1, missing=0.1)
+
+def test_regression_matches_sklearn(models, test_frame):
+    compiled = CompiledModels.from_pipelines(models)
+    outputs = compiled.predict_raw(test_frame[FEATURES])
+
+    expected = models["regression"].predict(test_frame[FEATURES])
+    np.testing.assert_allclose(outputs["regression"].ravel(), expected, rtol=1e-4, atol=1e-3)
+
+def test_classification_matches_sklearn(models, test_frame):
+    compiled = CompiledModels.from_pipelines(models)
+    proba = models["classification"].predict_proba(test_frame[FEATURES])
+
+    np.testing.assert_allclose(compiled.predict_raw(test_frame[FEATURES])["classification"], proba, atol=1e-5)
+    assert (compiled.predict(test_frame[FEATURES])["category"] == decode_category(proba)).all()
+
+@pytest.mark.parametrize("activation", ["relu", "tanh", "logistic", "identity"])
+def test_hidden_activations_match_sklearn(train, test_frame, activation):
+    model = fit(MLPRegressor(hidden_layer_sizes=(8,), activation=activation, max_iter=50, random_state=0), train, train["pm10"])
+    compiled = CompiledModels.from_pipelines({"regression": model})
+
+    np.testing.assert_allclose(compiled.predict_raw(test_frame[FEATURES])["regression"].ravel(),
+                               model.predict(test_frame[FEATURES]), rtol=1e-4, atol=1e-3)
+
+def test_feature_dropped_by_imputer(test_frame):
+    # Značilka brez vrednosti v učnih podatkih: imputer jo izpusti, izvoz ji da ničelne uteži
+    train = make_frame(500).assign(**{FEATURES[2]: np.nan})
+    model = fit(MLPRegressor(hidden_layer_sizes=(8,), max_iter=50, random_state=0), train, train["pm10"])
+    head = export_head(model)
+
+    assert not head["weights"][0][2].any()
+    compiled = CompiledModels({"regression": head})
+    np.testing.assert_allclose(compiled.predict_raw(test_frame[FEATURES])["regression"].ravel(),
+                               model.predict(test_frame[FEATURES]), rtol=1e-4, atol=1e-3)
+
+def test_single_row_and_shared_fill(models, test_frame):
+    compiled = CompiledModels.from_pipelines(models)
+    row = test_frame[FEATURES].iloc[0].tolist()
+
+    assert compiled.shared_fill is not None
+    assert compiled.predict(row)["pm10"].shape == (1,)
+    assert compiled.predict(row)["pm10"][0] == pytest.approx(models["regression"].predict(test_frame[FEATURES].head(1))[0],
+                                                             rel=1e-4, abs=1e-3)
+
+def test_npz_round_trip(models, test_frame, tmp_path):
+    compiled = CompiledModels.from_pipelines(models, {"regression": "3", "classification": "5"})
+    path = str(tmp_path / "models" / "compiled.npz")
+    compiled.save(path)
+    loaded = load_compiled(path)
+
+    assert loaded.versions == {"regression": "3", "classification": "5"}
+    assert loaded.features == FEATURES
+    assert all(w.dtype == np.float32 for head in loaded.heads.values() for w in head["weights"])
+    before, after = compiled.predict_raw(test_frame[FEATURES]), loaded.predict_raw(test_frame[FEATURES])
+    for name in before:
+        np.testing.assert_array_equal(before[name], after[name])
+
+def test_export_rejects_other_features(models):
+    with pytest.raises(ValueError):
+        export_head(models["regression"], FEATURES[::-1])
+
+def test_forward_pass():
+    head = {
+        "fill": np.zeros(2, dtype=np.float32),
+        "weights": [np.array([[1, -1], [2, 0]], dtype=np.float32), np.array([[1], [1]], dtype=np.float32)],
+        "biases": [np.array([0, 1], dtype=np.float32), np.array([0.5], dtype=np.float32)],
+        "activation": "relu",
+        "out_activation": "identity",
+    }
+    X = np.array([[1, 1], [-3, 0]], dtype=np.float32)
+    # Skrita plast: relu([3, 0]) = [3, 0] in relu([-3, 4]) = [0, 4]
+    np.testing.assert_allclose(forward(head, X), [[3.5], [4.5]])
+
+def test_forward_softmax_output():
+    head = {"weights": [np.eye(3, dtype=np.float32)], "biases": [np.zeros(3, dtype=np.float32)],
+            "activation": "relu", "out_activation": "softmax"}
+    output = forward(head, np.array([[0, 0, 0], [1000, 0, 0]], dtype=np.float32))
+
+    np.testing.assert_allclose(output.sum(axis=1), 1.0, rtol=1e-6)
+    np.testing.assert_allclose(output[0], 1 / 3, rtol=1e-6)
+    assert output[1].argmax() == 0 and np.isfinite(output).all()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.expectations import AQI_EXPECTATIONS, check_expectation, validate
+from src.data.transform import categorize_aqi
+
+def frame(pm10, eu_aqi):
+    return pd.DataFrame({
+        "date": pd.date_range("2025-01-01", periods=len(pm10), freq="h", tz="UTC"),
+        "pm10": np.asarray(pm10, dtype=np.float32),
+        "category": categorize_aqi(eu_aqi),
+    })
+
+def expectation(expectation_type, **kwargs):
+    return {"expectation_type": expectation_type, "kwargs": kwargs}
+
+def test_valid_data_passes_all_expectations():
+    summary = validate(frame([10, 20, 30], [10, 50, 120]))
+
+    assert summary["success"]
+    assert summary["statistics"]["evaluated_expectations"] == len(AQI_EXPECTATIONS)
+    assert summary["statistics"]["success_percent"] == 100.0
+    assert summary["meta"]["element_count"] == 3
+
+def test_out_of_range_values_fail():
+    result = check_expectation(frame([10, -1, 600], [10, 10, 10]),
+                               expectation("expect_column_values_to_be_between", column="pm10", min_value=0, max_value=500))
+
+    assert not result["success"]
+    assert result["result"]["unexpected_count"] == 2
+    assert result["result"]["partial_unexpected_list"] == [-1.0, 600.0]
+
+def test_between_ignores_missing_values():
+    result = check_expectation(frame([10, np.nan], [10, 10]),
+                               expectation("expect_column_values_to_be_between", column="pm10", min_value=0, max_value=500))
+
+    assert result["success"]
+    assert result["result"]["missing_count"] == 1
+    assert result["result"]["unexpected_count"] == 0
+
+def test_not_null_counts_missing_categories():
+    result = check_expectation(frame([10, 10], [10, np.nan]), expectation("expect_column_values_to_not_be_null", column="category"))
+
+    assert not result["success"]
+    assert result["result"]["unexpected_count"] == 1
+    assert result["result"]["unexpected_percent"] == 50.0
+
+def test_mostly_allows_a_fraction_of_failures():
+    df = frame([10, 10, 10, 600], [10, 10, 10, 10])
+    config = expectation("expect_column_values_to_be_between", column="pm10", max_value=500, mostly=0.75)
+    assert check_expectation(df, config)["success"]
+    config["kwargs"]["mostly"] = 0.8
+    assert not check_expectation(df, config)["success"]
+
+def test_in_set_for_object_and_categorical_columns():
+    config = expectation("expect_column_values_to_be_in_set", column="category", value_set=["good", "fair"])
+    assert check_expectation(frame([1, 1], [10, 30]), config)["success"]
+    assert not check_expectation(frame([1, 1], [10, 90]), config)["success"]
+
+    df = pd.DataFrame({"category": ["good", "bad", None]})
+    result = check_expectation(df, config)
+    assert result["result"]["unexpected_count"] == 1
+    assert result["result"]["partial_unexpected_list"] == ["bad"]
+
+def test_missing_column_fails():
+    assert not check_expectation(pd.DataFrame({"pm10": [1.0]}), expectation("expect_column_to_exist", column="date"))["success"]
+    result = check_expectation(pd.DataFrame({"date": [1]}), expectation("expect_column_values_to_not_be_null", column="pm10"))
+    assert not result["success"]
+
+def test_unsupported_expectation_raises():
+    with pytest.raises(ValueError):
+        check_expectation(frame([1], [1]), expectation("expect_column_mean_to_be_between", column="pm10"))
+
+def test_summary_counts_failures():
+    summary = validate(frame([10, 900], [10, 10]))
+
+    assert not summary["success"]
+    assert summary["statistics"]["unsuccessful_expectations"] == 1
+    failed = [result["expectation_config"]["expectation_type"] for result in summary["results"] if not result["success"]]
+    assert failed == ["expect_column_values_to_be_between"]
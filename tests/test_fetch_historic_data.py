@@ -0,0 +1,87 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from src.data import fetch_historic_data
+from src.data.fetch_historic_data import DOWNSTREAM_STAGES, Checkpoint, backfill, make_windows
+from src.data.stations import get_stations
+from src.data.watermark import load_watermark, save_watermark
+
+class Killed(BaseException):
+    """Prekinitev procesa (ni Exception, zato je backfill ne ujame kot napako okna)."""
+
+LATEST = "2025-03-31T23:00:00+00:00"
+
+def fake_fetch(calls, kill_after=None, pm10=1.0):
+    def fetch(url, params, columns, stations, max_workers=1, batch_size=1):
+        if kill_after is not None and len(calls) >= kill_after:
+            raise Killed()
+        calls.append(params["start_date"])
+        dates = pd.date_range(params["start_date"], params["end_date"] + " 23:00", freq="h", tz="UTC")
+        return pd.concat([pd.DataFrame({"station": station.name, "date": dates, "pm10": pm10}) for station in stations])
+    return fetch
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for stage in DOWNSTREAM_STAGES:
+        save_watermark(stage, {"stations": {"maribor": LATEST}, "fingerprint": "x"})
+    return tmp_path
+
+def run(monkeypatch, fetch, checkpoint_path=fetch_historic_data.CHECKPOINT_PATH):
+    monkeypatch.setattr(fetch_historic_data, "fetch_stations", fetch)
+    return backfill(date(2025, 1, 1), date(2025, 1, 20), get_stations(["maribor"]), datasets=("aqi",), window_days=5,
+                    max_workers=1, requests_per_second=0, checkpoint_path=checkpoint_path)
+
+def marks():
+    return {stage: load_watermark(stage)["stations"]["maribor"] for stage in DOWNSTREAM_STAGES}
+
+def test_make_windows_cover_interval():
+    assert make_windows(date(2025, 1, 1), date(2025, 1, 12), 5) == [
+        ("2025-01-01", "2025-01-05"), ("2025-01-06", "2025-01-10"), ("2025-01-11", "2025-01-12")]
+
+def test_killed_run_rewinds_on_resume(workdir, monkeypatch):
+    calls = []
+    with pytest.raises(Killed):
+        run(monkeypatch, fake_fetch(calls, kill_after=2))
+
+    # Dve okni sta zaključeni, nadaljnje stopnje pa še niso premaknjene nazaj
+    checkpoint = Checkpoint()
+    assert len(checkpoint.done) == 2
+    assert checkpoint.rewind_from == "2025-01-01"
+    assert set(marks().values()) == {LATEST}
+
+    run(monkeypatch, fake_fetch(calls))
+
+    assert calls == ["2025-01-01", "2025-01-06", "2025-01-11", "2025-01-16"]
+    assert set(marks().values()) == {"2024-12-31T23:00:00+00:00"}
+    assert Checkpoint().rewind_from is None
+
+def test_resume_without_new_windows_still_rewinds(workdir, monkeypatch):
+    calls = []
+
+    def killed_rewind(stage, timestamp):
+        raise Killed()
+
+    # Proces se prekine po zapisu vseh oken, pred premikom vodnih oznak
+    rewind = fetch_historic_data.rewind_watermark
+    monkeypatch.setattr(fetch_historic_data, "rewind_watermark", killed_rewind)
+    with pytest.raises(Killed):
+        run(monkeypatch, fake_fetch(calls))
+    monkeypatch.setattr(fetch_historic_data, "rewind_watermark", rewind)
+
+    added = run(monkeypatch, fake_fetch(calls))
+
+    assert len(calls) == 4 and added == {"aqi": 0}
+    assert set(marks().values()) == {"2024-12-31T23:00:00+00:00"}
+
+def test_replaced_rows_rewind_downstream(workdir, monkeypatch):
+    run(monkeypatch, fake_fetch([]))
+    for stage in DOWNSTREAM_STAGES:
+        save_watermark(stage, {"stations": {"maribor": LATEST}, "fingerprint": "x"})
+    # Popravljene vrednosti obstoječih ur: ni novih ključev, ponovna obdelava pa je potrebna
+    added = run(monkeypatch, fake_fetch([], pm10=2.0), checkpoint_path="other.json")
+
+    assert added == {"aqi": 0}
+    assert set(marks().values()) == {"2024-12-31T23:00:00+00:00"}
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.merge_data import JOIN_KEYS, sort_merge_join
+
+def stream(stations, start, hours, column, seed):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=hours, freq="h", tz="UTC")
+    df = pd.concat([pd.DataFrame({"station": station, "date": dates}) for station in stations])
+    # Vrzeli v posameznih urah, da se ključa tokov ne ujemata povsem
+    df = df[rng.random(len(df)) > 0.1]
+    df[column] = rng.normal(size=len(df))
+    return df.sort_values(["date", "station"], ignore_index=True)
+
+def chunks(df, size):
+    return (df.iloc[i:i + size].reset_index(drop=True) for i in range(0, len(df), size))
+
+def expected(left, right):
+    return pd.merge(left, right, on=JOIN_KEYS, how="inner").sort_values(JOIN_KEYS, ignore_index=True)
+
+def joined(left, right, left_size, right_size):
+    parts = list(sort_merge_join(chunks(left, left_size), chunks(right, right_size)))
+    if not parts:
+        return pd.DataFrame(columns=expected(left, right).columns)
+    return pd.concat(parts, ignore_index=True).sort_values(JOIN_KEYS, ignore_index=True)
+
+@pytest.mark.parametrize("left_size,right_size", [(1, 1), (1, 50), (7, 3), (50, 1), (64, 64), (10_000, 10_000)])
+def test_matches_pd_merge_for_chunk_sizes(left_size, right_size):
+    left = stream(["celje", "maribor", "koper"], "2025-01-01", 48, "pm10", 0)
+    right = stream(["celje", "maribor", "koper"], "2025-01-01", 48, "temperature_2m", 1)
+
+    pd.testing.assert_frame_equal(joined(left, right, left_size, right_size), expected(left, right))
+
+@pytest.mark.parametrize("left_size,right_size", [(1, 1), (5, 100), (100, 5)])
+def test_one_stream_much_longer(left_size, right_size):
+    # Desni tok se začne kasneje in konča veliko prej; levi se nadaljuje po koncu desnega
+    left = stream(["maribor", "celje"], "2025-01-01", 24 * 8, "pm10", 2)
+    right = stream(["maribor", "celje"], "2025-01-03", 12, "temperature_2m", 3)
+
+    result = joined(left, right, left_size, right_size)
+    pd.testing.assert_frame_equal(result, expected(left, right))
+    pd.testing.assert_frame_equal(joined(right, left, right_size, left_size),
+                                  expected(right, left))
+
+def test_no_output_for_disjoint_or_empty_streams():
+    left = stream(["maribor"], "2025-01-01", 24, "pm10", 4)
+    right = stream(["maribor"], "2025-02-01", 24, "temperature_2m", 5)
+
+    assert list(sort_merge_join(chunks(left, 5), chunks(right, 5))) == []
+    assert list(sort_merge_join(chunks(left, 5), iter([]))) == []
+    assert list(sort_merge_join(iter([]), chunks(right, 5))) == []
+
+def test_chunks_are_time_ordered_and_unique():
+    left = stream(["maribor", "celje"], "2025-01-01", 200, "pm10", 6)
+    right = stream(["maribor", "celje"], "2025-01-01", 200, "temperature_2m", 7)
+
+    parts = list(sort_merge_join(chunks(left, 13), chunks(right, 29)))
+    assert all(a["date"].max() <= b["date"].min() for a, b in zip(parts, parts[1:]))
+    merged = pd.concat(parts, ignore_index=True)
+    assert not merged.duplicated(subset=JOIN_KEYS).any()
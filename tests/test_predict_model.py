@@ -0,0 +1,29 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.neural_network import MLPClassifier
+
+from src.data.transform import AQI_CATEGORIES, categorize_aqi
+from src.models.features import FEATURES, build_preprocessor, encode_category, predict_category
+from src.models.predict_model import build_prediction_documents
+
+def test_prediction_documents_store_category_names():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.gamma(2.0, 10.0, (300, len(FEATURES))), columns=FEATURES)
+    df["category"] = categorize_aqi(df[FEATURES[0]] * 2)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model = Pipeline([("preprocess", build_preprocessor()),
+                          ("MLP", MLPClassifier(hidden_layer_sizes=(8,), max_iter=50, random_state=0))])
+        model.fit(df[FEATURES], encode_category(df["category"]))
+
+    categories = predict_category(model, df[FEATURES])
+    keys = pd.DataFrame({"station": "maribor", "date": pd.date_range("2025-01-01", periods=len(df), freq="h", tz="UTC")})
+    documents = build_prediction_documents(df[FEATURES], np.zeros(len(df)), categories, "1", "2", keys=keys)
+
+    assert all(doc["predicted_category"] in AQI_CATEGORIES for doc in documents)
+    assert all(isinstance(doc["predicted_category"], str) for doc in documents)
+    assert documents[0]["station"] == "maribor"
+    assert documents[0]["target_time"] == pd.Timestamp("2025-01-01").to_pydatetime()
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.store import append, read
+from src.data.process_data import process_data
+from src.data.watermark import load_watermark, rewind_watermark
+
+@pytest.fixture
+def merged(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dates = pd.date_range("2025-01-01", periods=24 * 20, freq="h", tz="UTC")
+    pm10 = np.arange(len(dates), dtype=float)
+    pm10[::7] = np.nan
+    return pd.DataFrame({"station": "maribor", "date": dates, "eu_aqi": 30.0, "pm10": pm10})
+
+def sketch_count(column):
+    return sum(load_watermark("process")["sketches"][column]["weights"])
+
+def test_process_fills_missing_and_categorizes(merged):
+    append("merged", merged)
+    process_data("merged", "processed")
+
+    df = read("processed")
+    assert len(df) == len(merged)
+    assert not df["pm10"].isna().any()
+    assert df["pm10"].dtype == np.float32
+    assert set(df["category"]) == {"fair"}
+
+def test_revision_window_is_not_counted_twice(merged):
+    append("merged", merged.iloc[:240])
+    process_data("merged", "processed")
+    append("merged", merged.iloc[240:])
+    process_data("merged", "processed")
+
+    assert sketch_count("eu_aqi") == len(merged)
+    assert sketch_count("pm10") == merged["pm10"].notna().sum()
+
+def test_rewind_rebuilds_sketches(merged):
+    append("merged", merged)
+    process_data("merged", "processed")
+    before = load_watermark("process")["sketches"]
+
+    # Zapolnjevanje zgodovine premakne oznake nazaj; ponovno obdelane ure se ne štejejo dvakrat
+    append("merged", merged.iloc[100:200].assign(eu_aqi=35.0))
+    rewind_watermark("process", merged["date"].iloc[100])
+    assert "sketches" not in load_watermark("process")
+    process_data("merged", "processed")
+
+    assert sketch_count("eu_aqi") == len(merged)
+    assert sketch_count("pm10") == merged["pm10"].notna().sum()
+    assert load_watermark("process")["sketches"]["pm10"]["means"] == pytest.approx(before["pm10"]["means"])
+    assert (read("processed")["eu_aqi"].iloc[100:200] == 35.0).all()
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.data.fetch_data import AQI_URL, WEATHER_URL, ENDPOINT_TTLS, ARCHIVE_OPEN_TTL, FORECAST_OPEN_TTL
+from src.data.response_cache import ResponseCache
+
+def day(offset):
+    return (datetime.utcnow() + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+def test_endpoint_ttls_depend_on_kind_and_window(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttls=ENDPOINT_TTLS)
+    settled = {"start_date": day(-10), "end_date": day(-1)}
+    today = {"start_date": day(0), "end_date": day(0)}
+
+    assert cache.ttl(WEATHER_URL, settled) is None
+    assert cache.ttl(AQI_URL, settled) is None
+    assert cache.ttl(WEATHER_URL, today) == ARCHIVE_OPEN_TTL
+    assert cache.ttl(AQI_URL, today) == FORECAST_OPEN_TTL
+    assert cache.ttl(AQI_URL, {"past_days": 1, "forecast_days": 1}) == FORECAST_OPEN_TTL
+    assert FORECAST_OPEN_TTL < ARCHIVE_OPEN_TTL
+
+def test_unknown_endpoint_uses_default(tmp_path):
+    cache = ResponseCache(str(tmp_path), default_ttl=60)
+    assert cache.ttl("https://example.com", {"end_date": day(0)}) == 60
+    assert cache.ttl("https://example.com", {"end_date": day(-1)}) is None
+
+def test_expired_entry_is_a_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put("a", np.ones((1, 3), dtype=np.float32), 0, 3600, ttl=-1)
+    cache.put("b", np.ones((1, 3), dtype=np.float32), 0, 3600, ttl=None)
+
+    assert cache.get("a") is None and cache.stats["expired"] == 1
+    assert cache.get("b") is not None
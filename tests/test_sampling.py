@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.sampling import reservoir_sample, sample_store
+from src.data.store import append
+
+def frame(rows):
+    return pd.DataFrame({"row": np.arange(rows)})
+
+def chunks(df, size):
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+def sequential_reservoir(chunk_list, k, seed):
+    """Zaporedni algoritem R z enakim zaporedjem naključnih števil kot vektorizirana različica."""
+    rng = np.random.default_rng(seed)
+    reservoir, seen = [], 0
+    for chunk in chunk_list:
+        rows = chunk["row"].tolist()
+        fill = min(max(k - len(reservoir), 0), len(rows))
+        reservoir.extend(rows[:fill])
+        draws = rng.random(len(rows) - fill)
+        for offset, draw in enumerate(draws):
+            position = seen + fill + offset
+            slot = int(draw * (position + 1))
+            if slot < k:
+                reservoir[slot] = rows[fill + offset]
+        seen += len(rows)
+    return reservoir
+
+@pytest.mark.parametrize("k", [10, 100])
+def test_k_not_smaller_than_rows_returns_everything(k):
+    sample = reservoir_sample(chunks(frame(10), 3), k)
+    assert sample["row"].tolist() == list(range(10))
+
+def test_repeated_slot_replacements_match_sequential_algorithm():
+    # Majhen rezervoar in velik kos: isto mesto se v enem kosu zamenja večkrat
+    df = frame(5000)
+    for size in (5000, 333, 1):
+        sample = reservoir_sample(chunks(df, size), 3, seed=7)
+        assert sample["row"].tolist() == sequential_reservoir(list(chunks(df, size)), 3, seed=7)
+
+def test_same_seed_same_sample():
+    df = frame(1000)
+    first = reservoir_sample(chunks(df, 64), 50, seed=1)
+
+    pd.testing.assert_frame_equal(first, reservoir_sample(chunks(df, 64), 50, seed=1))
+    assert not first.equals(reservoir_sample(chunks(df, 64), 50, seed=2))
+    assert len(first) == 50 and first["row"].is_unique
+
+def test_sample_is_uniform():
+    counts = np.zeros(20)
+    for seed in range(400):
+        counts[reservoir_sample(chunks(frame(20), 6), 5, seed=seed)["row"].to_numpy()] += 1
+    # Vsaka vrstica je v vzorcu z verjetnostjo k / n = 0.25
+    np.testing.assert_allclose(counts / 400, 0.25, atol=0.07)
+
+def test_empty_stream():
+    assert reservoir_sample(iter([]), 5).empty
+
+@pytest.fixture
+def store(tmp_path):
+    dates = pd.date_range("2025-01-01", "2025-02-28 23:00", freq="h", tz="UTC")
+    path = str(tmp_path / "store")
+    append(path, pd.DataFrame({"station": "maribor", "date": dates, "pm10": np.arange(len(dates), dtype=float)}))
+    return path
+
+def test_sample_store_reservoir_respects_interval(store):
+    sample = sample_store(store, 100, start="2025-02-01", end="2025-02-15")
+
+    assert len(sample) == 100
+    assert sample["date"].min() >= pd.Timestamp("2025-02-01", tz="UTC")
+    assert sample["date"].max() < pd.Timestamp("2025-02-15", tz="UTC")
+
+def test_sample_store_time_covers_every_day(store):
+    sample = sample_store(store, 24 * 59 // 4, method="time")
+
+    days = sample["date"].dt.floor("D")
+    assert days.nunique() == 59
+    assert days.value_counts().between(5, 7).all()
+    assert sample_store(store, 24 * 59 // 4, method="time", seed=3).equals(sample_store(store, 24 * 59 // 4, method="time", seed=3))
+
+def test_sample_store_unknown_method(store):
+    with pytest.raises(ValueError):
+        sample_store(store, 10, method="stratified")
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.model_selection import KFold, ParameterGrid, cross_val_score
+
+from src.models import search
+from src.models.search import run_searches
+from src.models.trials import TrialStore
+
+ALPHAS = [0.01, 0.1, 1.0, 10.0, 100.0, 300.0, 1000.0, 3000.0, 10000.0]
+CS = [0.001, 0.01, 0.1, 1.0, 10.0]
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(270, 4))
+    y_reg = X @ np.array([3.0, -2.0, 1.0, 0.5]) + rng.normal(0, 0.1, len(X))
+    y_class = (X[:, 0] + X[:, 1] > 0).astype(int)
+    return X, y_reg, y_class
+
+def tasks(data):
+    X, y_reg, y_class = data
+    return {
+        "reg": {"estimator": Ridge(), "param_grid": {"alpha": ALPHAS}, "y": y_reg},
+        "class": {"estimator": LogisticRegression(), "param_grid": {"C": CS}, "y": y_class},
+    }
+
+def exhaustive_best(task, X, cv=3):
+    grid = list(ParameterGrid(task["param_grid"]))
+    scores = [cross_val_score(task["estimator"].set_params(**params), X, task["y"], cv=KFold(cv)).mean() for params in grid]
+    return grid[int(np.argmax(scores))], max(scores)
+
+@pytest.fixture
+def fits(monkeypatch):
+    """Zabeleži (vrsta modela, število učnih vrstic) vsakega učenja."""
+    calls = []
+    fit_candidate = search._fit_candidate
+
+    def counting(estimator, params, X, y, train_idx, test_idx, return_model=False):
+        calls.append((type(estimator).__name__, len(train_idx)))
+        return fit_candidate(estimator, params, X, y, train_idx, test_idx, return_model)
+
+    monkeypatch.setattr(search, "_fit_candidate", counting)
+    return calls
+
+def test_exhaustive_search_matches_cross_val_score(data, fits):
+    X = data[0]
+    result = run_searches(tasks(data), X, n_jobs=1, halving=False, verbose=False)
+
+    for name, task in tasks(data).items():
+        best_params, best_score = exhaustive_best(task, X)
+        assert result[name]["best_params"] == best_params
+        assert result[name]["best_score"] == pytest.approx(best_score)
+    assert len(fits) == 3 * (len(ALPHAS) + len(CS))
+
+def test_halving_respects_budget_and_finds_best(data, fits):
+    X = data[0]
+    result = run_searches(tasks(data), X, n_jobs=1, factor=3, verbose=False, random_state=0)
+
+    # 9 kandidatov → 2 kroga: vsi kandidati na tretjini vrstic pregiba, nato 3 najboljši na vseh
+    n_train = len(X) * 2 // 3
+    ridge = [n for estimator, n in fits if estimator == "Ridge"]
+    assert ridge == [n_train // 3] * (len(ALPHAS) * 3) + [n_train] * (3 * 3)
+    logistic = [n for estimator, n in fits if estimator == "LogisticRegression"]
+    assert len(logistic) == len(CS) * 3 + 2 * 3
+    # Skupaj manj učnih vrstic kot izčrpno iskanje (vsi kandidati na vseh vrsticah pregiba)
+    assert sum(n for _, n in fits) < 3 * (len(ALPHAS) + len(CS)) * n_train
+
+    for name, task in tasks(data).items():
+        assert result[name]["best_params"] == exhaustive_best(task, X)[0]
+        assert result[name]["best_estimator"].get_params() == task["estimator"].set_params(**result[name]["best_params"]).get_params()
+    rounds = [r["round"] for r in result["reg"]["results"]]
+    assert rounds.count(0) == len(ALPHAS) and rounds.count(1) == 3
+
+def test_trial_store_reuses_fold_scores(data, fits, tmp_path):
+    X = data[0]
+    store = TrialStore(str(tmp_path), store_models=False)
+    first = run_searches(tasks(data), X, n_jobs=1, verbose=False, store=store, data_key="v1")
+    n_fits = len(fits)
+
+    second = run_searches(tasks(data), X, n_jobs=1, verbose=False, store=store, data_key="v1")
+    assert len(fits) == n_fits
+    for name in first:
+        assert second[name]["best_params"] == first[name]["best_params"]
+        assert all(r["cached_folds"] == 3 for r in second[name]["results"])
+
+    # Drugi podatki → nova učenja
+    run_searches(tasks(data), X, n_jobs=1, verbose=False, store=store, data_key="v2")
+    assert len(fits) == 2 * n_fits
+
+def test_warm_start_skips_search(data, fits):
+    X = data[0]
+    warm = {"reg": {"params": {"alpha": 1.0}, "score": 0.5}}
+    result = run_searches(tasks(data), X, n_jobs=1, verbose=False, warm_start=warm)
+
+    assert result["reg"]["best_params"] == {"alpha": 1.0}
+    assert all(estimator != "Ridge" for estimator, _ in fits)
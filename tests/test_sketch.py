@@ -0,0 +1,48 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.data.sketch import TDigest
+
+def test_median_of_small_sample_is_exact():
+    assert TDigest().update([1.0, 2.0, 3.0, 4.0, 5.0]).median() == pytest.approx(3.0)
+
+def test_median_close_to_numpy_for_skewed_data():
+    values = np.random.default_rng(0).gamma(2.0, 10.0, 200_000)
+    sketch = TDigest()
+    for batch in np.array_split(values, 50):
+        sketch.update(batch)
+
+    assert sketch.count == len(values)
+    assert sketch.median() == pytest.approx(np.median(values), rel=0.01)
+    assert sketch.quantile(0.99) == pytest.approx(np.quantile(values, 0.99), rel=0.02)
+
+def test_centroids_are_bounded_by_compression():
+    sketch = TDigest(compression=100).update(np.random.default_rng(1).normal(size=100_000))
+    assert sketch.means.size <= 100
+
+def test_nan_values_are_ignored():
+    sketch = TDigest().update([np.nan, 1.0, np.nan, 3.0])
+    assert sketch.count == 2
+    assert sketch.median() == pytest.approx(2.0)
+
+def test_empty_sketch_median_is_nan():
+    assert np.isnan(TDigest().median())
+    assert np.isnan(TDigest().update([np.nan]).median())
+
+def test_merge_matches_single_sketch():
+    rng = np.random.default_rng(2)
+    a, b = rng.uniform(0, 100, 50_000), rng.uniform(50, 150, 50_000)
+    merged = TDigest().update(a).merge(TDigest().update(b))
+
+    assert merged.count == 100_000
+    assert merged.median() == pytest.approx(np.median(np.concatenate([a, b])), rel=0.01)
+
+def test_serialization_round_trip():
+    sketch = TDigest().update(np.random.default_rng(3).exponential(5.0, 10_000))
+    restored = TDigest.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+    assert restored.median() == sketch.median()
+    assert restored.count == sketch.count
+    assert np.isnan(TDigest.from_dict(TDigest().to_dict()).median())
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import TimeSeriesSplit
+
+from src.data.splits import (add_folds, boundary_row, build_manifest, cv_splits, load_rows, load_split, make_folds,
+                             save_manifest)
+from src.data.store import append, read
+
+@pytest.fixture
+def store(tmp_path):
+    dates = pd.date_range("2025-01-01", "2025-03-31 23:00", freq="h", tz="UTC")
+    frames = [pd.DataFrame({"station": station, "date": dates, "pm10": np.arange(len(dates), dtype=float)})
+              for station in ("maribor", "celje")]
+    path = str(tmp_path / "store")
+    append(path, pd.concat(frames))
+    return path
+
+@pytest.mark.parametrize("boundary", ["2024-12-01", "2025-01-01", "2025-01-01 01:00", "2025-02-01", "2025-02-14 13:00",
+                                      "2025-03-31 23:00", "2025-04-01", "2025-06-01"])
+def test_boundary_row_matches_direct_count(store, boundary):
+    df = read(store)
+    assert boundary_row(store, boundary) == int((df["date"] < pd.Timestamp(boundary, tz="UTC")).sum())
+
+def test_manifest_splits_match_direct_slice(store, tmp_path):
+    boundary = "2025-02-14 13:00"
+    manifest = build_manifest(store, boundary)
+    manifest_path = str(tmp_path / "split.json")
+    save_manifest(manifest, manifest_path)
+    df = read(store)
+    split_row = int((df["date"] < pd.Timestamp(boundary, tz="UTC")).sum())
+
+    assert manifest["splits"]["train"]["rows"] == [0, split_row]
+    assert manifest["splits"]["test"]["rows"] == [split_row, len(df)]
+    train, test = load_split("train", manifest_path=manifest_path), load_split("test", manifest_path=manifest_path)
+    pd.testing.assert_frame_equal(train, df.iloc[:split_row].reset_index(drop=True))
+    pd.testing.assert_frame_equal(test, df.iloc[split_row:].reset_index(drop=True))
+    # Obe postaji ob uri meje sta v testnem delu
+    assert train["date"].max() < pd.Timestamp(boundary, tz="UTC") <= test["date"].min()
+    assert (test["date"] == pd.Timestamp(boundary, tz="UTC")).sum() == 2
+
+def test_changed_store_falls_back_to_time_bounds(store, tmp_path):
+    manifest_path = str(tmp_path / "split.json")
+    save_manifest(build_manifest(store, "2025-02-01"), manifest_path)
+    append(store, pd.DataFrame({"station": "koper", "date": pd.to_datetime(["2025-01-15", "2025-02-15"], utc=True), "pm10": 1.0}))
+
+    train = load_split("train", manifest_path=manifest_path)
+    assert (train["station"] == "koper").sum() == 1
+    assert train["date"].max() < pd.Timestamp("2025-02-01", tz="UTC")
+
+@pytest.mark.parametrize("n_rows,n_folds,gap,test_size", [(100, 5, 0, None), (101, 3, 2, None), (60, 4, 0, 10), (12, 5, 0, None)])
+def test_expanding_folds_match_time_series_split(n_rows, n_folds, gap, test_size):
+    folds = make_folds(n_rows, n_folds, gap=gap, test_size=test_size)
+    expected = TimeSeriesSplit(n_splits=n_folds, gap=gap, test_size=test_size).split(np.zeros(n_rows))
+
+    for fold, (train_idx, test_idx) in zip(folds, expected):
+        assert np.array_equal(np.arange(*fold["train"]), train_idx)
+        assert np.array_equal(np.arange(*fold["test"]), test_idx)
+
+@pytest.mark.parametrize("mode", ["expanding", "rolling"])
+def test_folds_are_non_empty_ordered_and_disjoint(mode):
+    folds = make_folds(103, 4, mode=mode, gap=3)
+
+    tests = [range(*fold["test"]) for fold in folds]
+    assert all(len(fold_range) > 0 for fold_range in tests)
+    assert all(a.stop <= b.start for a, b in zip(tests, tests[1:]))
+    assert tests[-1].stop == 103
+    for fold in folds:
+        train_start, train_end = fold["train"]
+        assert 0 <= train_start < train_end <= fold["test"][0] - 3
+        if mode == "rolling":
+            assert train_end - train_start <= 2 * (103 // 5)
+
+def test_rolling_folds_match_max_train_size():
+    folds = make_folds(120, 3, mode="rolling", window=25)
+    expected = TimeSeriesSplit(n_splits=3, max_train_size=25).split(np.zeros(120))
+    for fold, (train_idx, test_idx) in zip(folds, expected):
+        assert np.array_equal(np.arange(*fold["train"]), train_idx)
+        assert np.array_equal(np.arange(*fold["test"]), test_idx)
+
+def test_invalid_folds():
+    # Prazen testni del ali prazen učni del
+    with pytest.raises(ValueError):
+        make_folds(5, 5)
+    with pytest.raises(ValueError):
+        make_folds(12, 5, gap=2)
+    with pytest.raises(ValueError):
+        make_folds(100, 3, mode="sliding")
+
+def test_manifest_folds_match_direct_slice(store):
+    manifest = add_folds(build_manifest(store, "2025-03-01"), n_folds=3, split="train")
+    df = read(store)
+    train = df.iloc[:manifest["splits"]["train"]["rows"][1]].reset_index(drop=True)
+
+    for fold, (train_idx, test_idx) in zip(manifest["folds"]["folds"], cv_splits(manifest)):
+        pd.testing.assert_frame_equal(load_rows(fold["train"], manifest=manifest), train.iloc[train_idx].reset_index(drop=True))
+        pd.testing.assert_frame_equal(load_rows(fold["test"], manifest=manifest), train.iloc[test_idx].reset_index(drop=True))
+
+    test_manifest = add_folds(build_manifest(store, "2025-03-01"), n_folds=2, split="test")
+    offset = test_manifest["splits"]["test"]["rows"][0]
+    assert all(fold["train"][0] >= offset for fold in test_manifest["folds"]["folds"])
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data.store import append, read, read_rows, iter_chunks, list_partitions, partition_cache
+
+def hourly(station, start, periods, pm10=1.0):
+    dates = pd.date_range(start, periods=periods, freq="h", tz="UTC")
+    return pd.DataFrame({"station": station, "date": dates, "pm10": np.full(periods, pm10)})
+
+def test_append_partitions_by_month(tmp_path):
+    store = str(tmp_path / "store")
+    added = append(store, hourly("maribor", "2025-01-31 22:00", 4))
+
+    assert added == 4
+    assert [label for label, _ in list_partitions(store)] == ["month=2025-01", "month=2025-02"]
+    assert len(read(store)) == 4
+
+def test_append_replaces_existing_keys(tmp_path):
+    store = str(tmp_path / "store")
+    append(store, hourly("maribor", "2025-01-01", 3, pm10=1.0))
+
+    # Dve uri že obstajata (nadomestita se), ena je nova
+    added = append(store, hourly("maribor", "2025-01-01 01:00", 3, pm10=2.0))
+
+    df = read(store)
+    assert added == 1
+    assert len(df) == 4
+    assert df["pm10"].tolist() == [1.0, 2.0, 2.0, 2.0]
+
+def test_append_deduplicates_within_batch(tmp_path):
+    store = str(tmp_path / "store")
+    batch = pd.concat([hourly("maribor", "2025-01-01", 2, pm10=1.0), hourly("maribor", "2025-01-01", 2, pm10=3.0)])
+
+    assert append(store, batch) == 2
+    assert read(store)["pm10"].tolist() == [3.0, 3.0]
+
+def test_append_same_hour_for_different_stations(tmp_path):
+    store = str(tmp_path / "store")
+    append(store, hourly("maribor", "2025-01-01", 2))
+
+    assert append(store, hourly("celje", "2025-01-01", 2)) == 2
+    df = read(store)
+    assert len(df) == 4
+    assert df["date"].is_monotonic_increasing
+
+def test_append_unchanged_partition_is_not_rewritten(tmp_path):
+    store = str(tmp_path / "store")
+    append(store, hourly("maribor", "2025-01-01", 24))
+    (_, path), = list_partitions(store)
+    mtime = os.stat(path).st_mtime_ns
+
+    assert append(store, hourly("maribor", "2025-01-01", 24)) == 0
+    assert os.stat(path).st_mtime_ns == mtime
+
+def test_read_filters_interval_and_stations(tmp_path):
+    store = str(tmp_path / "store")
+    append(store, pd.concat([hourly("maribor", "2025-01-01", 48), hourly("celje", "2025-01-01", 48)]))
+
+    df = read(store, start="2025-01-01 12:00", end="2025-01-02", stations=["celje"])
+    assert set(df["station"]) == {"celje"}
+    assert df["date"].min() == pd.Timestamp("2025-01-01 12:00", tz="UTC")
+    assert df["date"].max() == pd.Timestamp("2025-01-01 23:00", tz="UTC")
+
+def test_iter_chunks_matches_read(tmp_path):
+    store = str(tmp_path / "store")
+    append(store, hourly("maribor", "2025-01-15", 24 * 40))
+
+    chunks = list(iter_chunks(store, 100, start="2025-02-01"))
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), read(store, start="2025-02-01"))
+
+def test_read_empty_store(tmp_path):
+    df = read(str(tmp_path / "missing"))
+    assert df.empty
+    assert list(df.columns) == ["station", "date"]
+
+def test_cached_partitions_are_not_changed_by_callers(tmp_path):
+    store = str(tmp_path / "store")
+    with partition_cache():
+        # Ena particija: branje bi brez kopije vrnilo pogled na DataFrame v cache-u
+        append(store, pd.concat([hourly("maribor", "2025-01-01", 24, pm10=1.0), hourly("celje", "2025-01-01", 24, pm10=2.0)]))
+        expected = read(store).copy()
+
+        for df in (read(store), read(store, columns=["pm10"]), read_rows(store, 0, 48), read_rows(store, 5, 20)):
+            df["pm10"].values[:] = np.nan
+            df.iloc[0, df.columns.get_loc("station")] = "x"
+            df.sort_values("date", ascending=False, inplace=True)
+            df["pm10"] = -1.0
+
+        pd.testing.assert_frame_equal(read(store), expected)
+        pd.testing.assert_frame_equal(read_rows(store, 5, 20), expected.iloc[5:20].reset_index(drop=True))
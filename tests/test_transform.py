@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from src.data.transform import AQI_CATEGORIES, categorize_aqi, fill_missing
+
+def test_categorize_aqi_bins_include_upper_bounds():
+    values = [0, 20, 20.1, 40, 40.5, 60, 61, 80, 81, 100, 100.1, 500]
+    expected = ["good", "good", "fair", "fair", "moderate", "moderate", "poor", "poor",
+                "very poor", "very poor", "extremely poor", "extremely poor"]
+    assert list(categorize_aqi(values)) == expected
+
+def test_categorize_aqi_missing_values_have_no_category():
+    categories = categorize_aqi(pd.Series([10.0, np.nan]))
+    assert categories[0] == "good"
+    assert pd.isna(categories[1])
+
+def test_categorize_aqi_is_ordered_categorical():
+    categories = categorize_aqi([90, 10])
+    assert list(categories.categories) == AQI_CATEGORIES
+    assert categories.ordered
+    assert categories.max() == "very poor"
+
+def test_fill_missing_keeps_dtypes_and_input():
+    df = pd.DataFrame({
+        "station": ["maribor", "celje"],
+        "pm10": np.array([np.nan, 2.0], dtype=np.float32),
+        "pm2_5": [1.0, np.nan],
+        "is_day": np.array([1, 0], dtype=np.uint8),
+    })
+    filled = fill_missing(df, {"pm10": 5.0, "pm2_5": np.float64(7.5), "is_day": 1.0})
+
+    assert filled["pm10"].tolist() == [5.0, 2.0]
+    assert filled["pm2_5"].tolist() == [1.0, 7.5]
+    assert filled.dtypes.to_dict() == df.dtypes.to_dict()
+    # Vhodni DataFrame ostane nespremenjen
+    assert df["pm10"].isna().sum() == 1 and df["pm2_5"].isna().sum() == 1
+
+def test_fill_missing_without_values_returns_input():
+    df = pd.DataFrame({"pm10": [np.nan]})
+    assert fill_missing(df, {}) is df
@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+
+from src.models.trials import TrialStore, fold_key, trial_key
+
+def test_trial_key_depends_on_data_fold_and_params():
+    estimator = Ridge()
+    fold = fold_key(np.arange(10), np.arange(10, 15))
+    key = trial_key("data", fold, estimator, {"alpha": 1.0})
+
+    assert key == trial_key("data", fold, Ridge(), {"alpha": 1.0})
+    assert key != trial_key("data", fold, estimator, {"alpha": 2.0})
+    assert key != trial_key("other", fold, estimator, {"alpha": 1.0})
+    assert key != trial_key("data", fold_key(np.arange(11), np.arange(11, 15)), estimator, {"alpha": 1.0})
+
+def test_put_and_get_persist_across_instances(tmp_path):
+    store = TrialStore(str(tmp_path))
+    assert store.get("a") is None
+    model = Ridge().fit([[0.0], [1.0]], [0.0, 1.0])
+    store.put("a", score=-1.5, seconds=0.2, model=model)
+
+    reopened = TrialStore(str(tmp_path))
+    assert reopened.get("a")["score"] == -1.5
+    assert reopened.load_model("a").predict([[2.0]]) == pytest.approx(model.predict([[2.0]]))
+    assert reopened.stats == {"hits": 1, "misses": 0, "evictions": 0}
+
+def test_models_are_optional(tmp_path):
+    store = TrialStore(str(tmp_path), store_models=False)
+    store.put("a", score=1.0, seconds=0.1, model=Ridge())
+
+    assert store.get("a")["score"] == 1.0
+    assert store.load_model("a") is None
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    store = TrialStore(str(tmp_path), max_mb=0.0003)  # prostor za nekaj zapisov
+    for key in "abc":
+        store.put(key, score=1.0, seconds=0.1)
+    store.get("a")
+    os.utime(os.path.join(str(tmp_path), "b.json"), (0, 0))
+    store._index["b"]["used"] = 0
+    for key in "defgh":
+        store.put(key, score=1.0, seconds=0.1)
+
+    assert store.stats["evictions"] > 0
+    assert store.get("b") is None
+    assert store.get("h") is not None
+
+def test_corrupt_record_is_a_miss(tmp_path):
+    store = TrialStore(str(tmp_path))
+    store.put("a", score=1.0, seconds=0.1)
+    with open(os.path.join(str(tmp_path), "a.json"), "w") as f:
+        f.write("{")
+
+    assert store.get("a") is None
+    assert not os.path.exists(os.path.join(str(tmp_path), "a.json"))
+
+def test_best_params_round_trip_and_warm_start(tmp_path):
+    store = TrialStore(str(tmp_path))
+    params = {"hidden_layer_sizes": (64, 32), "alpha": 0.001}
+    store.save_best("reg", params, score=-3.0, n_rows=1000, data_key="v1")
+
+    assert store.load_best("reg")["params"] == params
+    assert store.warm_start("reg", 1030, data_key="v2")["params"] == params
+    # Enaki podatki, prevelika rast ali manj vrstic → polno iskanje
+    assert store.warm_start("reg", 1000, data_key="v1") is None
+    assert store.warm_start("reg", 1100, data_key="v2") is None
+    assert store.warm_start("reg", 900, data_key="v2") is None
+    assert store.warm_start("class", 1000) is None
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.store import append
+from src.data.watermark import (REVISION_HOURS, load_watermark, save_watermark, read_since, iter_since, advance_marks,
+                                rewind_watermark)
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Vodne oznake se zapisujejo v data/watermarks relativno na delovno mapo
+    monkeypatch.chdir(tmp_path)
+    dates = pd.date_range("2025-01-01", "2025-03-31 23:00", freq="h", tz="UTC")
+    frames = [pd.DataFrame({"station": station, "date": dates, "pm10": np.arange(len(dates), dtype=float)})
+              for station in ("maribor", "celje")]
+    append("store", pd.concat(frames))
+    return "store"
+
+def first_dates(df):
+    return df.groupby("station")["date"].min().to_dict()
+
+def test_read_since_without_marks_reads_everything(store):
+    assert len(read_since(store, {})) == 2 * 90 * 24
+
+def test_read_since_reads_unmarked_stations_from_start(store):
+    mark = pd.Timestamp("2025-03-20", tz="UTC")
+    df = read_since(store, {"maribor": mark.isoformat()})
+
+    first = first_dates(df)
+    assert first["celje"] == pd.Timestamp("2025-01-01", tz="UTC")
+    assert first["maribor"] == mark - pd.Timedelta(hours=REVISION_HOURS - 1)
+
+def test_read_since_rereads_revision_window(store):
+    mark = pd.Timestamp("2025-03-20", tz="UTC")
+    df = read_since(store, {"maribor": mark.isoformat(), "celje": mark.isoformat()})
+
+    assert set(first_dates(df).values()) == {mark - pd.Timedelta(hours=REVISION_HOURS - 1)}
+    assert len(df) == 2 * (REVISION_HOURS + 12 * 24 - 1)
+
+def test_iter_since_matches_read_since_in_time_order(store):
+    marks = {"maribor": "2025-02-15T00:00:00+00:00"}
+    chunks = list(iter_since(store, marks, 500))
+
+    assert all(a["date"].iloc[-1] <= b["date"].iloc[0] for a, b in zip(chunks, chunks[1:]))
+    expected = read_since(store, marks).sort_values(["date", "station"], ignore_index=True)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+def test_advance_marks_only_moves_forward():
+    df = pd.DataFrame({"station": ["maribor", "celje"],
+                       "date": pd.to_datetime(["2025-01-02", "2025-01-01"], utc=True)})
+    marks = advance_marks({"celje": "2025-01-05T00:00:00+00:00"}, df)
+
+    assert marks == {"maribor": "2025-01-02T00:00:00+00:00", "celje": "2025-01-05T00:00:00+00:00"}
+
+def test_rewind_watermark_moves_marks_back(store):
+    save_watermark("split", {"stations": {"maribor": "2025-03-31T23:00:00+00:00", "celje": "2025-01-10T00:00:00+00:00"},
+                             "fingerprint": "abc", "train_end": "2025-03-01T00:00:00+00:00"})
+    rewind_watermark("split", "2025-02-01")
+
+    watermark = load_watermark("split")
+    assert watermark["stations"] == {"maribor": "2025-01-31T23:00:00+00:00", "celje": "2025-01-10T00:00:00+00:00"}
+    assert watermark["fingerprint"] is None
+    assert "train_end" not in watermark
+
+def test_rewind_watermark_without_watermark_is_noop(store):
+    rewind_watermark("merge", "2025-02-01")
+    assert load_watermark("merge") == {}